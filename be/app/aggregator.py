@@ -0,0 +1,157 @@
+"""
+Front end for the location-sharded deployment.
+
+Shards are ordinary app.main processes started with SHARD_LOCATIONS; this app is
+started with SHARDS (shard URL -> locations). Requests for one pump are proxied to the
+shard that owns it and location-filtered requests to the shard of that location;
+fleet-wide endpoints scatter to every shard in parallel and merge the partial results.
+See scripts/run-sharded.sh for a local multi-process setup.
+"""
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import settings
+from app.core.logging_config import RequestContextMiddleware, configure_logging
+from app.services.sharding import ShardError, get_shard_client, gathered, sum_numeric
+import logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+PREFIX = settings.API_V1_STR
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    shards = get_shard_client()
+    logger.info(f"Aggregating {len(shards.shards)} shards: {shards.shards}")
+    yield
+    await shards.close()
+
+
+app = FastAPI(
+    title=f"{settings.PROJECT_NAME} (aggregator)",
+    version="1.0.0",
+    description="Scatter-gather front end for location-sharded Pump Monitor APIs",
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(RequestContextMiddleware)
+
+
+async def _forward(url: str, request: Request, path: str) -> Response:
+    try:
+        response = await get_shard_client().forward(
+            url, request.method, path,
+            params=request.query_params, content=await request.body(),
+            headers={
+                "content-type": request.headers.get("content-type", "application/json"),
+                "accept": request.headers.get("accept", "*/*"),
+            },
+        )
+    except ShardError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+    return Response(response.content, response.status_code, media_type=response.headers.get("content-type"))
+
+
+def _location_shard(location: str) -> str:
+    url = get_shard_client().shard_for_location(location)
+    if url is None:
+        raise HTTPException(status_code=404, detail=f"No shard owns location '{location}'")
+    return url
+
+
+@app.get("/health")
+async def health_check():
+    _, status = await get_shard_client().scatter("/health", prefix="")
+    return gathered({"status": "healthy", "service": "pump-monitor-aggregator"}, status)
+
+
+@app.get(f"{PREFIX}/dashboard/stats")
+async def get_dashboard_stats():
+    """Fleet statistics summed over shards; system health is weighted by pump count"""
+    responses, status = await get_shard_client().scatter("/dashboard/stats")
+    parts = list(responses.values())
+    merged = sum_numeric(parts)
+    total = merged.get("total_pumps", 0)
+    merged["system_health"] = (
+        round(sum(p["system_health"] * p["total_pumps"] for p in parts) / total, 1) if total else 0
+    )
+    return gathered(merged, status)
+
+
+@app.get(f"{PREFIX}/alerts/summary")
+async def get_alerts_summary():
+    responses, status = await get_shard_client().scatter("/alerts/summary")
+    return gathered(sum_numeric(list(responses.values())), status)
+
+
+@app.get(f"{PREFIX}/alerts/")
+async def get_alerts(request: Request, location: Optional[str] = None):
+    """Alerts of every shard, most recently seen first; ids are per shard, so each alert names its shard"""
+    if location:
+        return await _forward(_location_shard(location), request, "/alerts/")
+    responses, status = await get_shard_client().scatter("/alerts/", dict(request.query_params))
+    key = "incidents" if request.query_params.get("view") == "incidents" else "alerts"
+    items = [{**item, "shard": url} for url, body in responses.items() for item in body[key]]
+    items.sort(key=lambda item: item["last_seen"], reverse=True)
+    filters = next((body["filters"] for body in responses.values()), {})
+    return gathered({key: items, "total": len(items), "filters": filters}, status)
+
+
+@app.get(f"{PREFIX}/pumps/")
+async def get_all_pumps():
+    responses, status = await get_shard_client().scatter("/pumps/")
+    pumps = [pump for body in responses.values() for pump in body["pumps"]]
+    return gathered({"pumps": pumps, "total": len(pumps)}, status)
+
+
+@app.get(f"{PREFIX}/pumps/search/")
+async def search_pumps(request: Request, location: Optional[str] = None, limit: int = Query(20, ge=1, le=500)):
+    """Per-shard top results merged by score (scores do not depend on the rest of the fleet)"""
+    if location:
+        return await _forward(_location_shard(location), request, "/pumps/search/")
+    responses, status = await get_shard_client().scatter("/pumps/search/", dict(request.query_params))
+    scores = {pump_id: score for body in responses.values() for pump_id, score in body["scores"].items()}
+    pumps = [pump for body in responses.values() for pump in body["pumps"]]
+    pumps.sort(key=lambda pump: scores[pump["id"]], reverse=True)
+    pumps = pumps[:limit]
+    filters = next((body["filters"] for body in responses.values()), {})
+    return gathered({
+        "pumps": pumps,
+        "scores": {pump["id"]: scores[pump["id"]] for pump in pumps},
+        "total": sum(body["total"] for body in responses.values()),
+        "filters": filters,
+    }, status)
+
+
+# Registered ahead of proxy_pump, which would otherwise take "export" and "batch" for pump ids
+@app.get(f"{PREFIX}/pumps/export/")
+@app.post(f"{PREFIX}/pumps/batch")
+async def not_scattered(request: Request):
+    """Multi-pump exports and batches are not split across shards"""
+    raise HTTPException(status_code=501, detail=f"{request.url.path} is not available in sharded mode")
+
+
+@app.api_route(f"{PREFIX}/pumps/{{pump_id}}", methods=["GET"])
+@app.api_route(f"{PREFIX}/pumps/{{pump_id}}/{{rest:path}}", methods=["GET", "POST", "PUT", "DELETE"])
+async def proxy_pump(request: Request, pump_id: str, rest: str = ""):
+    """Anything addressed to one pump goes to the shard that owns it"""
+    url = await get_shard_client().shard_for_pump(pump_id)
+    if url is None:
+        raise HTTPException(status_code=404, detail="Pump not found")
+    return await _forward(url, request, f"/pumps/{pump_id}" + (f"/{rest}" if rest else ""))
+
+
+@app.api_route(f"{PREFIX}/{{path:path}}", methods=["GET", "POST", "PUT", "DELETE"])
+async def not_sharded(path: str):
+    raise HTTPException(status_code=501, detail=f"/{path} is not available in sharded mode")
@@ -1,9 +1,13 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import chat, pumps, dashboard, alerts
+from app.api.v1.endpoints import chat, pumps, dashboard, alerts, analytics, maintenance, system, changes
 
 api_router = APIRouter()
 
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(pumps.router, prefix="/pumps", tags=["pumps"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
-api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
\ No newline at end of file
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(maintenance.router, prefix="/maintenance", tags=["maintenance"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from typing import Optional
-from app.data.mock_data import MOCK_ALERTS, MOCK_PUMPS
+from typing import Dict, Literal, Optional
+from app.data.mock_data import MOCK_PUMPS
+from app.services.alert_engine import get_alert_engine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,42 +9,56 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _pump_info(pump_id: str) -> Dict[str, str]:
+    pump = next((p for p in MOCK_PUMPS if p["id"] == pump_id), None)
+    return {
+        "pump_name": pump["name"] if pump else "Unknown",
+        "pump_location": pump["location"] if pump else "Unknown"
+    }
+
+
 @router.get("/")
 async def get_alerts(
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    pump_id: Optional[str] = None
+    pump_id: Optional[str] = None,
+    location: Optional[str] = None,
+    view: Literal["alerts", "incidents"] = "alerts"
 ):
-    """Get system alerts with optional filtering"""
+    """Get deduplicated system alerts, or the incidents grouping them, with optional filtering"""
     try:
-        alerts = MOCK_ALERTS
-        
-        if status:
-            alerts = [a for a in alerts if a["status"].lower() == status.lower()]
-        if priority:
-            alerts = [a for a in alerts if a["priority"].lower() == priority.lower()]
-        if pump_id:
-            alerts = [a for a in alerts if a["pump_id"] == pump_id]
-        
+        engine = get_alert_engine()
+        filters = {"status": status, "priority": priority, "pump_id": pump_id}
+
+        if view == "incidents":
+            incidents = engine.list_incidents(status, priority, pump_id, location)
+            return {
+                "incidents": [
+                    {
+                        **incident,
+                        "alerts": [
+                            {**engine.alerts[a], **_pump_info(engine.alerts[a]["pump_id"])}
+                            for a in incident["alert_ids"]
+                        ],
+                    }
+                    for incident in incidents
+                ],
+                "total": len(incidents),
+                "filters": {**filters, "location": location}
+            }
+
         # Enrich alerts with pump information
         enriched_alerts = []
-        for alert in alerts:
-            pump = next((p for p in MOCK_PUMPS if p["id"] == alert["pump_id"]), None)
-            enriched_alert = {
-                **alert,
-                "pump_name": pump["name"] if pump else "Unknown",
-                "pump_location": pump["location"] if pump else "Unknown"
-            }
-            enriched_alerts.append(enriched_alert)
+        for alert in engine.list_alerts(status, priority, pump_id):
+            info = _pump_info(alert["pump_id"])
+            if location and info["pump_location"].lower() != location.lower():
+                continue
+            enriched_alerts.append({**alert, **info})
         
         return {
             "alerts": enriched_alerts,
             "total": len(enriched_alerts),
-            "filters": {
-                "status": status,
-                "priority": priority,
-                "pump_id": pump_id
-            }
+            "filters": {**filters, "location": location}
         }
     except Exception as e:
         logger.error(f"Error getting alerts: {str(e)}")
@@ -52,45 +67,46 @@ async def get_alerts(
 
 @router.get("/summary")
 async def get_alerts_summary():
-    """Get alert summary statistics"""
+    """Get alert summary statistics, including deduplication and incident counts"""
     try:
-        total_alerts = len(MOCK_ALERTS)
-        active_alerts = len([a for a in MOCK_ALERTS if a["status"] == "Active"])
-        critical_alerts = len([a for a in MOCK_ALERTS if a["priority"] == "Critical"])
-        
-        # Alert breakdown by priority
-        priority_breakdown = {}
-        for priority in ["Critical", "High", "Medium", "Low"]:
-            priority_breakdown[priority.lower()] = len([a for a in MOCK_ALERTS if a["priority"] == priority])
-        
-        # Alert breakdown by status
-        status_breakdown = {}
-        for status in ["Active", "Acknowledged", "Resolved"]:
-            status_breakdown[status.lower()] = len([a for a in MOCK_ALERTS if a["status"] == status])
-        
-        return {
-            "total_alerts": total_alerts,
-            "active_alerts": active_alerts,
-            "critical_alerts": critical_alerts,
-            "priority_breakdown": priority_breakdown,
-            "status_breakdown": status_breakdown
-        }
+        return get_alert_engine().summary()
     except Exception as e:
         logger.error(f"Error getting alerts summary: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving alerts summary")
 
 
+@router.get("/incidents/{incident_id}")
+async def get_incident(incident_id: int):
+    """Get one incident with its alerts"""
+    engine = get_alert_engine()
+    incident = engine.incidents.get(incident_id)
+    if incident is None:
+        raise HTTPException(status_code=404, detail=f"Incident {incident_id} not found")
+    return {
+        **incident,
+        "status": engine.incident_status(incident),
+        "alerts": [{**engine.alerts[a], **_pump_info(engine.alerts[a]["pump_id"])} for a in incident["alert_ids"]],
+    }
+
+
+def _set_alert_status(alert_id: int, status: str):
+    alert = get_alert_engine().set_status(alert_id, status)
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"Alert {alert_id} not found")
+    return {
+        "message": f"Alert {alert_id} {status.lower()} successfully",
+        "alert_id": alert_id,
+        "status": status
+    }
+
+
 @router.put("/{alert_id}/acknowledge")
 async def acknowledge_alert(alert_id: int):
     """Acknowledge an alert"""
     try:
-        # In a real app, this would update the database
-        # For now, just return success
-        return {
-            "message": f"Alert {alert_id} acknowledged successfully",
-            "alert_id": alert_id,
-            "status": "Acknowledged"
-        }
+        return _set_alert_status(alert_id, "Acknowledged")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error acknowledging alert {alert_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error acknowledging alert")
@@ -100,13 +116,9 @@ async def acknowledge_alert(alert_id: int):
 async def resolve_alert(alert_id: int):
     """Resolve an alert"""
     try:
-        # In a real app, this would update the database
-        # For now, just return success
-        return {
-            "message": f"Alert {alert_id} resolved successfully",
-            "alert_id": alert_id,
-            "status": "Resolved"
-        }
+        return _set_alert_status(alert_id, "Resolved")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error resolving alert {alert_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error resolving alert")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error resolving alert")
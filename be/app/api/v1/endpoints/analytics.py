@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional, List, Literal
+from app.schemas.analytics import FleetQuery
+from app.services.fleet_analytics import get_fleet_analytics, METRICS
+from app.services.fleet_query import run_fleet_query, QueryError
+from app.services.failure_forecast import get_failure_forecaster, DEFAULT_SIMULATIONS, MAX_SIMULATIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _validate_metrics(metrics: Optional[List[str]]) -> Optional[List[str]]:
+    unknown = [m for m in metrics or [] if m not in METRICS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown metrics: {', '.join(unknown)}. Valid metrics: {', '.join(METRICS)}"
+        )
+    return metrics
+
+
+@router.get("/pumps/{pump_id}/peers")
+async def get_pump_peer_comparison(pump_id: str, metrics: Optional[List[str]] = Query(None)):
+    """Percentile ranks, z-scores and peer-group stats of a pump against the fleet, its pump type and its location"""
+    try:
+        comparison = get_fleet_analytics().compare(pump_id, _validate_metrics(metrics))
+        if comparison is None:
+            raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+        return {
+            "pump_id": pump_id,
+            "metrics": comparison
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error comparing pump {pump_id} to peers: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving peer comparison")
+
+
+@router.get("/fleet")
+async def get_fleet_statistics(
+    group_by: Optional[Literal["pump_type", "location"]] = None,
+    metrics: Optional[List[str]] = Query(None)
+):
+    """Distribution statistics per metric for the whole fleet or per peer group"""
+    try:
+        return {
+            "group_by": group_by or "fleet",
+            "groups": get_fleet_analytics().group_stats(group_by, _validate_metrics(metrics))
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting fleet statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving fleet statistics")
+
+
+@router.post("/query")
+async def query_fleet(query: FleetQuery):
+    """Filter, sort, top-k, group and aggregate the fleet; returns only the compact result"""
+    try:
+        return run_fleet_query(query)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running fleet query: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error running fleet query")
+
+
+@router.get("/failure-forecast")
+async def get_failure_forecast(
+    horizon_days: float = Query(30, gt=0, le=3650),
+    simulations: int = Query(DEFAULT_SIMULATIONS, ge=100, le=MAX_SIMULATIONS),
+    location: Optional[str] = None
+):
+    """Monte Carlo forecast of failures within a horizon: expected count, percentile bands and risk per location"""
+    try:
+        forecaster = get_failure_forecaster()
+        if not location:
+            return await forecaster.forecast(horizon_days, simulations)
+        forecast = await forecaster.forecast_location(location, horizon_days, simulations)
+        if forecast is None:
+            raise HTTPException(status_code=404, detail=f"No pumps in location {location}")
+        return forecast
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error forecasting failures: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error forecasting failures")
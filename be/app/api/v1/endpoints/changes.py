@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, List, Literal, Optional
+from app.data.mock_data import MOCK_PUMPS
+from app.services.alert_engine import get_alert_engine
+from app.services.change_log import get_change_log
+from app.services.maintenance_service import get_maintenance_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_changes(
+    since: Optional[int] = None,
+    kinds: Optional[List[Literal["pump", "alert", "maintenance"]]] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Get the pumps, alerts and maintenance logs changed after version `since`, oldest
+    change first, with only the latest change per entity. Poll again from the returned
+    `version`. Without `since`, or when `since` is too old to answer from the log,
+    `resync_required` is set: reload the collections, then poll from `version`.
+    """
+    try:
+        # Seeding the stores records changes, so do it before reading the version
+        engine = get_alert_engine()
+        maintenance = get_maintenance_store()
+        log = get_change_log()
+
+        if since is None or log.resync_required(since):
+            return {"version": log.version, "since": since, "changes": [], "has_more": False, "resync_required": True}
+
+        changes = log.changes_since(since, kinds, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        pumps = {p["id"]: p for p in MOCK_PUMPS} if any(c[1] == "pump" for c in changes) else {}
+        current = {"pump": pumps.get, "alert": engine.alerts.get, "maintenance": maintenance.get}
+
+        items: List[Dict[str, Any]] = []
+        for version, kind, entity_id, op in changes:
+            data = current[kind](entity_id) if op != "delete" else None
+            if data is None:
+                op = "delete"
+            items.append({"kind": kind, "id": entity_id, "op": op, "version": version, "data": data})
+        return {
+            "version": changes[-1][0] if has_more else log.version,
+            "since": since,
+            "changes": items,
+            "has_more": has_more,
+            "resync_required": False,
+        }
+    except Exception as e:
+        logger.error(f"Error getting changes since {since}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving changes")
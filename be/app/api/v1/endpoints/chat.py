@@ -1,31 +1,84 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from app.schemas.chat import ChatRequest, ChatSuggestion
-from app.services.chat_service import stream_chat_message, generate_chat_suggestions
+from pydantic import ValidationError
+from app.schemas.chat import ChatRequest, ChatSessionHistory, ChatSuggestion
+from app.core.config import get_llm_settings
+from app.services.chat_stream import parse_last_event_id, turn_registry
+from app.services.chat_sessions import get_session_store
+from typing import Optional
+import importlib
 import logging
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 router = APIRouter()
 
 
-@router.post("/stream")
-async def stream_chat_message_endpoint(chat_request: ChatRequest):
+def _load_chat_service():
     """
-    Process a chat message and stream the response tokens
+    Import the chat service (and with it the OpenAI SDK) on first use, so the rest
+    of the API can start and serve /health without LLM credentials.
     """
     try:
-        logger.info(f"Received chat request: {chat_request.message[:50]}...")
-        return StreamingResponse(
-            stream_chat_message(chat_request.message, chat_request.chat_history),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-            }
+        get_llm_settings()
+    except ValidationError as e:
+        missing = ", ".join(str(err["loc"][0]) for err in e.errors())
+        logger.error(f"Chat subsystem is not configured: missing {missing}")
+        raise HTTPException(
+            status_code=503, detail=f"Chat assistant is not configured (missing {missing})"
         )
+    return importlib.import_module("app.services.chat_service")
+
+
+def _resolve_session(chat_request: ChatRequest):
+    """The request's session, or a new one seeded from chat_history when it is unknown or expired"""
+    store = get_session_store()
+    session = store.get(chat_request.session_id) if chat_request.session_id else None
+    if session is None:
+        session = store.create([
+            {"role": msg.role, "content": msg.content}
+            for msg in chat_request.chat_history or []
+            if msg.role in ("user", "assistant")
+        ])
+    return session
+
+
+def _sse_response(turn, after_seq: int = 0, session_id: Optional[str] = None) -> StreamingResponse:
+    return StreamingResponse(
+        turn.follow(after_seq),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "X-Chat-Turn-Id": turn.turn_id,
+            **({"X-Chat-Session-Id": session_id} if session_id else {}),
+        }
+    )
+
+
+@router.post("/stream")
+async def stream_chat_message_endpoint(
+    chat_request: ChatRequest, last_event_id: Optional[str] = Header(None)
+):
+    """
+    Process a chat message and stream the response as server-sent events.
+    Send session_id to continue a server-side conversation (returned in X-Chat-Session-Id).
+    A Last-Event-ID header for a recent turn resumes that turn instead.
+    """
+    resume = parse_last_event_id(last_event_id)
+    if resume:
+        turn = turn_registry.get(resume[0])
+        if turn:
+            logger.info("Resuming chat turn %s after event %s", turn.turn_id, resume[1])
+            return _sse_response(turn, resume[1])
+
+    chat_service = _load_chat_service()
+    try:
+        logger.info("Received chat request: %.50s", chat_request.message)
+        session = _resolve_session(chat_request)
+        turn = turn_registry.start(chat_service.stream_chat_message(chat_request.message, session))
+        return _sse_response(turn, session_id=session.session_id)
     except Exception as e:
         logger.error(f"Error processing chat message: {str(e)}")
         raise HTTPException(
@@ -33,18 +86,78 @@ async def stream_chat_message_endpoint(chat_request: ChatRequest):
         )
 
 
+@router.get("/stream/{turn_id}")
+async def resume_chat_stream_endpoint(
+    turn_id: str,
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[int] = Query(None, ge=0),
+):
+    """
+    Resume a recent turn's event stream (EventSource-compatible)
+    """
+    turn = turn_registry.get(turn_id)
+    if turn is None:
+        raise HTTPException(status_code=404, detail="Chat turn not found or expired")
+    resume = parse_last_event_id(last_event_id)
+    after_seq = after if after is not None else (resume[1] if resume and resume[0] == turn_id else 0)
+    return _sse_response(turn, after_seq)
+
+
 @router.post("/suggestions", response_model=ChatSuggestion)
 async def get_chat_suggestions_endpoint(chat_request: ChatRequest):
     """
     Generate follow-up chat suggestions based on the user's last message and conversation history.
     Returns a JSON response with a list of suggestions.
     """
+    chat_service = _load_chat_service()
     try:
-        logger.info(f"Generating suggestions for: {chat_request.message[:50]}...")
-        suggestions = await generate_chat_suggestions(chat_request.message, chat_request.chat_history)
+        logger.info("Generating suggestions for: %.50s", chat_request.message)
+        session = get_session_store().get(chat_request.session_id) if chat_request.session_id else None
+        if session:
+            history = session.transcript()
+        else:
+            history = [{"role": msg.role, "content": msg.content} for msg in chat_request.chat_history or []]
+        suggestions = await chat_service.generate_chat_suggestions(chat_request.message, history)
         return suggestions
     except Exception as e:
         logger.error(f"Error generating chat suggestions: {str(e)}")
         raise HTTPException(
             status_code=500, detail=f"Error generating suggestions: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/metrics")
+async def get_chat_metrics_endpoint():
+    """
+    Chat streaming counters, including work saved by cancelling abandoned turns,
+    and answer cache hit rates
+    """
+    chat_service = _load_chat_service()
+    return {
+        **chat_service.stream_stats,
+        "answer_cache": chat_service.get_answer_cache().metrics(),
+        "active_turns": sum(1 for t in turn_registry.turns.values() if not t.done),
+        "sessions": len(get_session_store().sessions),
+    }
+
+
+@router.get("/sessions/{session_id}", response_model=ChatSessionHistory)
+async def get_chat_session_endpoint(session_id: str):
+    """
+    Get the visible transcript of a server-side chat session
+    """
+    _load_chat_service()
+    session = get_session_store().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    return {"session_id": session.session_id, "messages": session.transcript()}
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_chat_session_endpoint(session_id: str):
+    """
+    Forget a server-side chat session
+    """
+    _load_chat_service()
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
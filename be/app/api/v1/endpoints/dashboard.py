@@ -1,5 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from app.data.mock_data import MOCK_PUMPS, MOCK_ALERTS
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from datetime import datetime
+from typing import Optional, Literal
+from app.services.alert_engine import get_alert_engine
+from app.services.event_journal import get_event_journal
+from app.services.sensor_service import FLEET_SCOPE, query_trends, trend_columns
+from app.services import columnar
+from app.services.dashboard_service import get_dashboard_stats as dashboard_stats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,50 +17,55 @@ router = APIRouter()
 async def get_dashboard_stats():
     """Get overall system statistics and health metrics"""
     try:
-        # Calculate real-time stats from mock data
-        total_pumps = len(MOCK_PUMPS)
-        critical_alerts = len([a for a in MOCK_ALERTS if a["priority"] == "Critical"])
-        predicted_failures = len([p for p in MOCK_PUMPS if p["predicted_failure_days"] <= 30])
-        
-        # Calculate average health score
-        health_scores = [p["health_score"] for p in MOCK_PUMPS if p["health_score"]]
-        avg_health = sum(health_scores) / len(health_scores) if health_scores else 0
-        
-        return {
-            "total_pumps": total_pumps,
-            "critical_alerts": critical_alerts,
-            "predicted_failures": predicted_failures,
-            "system_health": round(avg_health, 1),
-            "pump_status_breakdown": {
-                "normal": len([p for p in MOCK_PUMPS if p["status"] == "Normal"]),
-                "warning": len([p for p in MOCK_PUMPS if p["status"] == "Warning"]),
-                "critical": len([p for p in MOCK_PUMPS if p["status"] == "Critical"])
-            }
-        }
+        return await dashboard_stats()
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving dashboard statistics")
 
 
 @router.get("/health-trends")
-async def get_system_health_trends():
-    """Get system health trends for the last 24 hours"""
+async def get_system_health_trends(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(24, ge=1, le=5000),
+    resolution: Optional[Literal["1m", "1h", "1d"]] = None,
+    precision: Literal["f4", "f8"] = "f4",
+    request: Request = None,
+    http_response: Response = None,
+):
+    """
+    Get fleet health trends, defaulting to the last 24 hours.
+    With `Accept: application/vnd.pump-monitor.columnar` the points come back as
+    columnar binary (`ts` and `health_score` columns)
+    """
     try:
-        # Mock 24-hour health data
+        trends = query_trends(FLEET_SCOPE, start, end, max_points, resolution)
+        points = [p for p in trends["points"] if "health_score" in p["stats"]]
         health_data = [
-            {"time": "00:00", "value": 94},
-            {"time": "04:00", "value": 93},
-            {"time": "08:00", "value": 96},
-            {"time": "12:00", "value": 94},
-            {"time": "16:00", "value": 95},
-            {"time": "20:00", "value": 96},
-            {"time": "24:00", "value": 95},
+            {
+                "time": p["recorded_at"].strftime("%H:%M" if trends["resolution"] != "1d" else "%d %b"),
+                "timestamp": p["recorded_at"],
+                "value": round(p["stats"]["health_score"]["mean"], 1),
+            }
+            for p in points
         ]
         
+        current_health = health_data[-1]["value"] if health_data else 0
+        delta = current_health - health_data[0]["value"] if health_data else 0
+        trend = "improving" if delta > 1 else "declining" if delta < -1 else "stable"
+
+        if columnar.accepts(request.headers.get("accept")):
+            payload = columnar.encode(
+                trend_columns(points, columnar.FLOAT_DTYPES[precision], channels=("health_score",)),
+                {"resolution": trends["resolution"], "current_health": current_health, "trend": trend},
+            )
+            return Response(payload, media_type=columnar.MEDIA_TYPE, headers={"Vary": "Accept"})
+        http_response.headers["Vary"] = "Accept"
         return {
             "health_data": health_data,
-            "current_health": 95,
-            "trend": "stable"
+            "resolution": trends["resolution"],
+            "current_health": current_health,
+            "trend": trend
         }
     except Exception as e:
         logger.error(f"Error getting health trends: {str(e)}")
@@ -62,45 +73,21 @@ async def get_system_health_trends():
 
 
 @router.get("/recent-activity")
-async def get_recent_activity():
-    """Get recent system activity and events"""
+async def get_recent_activity(
+    limit: int = Query(5, ge=1, le=100),
+    cursor: Optional[int] = Query(None, ge=1, description="next_cursor of the previous page"),
+    type: Optional[Literal["alert", "maintenance", "status", "prediction"]] = None,
+    location: Optional[str] = None,
+    pump_id: Optional[str] = None
+):
+    """Get recent system activity and events, newest first, optionally filtered by type, location and pump"""
     try:
-        # Combine recent alerts and maintenance for activity feed
-        activities = []
-        
-        # Add recent alerts
-        for alert in MOCK_ALERTS[:3]:  # Last 3 alerts
-            pump = next((p for p in MOCK_PUMPS if p["id"] == alert["pump_id"]), None)
-            activities.append({
-                "type": "alert",
-                "timestamp": "2024-06-17T10:30:00Z",  # Mock timestamp
-                "message": f"Alert: {alert['message']} on {pump['name'] if pump else alert['pump_id']}",
-                "priority": alert["priority"],
-                "pump_id": alert["pump_id"]
-            })
-        
-        # Add some maintenance activities
-        activities.extend([
-            {
-                "type": "maintenance",
-                "timestamp": "2024-06-17T08:15:00Z",
-                "message": "Routine inspection completed on Feed Pump A1",
-                "priority": "Info",
-                "pump_id": "P001"
-            },
-            {
-                "type": "prediction",
-                "timestamp": "2024-06-17T07:45:00Z",
-                "message": "AI model updated predictions for 12 pumps",
-                "priority": "Info",
-                "pump_id": None
-            }
-        ])
-        
+        get_alert_engine()  # seeds the journal with the initial alerts
+        activities, next_cursor = get_event_journal().page(cursor, limit, type, location, pump_id)
         return {
-            "activities": activities[:5],  # Return last 5 activities
-            "total": len(activities)
+            "activities": activities,
+            "next_cursor": next_cursor
         }
     except Exception as e:
         logger.error(f"Error getting recent activity: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error retrieving recent activity")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error retrieving recent activity")
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from typing import Optional
+from app.schemas.maintenance import (
+    MaintenanceLog, MaintenanceLogCreate, MaintenanceLogUpdate, MaintenanceLogList
+)
+from app.data.mock_data import MOCK_PUMPS
+from app.services.maintenance_service import get_maintenance_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/", response_model=MaintenanceLogList)
+async def get_maintenance_logs(
+    pump_id: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Get maintenance logs dated within [start, end), newest first, optionally filtered by pump and status"""
+    try:
+        logs, total = get_maintenance_store().query(pump_id, status, start, end, limit)
+        return MaintenanceLogList(logs=logs, total=total)
+    except Exception as e:
+        logger.error(f"Error getting maintenance logs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving maintenance logs")
+
+
+@router.get("/summary")
+async def get_maintenance_summary(pump_id: Optional[str] = None):
+    """Get last completed and next due maintenance dates per pump"""
+    try:
+        summary = get_maintenance_store().pump_summary
+        if pump_id:
+            if not any(p["id"] == pump_id for p in MOCK_PUMPS):
+                raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+            return {
+                "pumps": {pump_id: summary.get(pump_id, {"last_completed": None, "next_due": None})}
+            }
+        return {"pumps": summary}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting maintenance summary: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving maintenance summary")
+
+
+@router.get("/{log_id}", response_model=MaintenanceLog)
+async def get_maintenance_log(log_id: int):
+    """Get a single maintenance log"""
+    log = get_maintenance_store().get(log_id)
+    if not log:
+        raise HTTPException(status_code=404, detail=f"Maintenance log {log_id} not found")
+    return log
+
+
+@router.post("/", response_model=MaintenanceLog, status_code=201)
+async def create_maintenance_log(log: MaintenanceLogCreate):
+    """Create a maintenance log for a pump"""
+    try:
+        if not any(p["id"] == log.pump_id for p in MOCK_PUMPS):
+            raise HTTPException(status_code=404, detail=f"Pump {log.pump_id} not found")
+        return get_maintenance_store().create(log.model_dump())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating maintenance log: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error creating maintenance log")
+
+
+@router.put("/{log_id}", response_model=MaintenanceLog)
+async def update_maintenance_log(log_id: int, changes: MaintenanceLogUpdate):
+    """Update a maintenance log (e.g. reschedule, or mark it Completed)"""
+    try:
+        log = get_maintenance_store().update(log_id, changes.model_dump(exclude_unset=True))
+        if not log:
+            raise HTTPException(status_code=404, detail=f"Maintenance log {log_id} not found")
+        return log
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating maintenance log {log_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error updating maintenance log")
+
+
+@router.delete("/{log_id}", status_code=204)
+async def delete_maintenance_log(log_id: int):
+    """Delete a maintenance log"""
+    try:
+        if not get_maintenance_store().delete(log_id):
+            raise HTTPException(status_code=404, detail=f"Maintenance log {log_id} not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting maintenance log {log_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error deleting maintenance log")
@@ -1,7 +1,21 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional
-from app.schemas.pump import Pump, PumpList
-from app.data.mock_data import MOCK_PUMPS, generate_mock_sensor_data
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Literal, AsyncGenerator
+from app.schemas.pump import Pump, PumpList, SensorReading, PumpBatchRequest
+from app.data.mock_data import MOCK_PUMPS
+from app.services.alert_engine import get_alert_engine
+from app.core.serialization import json_default
+from app.services.sensor_service import query_trends, flatten_points, record_reading, trend_columns
+from app.services import columnar
+from app.services.pump_search import get_search_index
+from app.services.maintenance_service import get_maintenance_store
+from app.services.history_export import FORMATS as EXPORT_FORMATS, ExportError, check_format, stream_export
+from app.services.waveform_service import (
+    MAX_UPLOAD_BYTES, WaveformError, feature_history, ingest_waveforms, view_captures
+)
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,20 +49,50 @@ async def get_pump_details(pump_id: str):
 
 
 @router.get("/{pump_id}/trends")
-async def get_pump_trends(pump_id: str):
-    """Get sensor data trends for a specific pump"""
+async def get_pump_trends(
+    pump_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = Query(24, ge=1, le=5000),
+    resolution: Optional[Literal["1m", "1h", "1d"]] = None,
+    include_stats: bool = False,
+    precision: Literal["f4", "f8"] = "f4",
+    request: Request = None,
+    http_response: Response = None,
+):
+    """
+    Get sensor data trends for a specific pump.
+    Defaults to the last 24 hours; the rollup tier is chosen so that at most
+    max_points points are returned whatever the span.
+    With `Accept: application/vnd.pump-monitor.columnar` the points come back as
+    columnar binary (float32 or float64 per `precision`, delta-encoded timestamps).
+    """
     try:
         # Check if pump exists
         pump = next((p for p in MOCK_PUMPS if p["id"] == pump_id), None)
         if not pump:
             raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
         
-        sensor_data = generate_mock_sensor_data(pump_id)
-        return {
+        trends = query_trends(pump_id, start, end, max_points, resolution)
+        if columnar.accepts(request.headers.get("accept")):
+            payload = columnar.encode(
+                trend_columns(trends["points"], columnar.FLOAT_DTYPES[precision], include_stats=include_stats),
+                {"pump_id": pump_id, "resolution": trends["resolution"], "start": trends["start"], "end": trends["end"]},
+            )
+            return Response(payload, media_type=columnar.MEDIA_TYPE, headers={"Vary": "Accept"})
+        http_response.headers["Vary"] = "Accept"
+        sensor_data = flatten_points(pump_id, trends["points"])
+        response = {
             "pump_id": pump_id,
+            "resolution": trends["resolution"],
+            "start": trends["start"],
+            "end": trends["end"],
             "sensor_data": sensor_data,
             "data_points": len(sensor_data)
         }
+        if include_stats:
+            response["stats"] = [p["stats"] for p in trends["points"]]
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -56,27 +100,110 @@ async def get_pump_trends(pump_id: str):
         raise HTTPException(status_code=500, detail="Error retrieving pump trends")
 
 
+@router.post("/{pump_id}/readings")
+async def add_pump_reading(pump_id: str, reading: SensorReading):
+    """Ingest a sensor reading: updates the pump's live values and its rollups"""
+    try:
+        pump = next((p for p in MOCK_PUMPS if p["id"] == pump_id), None)
+        if not pump:
+            raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+        
+        record_reading(pump, reading.model_dump(exclude_none=True))
+        return {"message": f"Reading recorded for pump {pump_id}", "pump_id": pump_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error recording reading for pump {pump_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error recording pump reading")
+
+
+@router.post("/{pump_id}/waveforms")
+async def upload_waveforms(
+    pump_id: str,
+    request: Request,
+    sample_rate: float = Query(..., gt=0, le=1_000_000, description="Samples per second"),
+    samples_per_capture: int = Query(..., ge=1, description="Samples in each capture"),
+    shaft_rpm: float = Query(1780.0, gt=0, le=100_000),
+    units: Literal["g", "m/s2"] = "g",
+    recorded_at: Optional[datetime] = None
+):
+    """
+    Ingest vibration waveform captures: the body is raw little-endian float32
+    acceleration samples (application/octet-stream), one or more captures of
+    samples_per_capture samples back to back. Returns and stores per-capture RMS, crest
+    factor, kurtosis, band energies and bearing defect peaks
+    """
+    try:
+        pump = next((p for p in MOCK_PUMPS if p["id"] == pump_id), None)
+        if not pump:
+            raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+        too_large = HTTPException(status_code=413, detail=f"Waveform uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+        if int(request.headers.get("content-length") or 0) > MAX_UPLOAD_BYTES:
+            raise too_large
+
+        # Chunked uploads carry no Content-Length, so the cap is also enforced while reading
+        parts = []
+        received = 0
+        async for part in request.stream():
+            received += len(part)
+            if received > MAX_UPLOAD_BYTES:
+                raise too_large
+            parts.append(part)
+        captures = view_captures(b"".join(parts), samples_per_capture)
+        return await ingest_waveforms(pump, captures, sample_rate, shaft_rpm, units, recorded_at)
+    except WaveformError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error ingesting waveforms for pump {pump_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error ingesting waveforms")
+
+
+@router.get("/{pump_id}/waveforms/features")
+async def get_waveform_features(
+    pump_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """Stored spectral features of a pump's waveform captures, defaulting to the last 24 hours"""
+    try:
+        if not any(p["id"] == pump_id for p in MOCK_PUMPS):
+            raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(hours=24)
+        features = feature_history(pump_id, start, end, limit)
+        return {"pump_id": pump_id, "features": features, "total": len(features)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting waveform features for pump {pump_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving waveform features")
+
+
 @router.get("/search/")
 async def search_pumps(
+    q: Optional[str] = None,
     location: Optional[str] = None,
     pump_type: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500)
 ):
-    """Search pumps by location, type, or status"""
+    """
+    Search pumps by free text (id, name, location, type, predicted issue) with prefix
+    and typo-tolerant matching, ranked by relevance; optionally filtered by location,
+    type, or status
+    """
     try:
-        pumps = MOCK_PUMPS
-        
-        if location:
-            pumps = [p for p in pumps if location.lower() in p["location"].lower()]
-        if pump_type:
-            pumps = [p for p in pumps if pump_type.lower() in p["pump_type"].lower()]
-        if status:
-            pumps = [p for p in pumps if p["status"].lower() == status.lower()]
+        results, total = get_search_index().search(q, location, pump_type, status, limit)
         
         return {
-            "pumps": pumps,
-            "total": len(pumps),
+            "pumps": [pump for pump, _ in results],
+            "scores": {pump["id"]: score for pump, score in results},
+            "total": total,
             "filters": {
+                "q": q,
                 "location": location,
                 "pump_type": pump_type,
                 "status": status
@@ -84,4 +211,98 @@ async def search_pumps(
         }
     except Exception as e:
         logger.error(f"Error searching pumps: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error searching pumps")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error searching pumps")
+
+
+async def _stream_pump_batch(batch: PumpBatchRequest) -> AsyncGenerator[str, None]:
+    sections = set(batch.sections)
+    pump_ids = list(dict.fromkeys(batch.pump_ids))
+    wanted = set(pump_ids)
+
+    # Shared lookups: one pass over each collection (or one index) for the whole batch
+    pumps_by_id = {p["id"]: p for p in MOCK_PUMPS if p["id"] in wanted}
+    alerts_by_pump = {}
+    if "alerts" in sections:
+        for alert in get_alert_engine().list_alerts():
+            if alert["pump_id"] in wanted and alert["status"] != "Resolved":
+                alerts_by_pump.setdefault(alert["pump_id"], []).append(alert)
+    maintenance = get_maintenance_store() if "maintenance" in sections else None
+
+    trend_range = batch.trends
+    for pump_id in pump_ids:
+        pump = pumps_by_id.get(pump_id)
+        if not pump:
+            item = {"pump_id": pump_id, "found": False}
+        else:
+            item = {"pump_id": pump_id, "found": True}
+            if "details" in sections:
+                item["details"] = pump
+            if "trends" in sections:
+                trends = query_trends(
+                    pump_id, trend_range.start, trend_range.end,
+                    trend_range.max_points, trend_range.resolution
+                )
+                item["trends"] = {
+                    "resolution": trends["resolution"],
+                    "sensor_data": flatten_points(pump_id, trends["points"]),
+                }
+            if "alerts" in sections:
+                item["alerts"] = alerts_by_pump.get(pump_id, [])
+            if "maintenance" in sections:
+                item["maintenance_logs"] = maintenance.for_pump(pump_id)
+        yield json.dumps(item, default=json_default) + "\n"
+        # Let other requests run between pumps on large batches
+        await asyncio.sleep(0)
+
+
+@router.get("/export/")
+async def export_sensor_history(
+    pump_ids: Optional[List[str]] = Query(None, description="Pumps to export (default: all)"),
+    location: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: Literal["csv", "ndjson", "arrow"] = "csv",
+):
+    """
+    Stream raw sensor history for a set of pumps and time range as CSV, NDJSON or Arrow IPC.
+    Rows are read and encoded in fixed-size chunks, ordered by pump and then time.
+    """
+    selected = [
+        p["id"] for p in MOCK_PUMPS
+        if (not pump_ids or p["id"] in pump_ids)
+        and (not location or p["location"].lower() == location.lower())
+    ]
+    unknown = sorted(set(pump_ids or []) - {p["id"] for p in MOCK_PUMPS})
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown pumps: {', '.join(unknown)}")
+    try:
+        check_format(format)
+    except ExportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    end = end or datetime.now(timezone.utc)
+    start = start or datetime.fromtimestamp(0, tz=timezone.utc)
+    media_type, extension = EXPORT_FORMATS[format]
+    logger.info(f"Exporting sensor history for {len(selected)} pumps as {format}")
+    return StreamingResponse(
+        stream_export(selected, start, end, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sensor_history.{extension}"'},
+    )
+
+
+@router.post("/batch")
+async def get_pumps_batch(batch: PumpBatchRequest):
+    """
+    Fetch details, trends, open alerts and/or maintenance logs for many pumps at once.
+    Streams NDJSON, one line per requested pump in request order.
+    """
+    try:
+        logger.info(f"Batch request for {len(batch.pump_ids)} pumps, sections: {batch.sections}")
+        return StreamingResponse(
+            _stream_pump_batch(batch),
+            media_type="application/x-ndjson",
+        )
+    except Exception as e:
+        logger.error(f"Error processing pump batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error retrieving pump batch")
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.services.compute import get_compute_executor, loop_monitor
+from app.core import logging_config
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_system_metrics():
+    """Event-loop lag, compute offload and logging counters for this worker"""
+    return {
+        "event_loop": loop_monitor.metrics(),
+        "compute": get_compute_executor().metrics(),
+        "logging": logging_config.metrics(),
+    }
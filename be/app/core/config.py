@@ -1,27 +1,88 @@
+from functools import lru_cache
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     # App settings
     APP_ENV: str
-    
+
     # API Settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Pump Monitor"
-    
-    # OpenAI
-    OPENAI_API_KEY: str
-    OPENAI_MODEL: str = "gpt-4.1"
-    
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str]
-    
+
     # Security
     SECRET_KEY: str
-    
+
+    # Raw sensor history segments are kept on disk here when set (memory only otherwise)
+    SENSOR_HISTORY_DIR: Optional[str] = None
+
+    # Activity feed events kept in memory; also appended to segments on disk here when set
+    EVENT_JOURNAL_CAPACITY: int = 10_000
+    EVENT_JOURNAL_DIR: Optional[str] = None
+
+    # Worker processes for CPU-heavy jobs (0 runs them on the event loop)
+    COMPUTE_WORKERS: int = 2
+
+    # Logging: level, and "json" or "text" output
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+
+    # Sharded mode: a shard only owns the pumps of these locations (all when unset)
+    SHARD_LOCATIONS: Optional[list[str]] = None
+
+    class Config:
+        env_file = ".env.local"
+        case_sensitive = True
+        extra = "ignore"
+
+
+class LLMSettings(BaseSettings):
+    """Settings for the chat/LLM subsystem, validated on first chat use only"""
+    # OpenAI
+    OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4.1"
+
+    # Number of knowledge chunks retrieved into each chat turn
+    KNOWLEDGE_TOP_K: int = 4
+
+    # Server-side chat sessions (persisted as JSON files when a directory is set)
+    CHAT_MAX_SESSIONS: int = 500
+    CHAT_SESSION_TTL_MINUTES: int = 120
+    CHAT_SESSION_DIR: Optional[str] = None
+
+    # Semantic answer cache (0 entries disables it); cached answers are replayed as
+    # word groups this many ms apart so they stream like a live answer
+    ANSWER_CACHE_SIZE: int = 512
+    ANSWER_CACHE_THRESHOLD: float = 0.9
+    ANSWER_CACHE_TTL_MINUTES: int = 60
+    ANSWER_CACHE_REPLAY_INTERVAL_MS: int = 20
+
+    class Config:
+        env_file = ".env.local"
+        case_sensitive = True
+        extra = "ignore"
+
+
+@lru_cache
+def get_llm_settings() -> LLMSettings:
+    return LLMSettings()
+
+
+class AggregatorSettings(BaseSettings):
+    """Settings for the sharded-mode front end (app.aggregator)"""
+    # Shard base URL -> locations it owns
+    SHARDS: dict[str, list[str]]
+    SHARD_TIMEOUT_SECONDS: float = 2.0
+
     class Config:
         env_file = ".env.local"
         case_sensitive = True
+        extra = "ignore"
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
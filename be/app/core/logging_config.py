@@ -0,0 +1,164 @@
+"""
+Application logging.
+
+Log calls on the event loop only enqueue the record: a QueueListener thread formats
+it (JSON by default) and writes it out, so neither formatting nor I/O blocks a
+request. Records are enqueued unformatted, so arguments passed %-style are only
+rendered when the record is emitted - pass values that are not mutated afterwards.
+Every record carries the id of the HTTP request (X-Request-ID) and chat turn it
+was logged under. When the queue is full records are dropped and counted rather
+than blocking. SampledLogger rate-limits high-volume log sites.
+"""
+import atexit
+import logging
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+QUEUE_SIZE = 10_000
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+turn_id_var: ContextVar[Optional[str]] = ContextVar("turn_id", default=None)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+stats = {"dropped_records": 0, "sampled_out_records": 0}
+
+
+class ContextQueueHandler(QueueHandler):
+    """Enqueues records unformatted, tagged with the current request and chat turn ids"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        request_id = request_id_var.get()
+        if request_id:
+            record.request_id = request_id
+        turn_id = turn_id_var.get()
+        if turn_id:
+            record.turn_id = turn_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            stats["dropped_records"] += 1
+
+
+class SampledLogger:
+    """
+    Lets through at most `per_second` records per log site (the message template),
+    with bursts of up to that many; the next record let through reports how many were
+    skipped in a `sampled_out` field
+    """
+
+    def __init__(self, logger: logging.Logger, per_second: float):
+        self.logger = logger
+        self.per_second = per_second
+        # template -> [tokens, last refill, skipped since last emitted]
+        self._sites: Dict[str, list] = {}
+
+    def log(self, level: int, msg: str, *args: Any) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        site = self._sites.get(msg)
+        if site is None:
+            site = self._sites[msg] = [self.per_second, now, 0]
+        site[0] = min(self.per_second, site[0] + (now - site[1]) * self.per_second)
+        site[1] = now
+        if site[0] < 1:
+            site[2] += 1
+            stats["sampled_out_records"] += 1
+            return
+        site[0] -= 1
+        skipped, site[2] = site[2], 0
+        self.logger.log(level, msg, *args, extra={"sampled_out": skipped})
+
+    def debug(self, msg: str, *args: Any) -> None:
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args: Any) -> None:
+        self.log(logging.INFO, msg, *args)
+
+
+def build_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        from pythonjsonlogger import jsonlogger
+
+        return jsonlogger.JsonFormatter(
+            "%(asctime)s %(levelname)s %(name)s %(message)s %(request_id)s %(turn_id)s",
+            rename_fields={"asctime": "time", "levelname": "level", "name": "logger"},
+        )
+    return logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [%(request_id)s %(turn_id)s] %(message)s",
+        defaults={"request_id": "-", "turn_id": "-"},
+    )
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging() -> None:
+    """Route all logging through the background queue; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(build_formatter(settings.LOG_FORMAT))
+    log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [ContextQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # uvicorn installs its own synchronous handlers; send its error and access logs through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    # httpx logs every request at INFO, which is one line per shard call in the aggregator
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def metrics() -> Dict[str, Any]:
+    return {
+        "level": logging.getLevelName(logging.getLogger().level),
+        "queued_records": _listener.queue.qsize() if _listener else 0,
+        **stats,
+    }
+
+
+class RequestContextMiddleware:
+    """Tags each HTTP request with an id (the client's X-Request-ID when valid) for logs and the response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = REQUEST_ID_HEADER.lower().encode()
+        client_id = next((v.decode("latin-1") for k, v in scope["headers"] if k == header), "")
+        request_id = client_id if _REQUEST_ID_RE.match(client_id) else uuid.uuid4().hex[:16]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(header, request_id.encode())]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,8 @@
+from datetime import date, datetime
+
+
+def json_default(value):
+    """`default=` hook for json.dumps: ISO-formats dates, which stdlib json cannot encode"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
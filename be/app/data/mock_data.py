@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 import random
 
+from app.core.config import settings
+
 # Mock pump data
 MOCK_PUMPS = [
     {
@@ -227,58 +229,9 @@ def generate_mock_sensor_data(pump_id: str):
     return data
 
 
-# Dashboard stats
-DASHBOARD_STATS = {
-    "total_pumps": 127,
-    "critical_alerts": 3,
-    "predicted_failures": 8,
-    "system_health": 94,
-}
-
-# AI suggestions for chatbot
-PUMP_DOMAIN_KNOWLEDGE = """
-You are an AI assistant for a pump monitoring and predictive maintenance system. You have access to the following information:
-
-CURRENT PUMP STATUS:
-- Total Pumps: 127 active units
-- Critical Alerts: 3 requiring immediate attention
-- Predicted Failures: 8 in next 30 days
-- System Health: 94% overall performance
-
-PUMP TYPES AND LOCATIONS:
-- Centrifugal pumps (most common)
-- Rotary pumps
-- Reciprocating pumps
-- Located across Units A, B, C, and D
-
-COMMON ISSUES AND MAINTENANCE:
-- Bearing wear and replacement
-- Temperature monitoring and cooling
-- Vibration analysis
-- Flow rate optimization
-- Pressure regulation
-- Routine inspections every 30-60 days
-- Oil changes and lubrication
-- Impeller condition checks
-
-SENSOR MONITORING:
-- Vibration sensors (normal: <3.0 mm/s)
-- Temperature sensors (normal: <90°F)
-- Pressure sensors (normal: 35-55 psi)
-- Flow rate sensors (optimal: >1000 gpm)
-- Power consumption monitoring
-
-AI PREDICTIONS:
-- Health scores calculated from multiple sensor inputs
-- Remaining Useful Life (RUL) predictions
-- Confidence levels for predictions
-- Early warning for component failures
-
-You can help users with:
-1. Interpreting pump data and sensor readings
-2. Understanding maintenance schedules
-3. Explaining AI predictions and recommendations
-4. Troubleshooting pump issues
-5. Optimizing maintenance planning
-6. Understanding alert priorities
-"""
\ No newline at end of file
+# In sharded mode this process only owns the pumps (and their alerts and logs) of its locations
+if settings.SHARD_LOCATIONS:
+    _owned = {p["id"] for p in MOCK_PUMPS if p["location"] in settings.SHARD_LOCATIONS}
+    MOCK_PUMPS[:] = [p for p in MOCK_PUMPS if p["id"] in _owned]
+    MOCK_ALERTS[:] = [a for a in MOCK_ALERTS if a["pump_id"] in _owned]
+    MOCK_MAINTENANCE_LOGS[:] = [log for log in MOCK_MAINTENANCE_LOGS if log["pump_id"] in _owned]
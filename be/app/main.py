@@ -1,18 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.logging_config import RequestContextMiddleware, REQUEST_ID_HEADER, configure_logging
 from app.api.v1.api import api_router
+from app.services.compute import get_compute_executor, loop_monitor
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    compute = get_compute_executor()
+    compute.start()
+    loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    compute.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
     description="API for Pump Monitoring Chatbot with Mock Data",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set up CORS middleware
@@ -22,7 +36,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Chat-Session-Id", "X-Chat-Turn-Id", REQUEST_ID_HEADER],
 )
+app.add_middleware(RequestContextMiddleware)
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,23 @@
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class QueryFilter(BaseModel):
+    field: str
+    op: Literal["eq", "ne", "lt", "lte", "gt", "gte", "in", "contains"] = "eq"
+    value: Any
+
+
+class QueryAggregate(BaseModel):
+    metric: str
+    fn: Literal["mean", "min", "max", "sum"] = "mean"
+
+
+class FleetQuery(BaseModel):
+    filters: List[QueryFilter] = Field(default_factory=list)
+    fields: Optional[List[str]] = None
+    sort_by: Optional[str] = None
+    order: Literal["asc", "desc"] = "desc"
+    limit: int = Field(10, ge=1)
+    group_by: Optional[str] = None
+    aggregates: List[QueryAggregate] = Field(default_factory=list)
@@ -10,9 +10,16 @@ class Message(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Server-side session to continue; chat_history is only used to seed a new session
+    session_id: Optional[str] = None
     chat_history: Optional[List[Message]] = Field(default_factory=list)
 
 
+class ChatSessionHistory(BaseModel):
+    session_id: str
+    messages: List[Message]
+
+
 class ChatSuggestion(BaseModel):
     suggestions: List[str]
 
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional, List
+from pydantic import BaseModel, field_validator
+
+
+class MaintenanceLogBase(BaseModel):
+    pump_id: str
+    task: str
+    status: str = "Pending"
+    date: datetime
+    completed_date: Optional[datetime] = None
+    technician: str = "TBD"
+    notes: Optional[str] = None
+
+
+class MaintenanceLogCreate(MaintenanceLogBase):
+    pass
+
+
+class MaintenanceLogUpdate(BaseModel):
+    task: Optional[str] = None
+    status: Optional[str] = None
+    date: Optional[datetime] = None
+    completed_date: Optional[datetime] = None
+    technician: Optional[str] = None
+    notes: Optional[str] = None
+
+    @field_validator("task", "status", "date", "technician")
+    @classmethod
+    def not_null(cls, value):
+        # These may be left out of an update, but a log cannot be without them
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class MaintenanceLog(MaintenanceLogBase):
+    id: int
+
+
+class MaintenanceLogList(BaseModel):
+    logs: List[MaintenanceLog]
+    total: int
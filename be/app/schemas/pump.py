@@ -1,5 +1,6 @@
-from typing import Optional, List
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field
 
 
 class PumpBase(BaseModel):
@@ -18,6 +19,11 @@ class PumpSensorData(BaseModel):
     power: Optional[float] = None
 
 
+class SensorReading(PumpSensorData):
+    health_score: Optional[float] = None
+    recorded_at: Optional[datetime] = None
+
+
 class PumpAIInsights(BaseModel):
     health_score: Optional[float] = None
     predicted_failure_days: Optional[int] = None
@@ -56,4 +62,19 @@ class Pump(PumpBase):
 
 class PumpList(BaseModel):
     pumps: List[Pump]
-    total: int
\ No newline at end of file
+    total: int
+
+
+class TrendRange(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    max_points: int = Field(24, ge=1, le=5000)
+    resolution: Optional[Literal["1m", "1h", "1d"]] = None
+
+
+class PumpBatchRequest(BaseModel):
+    pump_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    sections: List[Literal["details", "trends", "alerts", "maintenance"]] = Field(
+        default_factory=lambda: ["details"]
+    )
+    trends: TrendRange = Field(default_factory=TrendRange)
@@ -0,0 +1,287 @@
+"""
+Alert deduplication and correlation.
+
+Raw alert occurrences are folded into one alert per (pump_id, alert_type) while they
+keep recurring within DEDUP_WINDOW, counting occurrences and first/last-seen times
+instead of adding rows. Alerts are grouped into incidents: an alert joins the open
+incident of its pump (INCIDENT_WINDOW) or, failing that, of its location
+(LOCATION_WINDOW). Open windows are tracked with dict lookups plus an expiry heap,
+so ingesting an occurrence is O(log n).
+"""
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.data.mock_data import MOCK_ALERTS, MOCK_PUMPS
+from app.services.change_log import record_change
+from app.services.event_journal import get_event_journal, record_event
+
+logger = logging.getLogger(__name__)
+
+DEDUP_WINDOW = timedelta(minutes=30)
+INCIDENT_WINDOW = timedelta(hours=1)
+LOCATION_WINDOW = timedelta(minutes=15)
+
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+PRIORITY_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+STATUSES = ("Active", "Acknowledged", "Resolved")
+
+# (alert_type, channel, predicate, priority, message); the first matching rule per type wins
+ALERT_RULES = (
+    ("temperature", "temperature", lambda v: v > 100, "Critical", "Temperature spike detected - {value:.0f}°F"),
+    ("temperature", "temperature", lambda v: v > 90, "High", "Temperature above normal range - {value:.0f}°F"),
+    ("vibration", "vibration", lambda v: v > 4.5, "Critical", "Vibration critical - {value:.1f} mm/s"),
+    ("vibration", "vibration", lambda v: v > 3.0, "High", "Vibration levels elevated - {value:.1f} mm/s"),
+    ("pressure", "pressure", lambda v: not 35 <= v <= 55, "Medium", "Pressure outside 35-55 psi - {value:.1f} psi"),
+    ("flow", "flow_rate", lambda v: v < 1000, "Medium", "Flow rate below optimal range - {value:.0f} gpm"),
+)
+
+
+class AlertEngine:
+    def __init__(self, pump_locations: Dict[str, str]):
+        self.pump_locations = pump_locations
+        self.alerts: Dict[int, Dict[str, Any]] = {}
+        self.incidents: Dict[int, Dict[str, Any]] = {}
+        self.occurrences = 0
+        # Off while seed alerts are replayed into a journal restored from disk
+        self.journaling = True
+        self._open_alerts: Dict[Tuple[str, str], int] = {}
+        self._open_by_pump: Dict[str, int] = {}
+        self._open_by_location: Dict[str, int] = {}
+        # (expires_at, kind, key, owner id); stale entries are skipped when popped
+        self._expiry: List[Tuple[datetime, str, Any, int]] = []
+
+    def _expire(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] < now:
+            expires_at, kind, key, owner = heapq.heappop(self._expiry)
+            if kind == "alert":
+                if self._open_alerts.get(key) == owner and self.alerts[owner]["last_seen"] + DEDUP_WINDOW <= expires_at:
+                    del self._open_alerts[key]
+            else:
+                index = self._open_by_pump if kind == "pump" else self._open_by_location
+                window = INCIDENT_WINDOW if kind == "pump" else LOCATION_WINDOW
+                if index.get(key) == owner and self.incidents[owner]["last_seen"] + window <= expires_at:
+                    del index[key]
+        if len(self._expiry) > 4 * (len(self._open_alerts) + len(self._open_by_pump) + len(self._open_by_location)) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        entries = [(self.alerts[a]["last_seen"] + DEDUP_WINDOW, "alert", k, a) for k, a in self._open_alerts.items()]
+        entries += [(self.incidents[i]["last_seen"] + INCIDENT_WINDOW, "pump", k, i) for k, i in self._open_by_pump.items()]
+        entries += [(self.incidents[i]["last_seen"] + LOCATION_WINDOW, "location", k, i) for k, i in self._open_by_location.items()]
+        heapq.heapify(entries)
+        self._expiry = entries
+
+    def ingest(self, occurrence: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one raw alert occurrence into its deduplicated alert and incident"""
+        pump_id = occurrence["pump_id"]
+        seen_at = occurrence.get("timestamp") or datetime.now(timezone.utc)
+        self._expire(seen_at)
+        self.occurrences += 1
+
+        key = (pump_id, occurrence["alert_type"])
+        alert_id = self._open_alerts.get(key)
+        if alert_id is not None:
+            alert = self.alerts[alert_id]
+            alert["occurrences"] += 1
+            alert["last_seen"] = max(alert["last_seen"], seen_at)
+            escalated = PRIORITY_RANK[occurrence["priority"]] > PRIORITY_RANK[alert["priority"]]
+            if escalated:
+                alert["priority"] = occurrence["priority"]
+            for field in ("message", "remaining_useful_life", "confidence"):
+                if occurrence.get(field) is not None:
+                    alert[field] = occurrence[field]
+            if escalated:
+                self._journal(alert, f"Alert escalated to {alert['priority']} on {pump_id}", seen_at)
+        else:
+            alert_id = len(self.alerts) + 1
+            alert = {
+                "id": alert_id,
+                "pump_id": pump_id,
+                "alert_type": occurrence["alert_type"],
+                "priority": occurrence["priority"],
+                "status": occurrence.get("status") or "Active",
+                "message": occurrence["message"],
+                "remaining_useful_life": occurrence.get("remaining_useful_life"),
+                "confidence": occurrence.get("confidence"),
+                "occurrences": 1,
+                "first_seen": seen_at,
+                "last_seen": seen_at,
+                "incident_id": None,
+            }
+            self.alerts[alert_id] = alert
+            if alert["status"] != "Resolved":
+                self._open_alerts[key] = alert_id
+            self._journal(alert, f"{alert['priority']} alert on {pump_id}", seen_at)
+        heapq.heappush(self._expiry, (alert["last_seen"] + DEDUP_WINDOW, "alert", key, alert_id))
+
+        self._correlate(alert, seen_at)
+        record_change("alert", alert_id, pump_id=alert["pump_id"])
+        return alert
+
+    def _journal(self, alert: Dict[str, Any], summary: str, timestamp: Optional[datetime] = None) -> None:
+        if not self.journaling:
+            return
+        record_event(
+            "alert", f"{summary}: {alert['message']}", alert["priority"],
+            alert["pump_id"], self.pump_locations.get(alert["pump_id"]), timestamp,
+        )
+
+    def _correlate(self, alert: Dict[str, Any], seen_at: datetime) -> None:
+        pump_id = alert["pump_id"]
+        location = self.pump_locations.get(pump_id)
+        incident_id = alert["incident_id"] or self._open_by_pump.get(pump_id)
+        if incident_id is None and location:
+            incident_id = self._open_by_location.get(location)
+
+        if incident_id is None:
+            incident_id = len(self.incidents) + 1
+            self.incidents[incident_id] = {
+                "id": incident_id,
+                "location": location,
+                "pump_ids": [],
+                "alert_ids": [],
+                "priority": alert["priority"],
+                "occurrences": 0,
+                "first_seen": seen_at,
+                "last_seen": seen_at,
+            }
+        incident = self.incidents[incident_id]
+        if alert["incident_id"] is None:
+            alert["incident_id"] = incident_id
+            incident["alert_ids"].append(alert["id"])
+        if pump_id not in incident["pump_ids"]:
+            incident["pump_ids"].append(pump_id)
+        incident["occurrences"] += 1
+        incident["first_seen"] = min(incident["first_seen"], seen_at)
+        incident["last_seen"] = max(incident["last_seen"], seen_at)
+        if PRIORITY_RANK[alert["priority"]] > PRIORITY_RANK[incident["priority"]]:
+            incident["priority"] = alert["priority"]
+
+        self._open_by_pump[pump_id] = incident_id
+        heapq.heappush(self._expiry, (incident["last_seen"] + INCIDENT_WINDOW, "pump", pump_id, incident_id))
+        if location:
+            self._open_by_location[location] = incident_id
+            heapq.heappush(self._expiry, (incident["last_seen"] + LOCATION_WINDOW, "location", location, incident_id))
+
+    def set_status(self, alert_id: int, status: str) -> Optional[Dict[str, Any]]:
+        alert = self.alerts.get(alert_id)
+        if alert is None:
+            return None
+        if alert["status"] != status:
+            self._journal(alert, f"Alert {status.lower()} on {alert['pump_id']}")
+        alert["status"] = status
+        if status == "Resolved":
+            # A recurrence after resolution starts a new alert
+            key = (alert["pump_id"], alert["alert_type"])
+            if self._open_alerts.get(key) == alert_id:
+                del self._open_alerts[key]
+        record_change("alert", alert_id, pump_id=alert["pump_id"])
+        return alert
+
+    def incident_status(self, incident: Dict[str, Any]) -> str:
+        statuses = {self.alerts[a]["status"] for a in incident["alert_ids"]}
+        return next(s for s in STATUSES if s in statuses)
+
+    def list_alerts(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        pump_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Deduplicated alerts, most recently seen first"""
+        alerts = [
+            a for a in self.alerts.values()
+            if (not status or a["status"].lower() == status.lower())
+            and (not priority or a["priority"].lower() == priority.lower())
+            and (not pump_id or a["pump_id"] == pump_id)
+        ]
+        return sorted(alerts, key=lambda a: a["last_seen"], reverse=True)
+
+    def list_incidents(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        pump_id: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Incidents with their derived status, most recently seen first"""
+        incidents = []
+        for incident in self.incidents.values():
+            incident_status = self.incident_status(incident)
+            if status and incident_status.lower() != status.lower():
+                continue
+            if priority and incident["priority"].lower() != priority.lower():
+                continue
+            if pump_id and pump_id not in incident["pump_ids"]:
+                continue
+            if location and (incident["location"] or "").lower() != location.lower():
+                continue
+            incidents.append({**incident, "status": incident_status})
+        return sorted(incidents, key=lambda i: i["last_seen"], reverse=True)
+
+    def summary(self) -> Dict[str, Any]:
+        alerts = list(self.alerts.values())
+        incidents = [self.incident_status(i) for i in self.incidents.values()]
+        return {
+            "total_alerts": len(alerts),
+            "active_alerts": sum(1 for a in alerts if a["status"] == "Active"),
+            "critical_alerts": sum(1 for a in alerts if a["priority"] == "Critical"),
+            "priority_breakdown": {p.lower(): sum(1 for a in alerts if a["priority"] == p) for p in reversed(PRIORITIES)},
+            "status_breakdown": {s.lower(): sum(1 for a in alerts if a["status"] == s) for s in STATUSES},
+            "occurrences": self.occurrences,
+            "duplicates_suppressed": self.occurrences - len(alerts),
+            "incidents": {
+                "total": len(incidents),
+                "open": sum(1 for s in incidents if s != "Resolved"),
+                "status_breakdown": {s.lower(): incidents.count(s) for s in STATUSES},
+            },
+        }
+
+
+def evaluate_reading(pump: Dict[str, Any], values: Dict[str, float], recorded_at: datetime) -> List[Dict[str, Any]]:
+    """Raw alert occurrences for a sensor reading that is outside the normal ranges"""
+    occurrences = []
+    fired = set()
+    for alert_type, channel, predicate, priority, message in ALERT_RULES:
+        value = values.get(channel)
+        if value is None or alert_type in fired or not predicate(value):
+            continue
+        fired.add(alert_type)
+        occurrences.append({
+            "pump_id": pump["id"],
+            "alert_type": alert_type,
+            "priority": priority,
+            "message": message.format(value=value),
+            "remaining_useful_life": pump.get("predicted_failure_days"),
+            "confidence": pump.get("confidence"),
+            "timestamp": recorded_at,
+        })
+    return occurrences
+
+
+_engine: Optional[AlertEngine] = None
+
+
+def get_alert_engine() -> AlertEngine:
+    global _engine
+    if _engine is None:
+        _engine = AlertEngine({p["id"]: p["location"] for p in MOCK_PUMPS})
+        now = datetime.now(timezone.utc)
+        # A journal restored from disk already holds the seed alerts from its first run
+        _engine.journaling = not get_event_journal().restored
+        # Seed alerts are spread out so each starts its own incident
+        for i, alert in enumerate(reversed(MOCK_ALERTS)):
+            _engine.ingest({**alert, "timestamp": now - timedelta(hours=2 * (len(MOCK_ALERTS) - i))})
+        _engine.journaling = True
+    return _engine
+
+
+def record_reading_alerts(pump: Dict[str, Any], values: Dict[str, float], recorded_at: datetime) -> None:
+    engine = get_alert_engine()
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    engine.pump_locations.setdefault(pump["id"], pump.get("location"))
+    for occurrence in evaluate_reading(pump, values, recorded_at):
+        engine.ingest(occurrence)
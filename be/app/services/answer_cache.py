@@ -0,0 +1,240 @@
+"""
+Semantic cache of LLM chat answers.
+
+A question is normalized into the pumps and locations it refers to (by id or by name,
+so "P003" and "Transfer Pump C2" are the same key), its qualifiers (negations,
+numbers, time words and direction words such as highest/lowest or increase/decrease,
+which flip or narrow the meaning) and the set of its remaining content words, with
+stop words dropped, common synonyms folded together and plurals stripped. Cached answers are bucketed by entities and qualifiers, so any
+difference in those is a miss; within a bucket the closest question wins when the
+word overlap (Dice coefficient, every word weighted alike) reaches the threshold.
+An answer is only reused while the data it was computed from is unchanged: the
+change-log versions of the referenced pumps (of all pumps at a referenced location,
+or of the whole fleet when nothing is referenced) must match those read when the
+question was first asked.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import get_llm_settings
+from app.data.mock_data import MOCK_PUMPS
+from app.services.change_log import get_change_log
+from app.services.intent_router import resolve_entities
+
+# Questions whose best match falls this far below the threshold count as near misses
+NEAR_MISS_MARGIN = 0.15
+
+_STOP_WORDS = frozenset(
+    "a an the is are was were be been being am do does did of for to in on at by with about from over "
+    "what what's whats why how which who when where tell me show give please can could you i we "
+    "our my it it's its this that these those there any some have has having get getting going "
+    "currently current right now".split()
+)
+_SYNONYMS = {
+    **dict.fromkeys(("wrong", "issue", "issues", "problem", "problems", "fault", "faults", "failing", "broken", "matter",
+                     "critical", "unhealthy"), "problem"),
+    **dict.fromkeys(("temp", "temperatures", "hot", "overheating"), "temperature"),
+    **dict.fromkeys(("vibrations", "vibrating", "shaking"), "vibration"),
+    **dict.fromkeys(("alarm", "alarms", "alerts"), "alert"),
+    **dict.fromkeys(("pumps",), "pump"),
+    **dict.fromkeys(("fix", "fixed", "repair", "repairs", "repaired", "service", "servicing", "serviced"), "maintenance"),
+}
+_NEGATIONS = frozenset("not no never none nothing without cannot nor".split())
+_NUMBER_WORDS = {
+    word: str(i) for i, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve".split()
+    )
+}
+_TIME_WORDS = {
+    **dict.fromkeys(("last", "past", "previous", "prior"), "last"),
+    **dict.fromkeys(("next", "upcoming", "coming"), "next"),
+    **dict.fromkeys(("recent", "recently", "latest", "newest"), "recent"),
+    **dict.fromkeys(("min", "mins", "minute"), "minute"),
+    **dict.fromkeys(("hr", "hrs", "hour", "hourly"), "hour"),
+    **dict.fromkeys(("day", "daily"), "day"),
+    **dict.fromkeys(("week", "weekly"), "week"),
+    **dict.fromkeys(("month", "monthly"), "month"),
+    **dict.fromkeys(("year", "yearly", "annual"), "year"),
+    **{word: word for word in "second today tonight yesterday tomorrow ago since until before after "
+                              "overnight morning evening night shift weekend".split()},
+}
+# Direction and extremum words: swapping one for its opposite flips the question
+_DIRECTION_WORDS = {
+    **dict.fromkeys(("highest", "max", "maximum", "peak", "top"), "highest"),
+    **dict.fromkeys(("lowest", "minimum", "bottom"), "lowest"),
+    **dict.fromkeys(("high", "higher"), "high"),
+    **dict.fromkeys(("low", "lower"), "low"),
+    **dict.fromkeys(("most", "more", "greater"), "more"),
+    **dict.fromkeys(("least", "less", "fewer", "fewest"), "less"),
+    **dict.fromkeys(("above", "exceeding", "exceed", "exceeds"), "above"),
+    **dict.fromkeys(("below", "under", "beneath"), "below"),
+    **dict.fromkeys(("increase", "increasing", "increased", "raise", "raising", "rising", "rise", "grow", "growing"),
+                    "increase"),
+    **dict.fromkeys(("decrease", "decreasing", "decreased", "reduce", "reducing", "reduced", "falling", "fall",
+                     "drop", "dropping", "declining", "decline"), "decrease"),
+    **dict.fromkeys(("best", "better"), "best"),
+    **dict.fromkeys(("worst", "worse"), "worst"),
+    **dict.fromkeys(("fastest", "faster"), "faster"),
+    **dict.fromkeys(("slowest", "slower"), "slower"),
+    **dict.fromkeys(("first", "earliest", "oldest"), "first"),
+}
+
+_QUALIFIERS = frozenset(_TIME_WORDS.values()) | frozenset(_DIRECTION_WORDS.values()) | {"not"}
+
+# (pump ids, locations, qualifiers): questions only match within the same bucket
+BucketKey = Tuple[FrozenSet[str], FrozenSet[str], FrozenSet[str]]
+
+
+def _normalize(word: str) -> str:
+    if word in _NEGATIONS or word.endswith("n't"):
+        return "not"
+    word = _NUMBER_WORDS.get(word, word)
+    word = _SYNONYMS.get(word, word)
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return _TIME_WORDS.get(word) or _DIRECTION_WORDS.get(word, word)
+
+
+def _is_qualifier(word: str) -> bool:
+    return word in _QUALIFIERS or any(c.isdigit() for c in word)
+
+
+def _overlap(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+@dataclass
+class Question:
+    entities: Tuple[FrozenSet[str], FrozenSet[str]]
+    qualifiers: FrozenSet[str]
+    words: FrozenSet[str]
+    # Data versions read when the question was asked
+    versions: Tuple[int, ...]
+
+    @property
+    def bucket(self) -> BucketKey:
+        return (*self.entities, self.qualifiers)
+
+
+@dataclass
+class CachedAnswer:
+    key: int
+    question: Question
+    answer: str
+    created: float
+    hits: int = 0
+
+
+def _data_versions(pump_ids: FrozenSet[str], locations: FrozenSet[str]) -> Tuple[int, ...]:
+    log = get_change_log()
+    if not pump_ids and not locations:
+        return (log.version,)
+    versions = [log.pump_version(pump_id) for pump_id in sorted(pump_ids)]
+    for location in sorted(locations):
+        versions.append(max((log.pump_version(p["id"]) for p in MOCK_PUMPS if p["location"] == location), default=0))
+    return tuple(versions)
+
+
+def parse_question(message: str) -> Question:
+    pump_ids, locations, words = resolve_entities(message)
+    normalized = {_normalize(w) for w in words if w not in _STOP_WORDS}
+    qualifiers = frozenset(w for w in normalized if _is_qualifier(w))
+    entities = (frozenset(pump_ids), frozenset(locations))
+    return Question(
+        entities=entities,
+        qualifiers=qualifiers,
+        words=frozenset(normalized - qualifiers),
+        versions=_data_versions(*entities),
+    )
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        # Least recently used first; buckets hold the same entries grouped by entities and qualifiers
+        self.entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self.buckets: Dict[BucketKey, List[CachedAnswer]] = {}
+        self._next_key = 0
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "stale": 0, "near_misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _remove(self, entry: CachedAnswer) -> None:
+        del self.entries[entry.key]
+        bucket = self.buckets[entry.question.bucket]
+        bucket.remove(entry)
+        if not bucket:
+            del self.buckets[entry.question.bucket]
+
+    def lookup(self, question: Question) -> Optional[CachedAnswer]:
+        """The most similar cached answer at or above the threshold whose data is unchanged"""
+        self.stats["lookups"] += 1
+        now = time.time()
+        best, best_score = None, 0.0
+        for entry in list(self.buckets.get(question.bucket, ())):
+            if now - entry.created > self.ttl_seconds:
+                self._remove(entry)
+                continue
+            score = _overlap(question.words, entry.question.words)
+            if score > best_score:
+                best, best_score = entry, score
+
+        if best is None or best_score < self.threshold:
+            self.stats["misses"] += 1
+            if best is not None and best_score >= self.threshold - NEAR_MISS_MARGIN:
+                self.stats["near_misses"] += 1
+            return None
+        if best.question.versions != question.versions:
+            self.stats["stale"] += 1
+            self.stats["misses"] += 1
+            self._remove(best)
+            return None
+        self.stats["hits"] += 1
+        best.hits += 1
+        self.entries.move_to_end(best.key)
+        return best
+
+    def store(self, question: Question, answer: str) -> None:
+        """Cache an answer, replacing any earlier answer to the same normalized question"""
+        for entry in [e for e in self.buckets.get(question.bucket, ()) if e.question.words == question.words]:
+            self._remove(entry)
+        self._next_key += 1
+        entry = CachedAnswer(self._next_key, question, answer, time.time())
+        self.buckets.setdefault(question.bucket, []).append(entry)
+        self.entries[entry.key] = entry
+        self.stats["stores"] += 1
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries.values())))
+            self.stats["evictions"] += 1
+
+    def metrics(self) -> Dict[str, float]:
+        answered = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / answered, 3) if answered else 0.0,
+            "entries": len(self.entries),
+            "threshold": self.threshold,
+        }
+
+
+_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        llm_settings = get_llm_settings()
+        _cache = AnswerCache(
+            llm_settings.ANSWER_CACHE_SIZE,
+            llm_settings.ANSWER_CACHE_THRESHOLD,
+            llm_settings.ANSWER_CACHE_TTL_MINUTES * 60,
+        )
+    return _cache
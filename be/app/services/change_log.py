@@ -0,0 +1,87 @@
+"""
+Versioned change log for delta sync.
+
+Every change to a pump, alert or maintenance log takes the next version number and
+moves that entity to the end of an ordered index, so the log is compacted as it goes:
+only the latest change per entity is kept, and `changes_since(v)` walks back from the
+newest entry, costing time proportional to what changed rather than to the fleet.
+At most MAX_ENTRIES entities are tracked; older entries are dropped and clients
+behind the oldest retained version are told to resync.
+
+Changes are also attributed to the pump they concern (a pump's alerts and maintenance
+logs count as its data), so `pump_version(pump_id)` tells whether anything about a
+pump changed since an earlier reading of it.
+
+Versions start from the microsecond clock at process start, so they keep increasing
+across restarts and a client holding a version from a previous process is behind
+the floor and resyncs.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_ENTRIES = 100_000
+KINDS = ("pump", "alert", "maintenance")
+
+EntityKey = Tuple[str, Any]
+
+
+class ChangeLog:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = time.time_ns() // 1000
+        # Changes with versions <= floor may have been compacted away
+        self.floor = self.version
+        # (kind, id) -> (version, op), ordered by version
+        self.entries: "OrderedDict[EntityKey, Tuple[int, str]]" = OrderedDict()
+        # pump id -> version of the latest change to the pump or its alerts and maintenance
+        self.pump_versions: Dict[str, int] = {}
+
+    def record(self, kind: str, entity_id: Any, op: str = "upsert", pump_id: Optional[str] = None) -> int:
+        self.version += 1
+        key = (kind, entity_id)
+        self.entries[key] = (self.version, op)
+        self.entries.move_to_end(key)
+        if kind == "pump":
+            pump_id = entity_id
+        if pump_id is not None:
+            self.pump_versions[pump_id] = self.version
+        while len(self.entries) > self.max_entries:
+            _, (dropped, _) = self.entries.popitem(last=False)
+            self.floor = dropped
+        return self.version
+
+    def pump_version(self, pump_id: str) -> int:
+        """Version of the latest change concerning a pump (0 if none since start)"""
+        return self.pump_versions.get(pump_id, 0)
+
+    def resync_required(self, since: int) -> bool:
+        return since < self.floor or since > self.version
+
+    def changes_since(
+        self, since: int, kinds: Optional[List[str]] = None, limit: Optional[int] = None
+    ) -> List[Tuple[int, str, Any, str]]:
+        """(version, kind, id, op) after `since` in version order, at most `limit`"""
+        changes = []
+        for key in reversed(self.entries):
+            version, op = self.entries[key]
+            if version <= since:
+                break
+            if not kinds or key[0] in kinds:
+                changes.append((version, key[0], key[1], op))
+        changes.reverse()
+        return changes[:limit] if limit is not None else changes
+
+
+_change_log: Optional[ChangeLog] = None
+
+
+def get_change_log() -> ChangeLog:
+    global _change_log
+    if _change_log is None:
+        _change_log = ChangeLog()
+    return _change_log
+
+
+def record_change(kind: str, entity_id: Any, op: str = "upsert", pump_id: Optional[str] = None) -> None:
+    get_change_log().record(kind, entity_id, op, pump_id)
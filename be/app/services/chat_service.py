@@ -1,18 +1,32 @@
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any, AsyncGenerator
-from datetime import datetime
-
-from openai import AsyncOpenAI
-from app.schemas.chat import Message
-from app.data.mock_data import (
-    MOCK_PUMPS, MOCK_MAINTENANCE_LOGS, MOCK_ALERTS, 
-    DASHBOARD_STATS, PUMP_DOMAIN_KNOWLEDGE, generate_mock_sensor_data
+import re
+from typing import List, Dict, Any, AsyncGenerator, Optional
+from datetime import datetime, timedelta, timezone
+
+from app.data.mock_data import MOCK_PUMPS
+from app.services.alert_engine import get_alert_engine
+from app.services.sensor_service import query_trends, flatten_points
+from app.services.fleet_analytics import get_fleet_analytics, METRICS as ANALYTICS_METRICS
+from app.services.pump_search import get_search_index
+from app.services.fleet_query import (
+    run_fleet_query, QueryError, NUMERIC_FIELDS, CATEGORICAL_FIELDS, MAX_RESULT_ROWS
 )
-from app.core.config import settings
+from app.schemas.analytics import FleetQuery
+from pydantic import ValidationError
+from app.services.maintenance_service import get_maintenance_store
+from app.services.dashboard_service import get_dashboard_stats
+from app.services.failure_forecast import get_failure_forecaster
+from app.services.intent_router import route as route_intent, render as render_intent
+from app.services.answer_cache import get_answer_cache, parse_question
+from app.services.knowledge_index import get_knowledge_index, format_context
+from app.core.serialization import json_default
+from app.core.config import get_llm_settings
+from app.services.chat_stream import ChatEvent
+from app.services.chat_sessions import ChatSession, get_session_store
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 # Current date for context
 CURRENT_DATE = datetime.now().strftime("%d %b %Y")
@@ -20,8 +34,6 @@ CURRENT_DATE = datetime.now().strftime("%d %b %Y")
 SYSTEM_PROMPT = f"""
 You are an AI assistant for a pump monitoring and predictive maintenance system. The current date is {CURRENT_DATE}.
 
-{PUMP_DOMAIN_KNOWLEDGE}
-
 Your role is to help answer questions about:
 1. Pump status and performance data
 2. Maintenance schedules and history
@@ -37,7 +49,10 @@ Available functions:
 - get_system_alerts: Get current system alerts
 - get_dashboard_stats: Get overall system statistics
 - get_pump_trends: Get sensor data trends for a pump
-- search_pumps: Search pumps by location, type, or status
+- search_pumps: Search pumps by name, ID, issue, location, type, or status
+- compare_pump_to_peers: Percentile ranks and z-scores of a pump against the fleet and its peers
+- query_pumps: Filter, sort, top-k, group and aggregate the fleet (prefer this over get_all_pumps)
+- forecast_failures: Monte Carlo forecast of pump failures within a horizon (expected count, percentile bands, risk per location)
 
 Instructions:
 - Always be helpful and provide actionable insights
@@ -46,6 +61,7 @@ Instructions:
 - Explain AI predictions with confidence levels
 - Prioritize critical issues and safety concerns
 - Use technical terminology appropriately but explain complex concepts clearly
+- Use the reference material provided with a question (sensor ranges, maintenance practice) when it is relevant, and live data from the functions for current values
 
 Answer in a professional and informative manner, focusing on operational insights and recommendations.
 """
@@ -115,9 +131,27 @@ AVAILABLE_FUNCTIONS = [
             "required": [],
         },
     },
+    {
+        "name": "forecast_failures",
+        "description": "Forecast how many pumps will fail within a horizon, treating each pump's remaining useful life as uncertain according to its prediction confidence: expected failures, 5th/50th/95th percentile failure counts, probability of any failure and risk per location, plus the highest-risk pumps. Use it for maintenance planning and 'how many failures next month' questions.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "horizon_days": {
+                    "type": "number",
+                    "description": "Forecast horizon in days (default 30)",
+                },
+                "location": {
+                    "type": "string",
+                    "description": "Optional location to report on, e.g. 'Unit A'",
+                },
+            },
+            "required": [],
+        },
+    },
     {
         "name": "get_pump_trends",
-        "description": "Get sensor data trends for a specific pump over the last 24 hours",
+        "description": "Get sensor data trends for a specific pump (last 24 hours by default)",
         "parameters": {
             "type": "object",
             "properties": {
@@ -125,16 +159,24 @@ AVAILABLE_FUNCTIONS = [
                     "type": "string",
                     "description": "The pump ID for which to get trend data",
                 },
+                "days": {
+                    "type": "number",
+                    "description": "Optional number of days to look back (default 1)",
+                },
             },
             "required": ["pump_id"],
         },
     },
     {
         "name": "search_pumps",
-        "description": "Search pumps by location, type, status, or other criteria",
+        "description": "Search pumps by free text (ID, name, location, type, predicted issue; typo tolerant, ranked by relevance) and/or by location, type, or status",
         "parameters": {
             "type": "object",
             "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Free-text search (e.g., 'transfer pump', 'bearing wear', 'P003')",
+                },
                 "location": {
                     "type": "string",
                     "description": "Filter by location (e.g., 'Unit A', 'Unit B')",
@@ -151,11 +193,93 @@ AVAILABLE_FUNCTIONS = [
             "required": [],
         },
     },
+    {
+        "name": "compare_pump_to_peers",
+        "description": "Compare a pump's sensor and efficiency metrics with the fleet and its peer groups (same pump type, same location): percentile ranks, z-scores and peer statistics. Use this to judge whether a pump is unusual.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "pump_id": {
+                    "type": "string",
+                    "description": "The pump ID to compare",
+                },
+                "metrics": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(ANALYTICS_METRICS)},
+                    "description": "Optional subset of metrics to compare (default: all)",
+                },
+            },
+            "required": ["pump_id"],
+        },
+    },
+    {
+        "name": "query_pumps",
+        "description": f"Run a structured query over the fleet and get back only the compact result (max {MAX_RESULT_ROWS} rows/groups). Use it for rankings ('three Unit B pumps with the worst efficiency'), filtered lists and per-group aggregates instead of fetching all pumps.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "filters": {
+                    "type": "array",
+                    "description": "Conditions that must all hold",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "field": {"type": "string", "enum": list(NUMERIC_FIELDS + CATEGORICAL_FIELDS)},
+                            "op": {"type": "string", "enum": ["eq", "ne", "lt", "lte", "gt", "gte", "in", "contains"]},
+                            "value": {"description": "Value to compare with (a list for 'in')"},
+                        },
+                        "required": ["field", "op", "value"],
+                    },
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(NUMERIC_FIELDS + CATEGORICAL_FIELDS)},
+                    "description": "Fields to return per pump (default: id, name, location, status plus sort/filter fields)",
+                },
+                "sort_by": {
+                    "type": "string",
+                    "description": "Numeric field to sort pumps by; for grouped queries 'count' or an aggregate name like 'mean_efficiency'",
+                },
+                "order": {"type": "string", "enum": ["asc", "desc"], "description": "Sort order (default desc)"},
+                "limit": {"type": "integer", "description": f"Number of rows or groups to return (default 10, max {MAX_RESULT_ROWS})"},
+                "group_by": {"type": "string", "enum": ["location", "pump_type", "status"], "description": "Group pumps and return per-group aggregates"},
+                "aggregates": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "metric": {"type": "string", "enum": list(NUMERIC_FIELDS)},
+                            "fn": {"type": "string", "enum": ["mean", "min", "max", "sum"]},
+                        },
+                        "required": ["metric", "fn"],
+                    },
+                    "description": "Aggregates computed per group (count is always included)",
+                },
+            },
+            "required": [],
+        },
+    },
 ]
 
 
+# Word-group chunks for streaming locally rendered answers
+_LOCAL_CHUNK_RE = re.compile(r"(?:\S+\s*){1,6}|\s+")
+
+_client = None
+
+
+def get_client():
+    """Return the shared OpenAI client, importing the SDK on first use"""
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+
+        _client = AsyncOpenAI(api_key=get_llm_settings().OPENAI_API_KEY)
+    return _client
+
+
 async def execute_function(function_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
-    logger.info(f"Executing function: {function_name} with args: {args}")
+    logger.info("Executing function %s with args %s", function_name, args)
 
     if function_name == "get_pump_details":
         pump_id = args.get("pump_id")
@@ -179,22 +303,20 @@ async def execute_function(function_name: str, args: Dict[str, Any]) -> Dict[str
 
     elif function_name == "get_pump_maintenance":
         pump_id = args.get("pump_id")
-        maintenance = [log for log in MOCK_MAINTENANCE_LOGS if log["pump_id"] == pump_id]
+        store = get_maintenance_store()
+        maintenance, _ = store.query(pump_id=pump_id)
         return {
             "pump_id": pump_id,
             "maintenance_logs": maintenance,
-            "count": len(maintenance)
+            "count": len(maintenance),
+            "summary": store.pump_summary.get(pump_id)
         }
 
     elif function_name == "get_system_alerts":
         status_filter = args.get("status")
         priority_filter = args.get("priority")
         
-        alerts = MOCK_ALERTS
-        if status_filter:
-            alerts = [a for a in alerts if a["status"] == status_filter]
-        if priority_filter:
-            alerts = [a for a in alerts if a["priority"] == priority_filter]
+        alerts = get_alert_engine().list_alerts(status=status_filter, priority=priority_filter)
         
         return {
             "alerts": alerts,
@@ -203,155 +325,287 @@ async def execute_function(function_name: str, args: Dict[str, Any]) -> Dict[str
         }
 
     elif function_name == "get_dashboard_stats":
-        return DASHBOARD_STATS
+        return await get_dashboard_stats()
+
+    elif function_name == "forecast_failures":
+        horizon_days = float(args.get("horizon_days") or 30)
+        if horizon_days <= 0:
+            return {"error": "horizon_days must be positive"}
+        location = args.get("location")
+        if not location:
+            return await get_failure_forecaster().forecast(horizon_days)
+        forecast = await get_failure_forecaster().forecast_location(location, horizon_days)
+        return forecast or {"error": f"No pumps in location {location}"}
 
     elif function_name == "get_pump_trends":
         pump_id = args.get("pump_id")
-        sensor_data = generate_mock_sensor_data(pump_id)
+        if not any(p["id"] == pump_id for p in MOCK_PUMPS):
+            return {"error": f"Pump with ID {pump_id} not found"}
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=float(args.get("days") or 1))
+        trends = query_trends(pump_id, start, end, max_points=24)
+        sensor_data = [
+            {**point, "recorded_at": point["recorded_at"].isoformat()}
+            for point in flatten_points(pump_id, trends["points"])
+        ]
         return {
             "pump_id": pump_id,
+            "resolution": trends["resolution"],
             "sensor_data": sensor_data,
             "data_points": len(sensor_data)
         }
 
     elif function_name == "search_pumps":
+        query = args.get("query")
         location = args.get("location")
         pump_type = args.get("pump_type")
         status = args.get("status")
         
-        pumps = MOCK_PUMPS
-        if location:
-            pumps = [p for p in pumps if location.lower() in p["location"].lower()]
-        if pump_type:
-            pumps = [p for p in pumps if pump_type.lower() in p["pump_type"].lower()]
-        if status:
-            pumps = [p for p in pumps if p["status"] == status]
-        
+        results, total = get_search_index().search(query, location, pump_type, status, limit=50)
         return {
-            "pumps": pumps,
-            "count": len(pumps),
-            "filters": {"location": location, "pump_type": pump_type, "status": status}
+            "pumps": [pump for pump, _ in results],
+            "count": total,
+            "filters": {"query": query, "location": location, "pump_type": pump_type, "status": status}
         }
 
+    elif function_name == "compare_pump_to_peers":
+        pump_id = args.get("pump_id")
+        metrics = [m for m in args.get("metrics") or [] if m in ANALYTICS_METRICS]
+        comparison = get_fleet_analytics().compare(pump_id, metrics or None)
+        if comparison is None:
+            return {"error": f"Pump with ID {pump_id} not found"}
+        return {
+            "pump_id": pump_id,
+            "metrics": comparison
+        }
+
+    elif function_name == "query_pumps":
+        try:
+            return run_fleet_query(FleetQuery(**args))
+        except (ValidationError, QueryError) as e:
+            return {"error": f"Invalid query: {e}"}
+
     else:
         return {"error": f"Function {function_name} is not implemented"}
 
 
 async def stream_chat_message(
-    user_message: str, chat_history: List[Message]
-) -> AsyncGenerator[str, None]:
-    logger.info(f"Starting chat message stream with user message: {user_message}")
-    
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        *[
-            {"role": msg.role, "content": msg.content, "name": msg.name}
-            for msg in chat_history
-            if msg.name
-        ],
-        *[
-            {"role": msg.role, "content": msg.content}
-            for msg in chat_history
-            if not msg.name
-        ],
-        {"role": "user", "content": user_message},
+    user_message: str, session: ChatSession
+) -> AsyncGenerator[ChatEvent, None]:
+    """
+    Events for one assistant turn: ("token", text), ("tool_start", {...}),
+    ("tool_end", {...}). SSE framing and the done/error events are added by chat_stream.
+    The turn's messages, including tool calls and results, are appended to the session.
+    """
+    logger.debug("Starting chat message stream with user message: %s", user_message)
+    turn_messages: List[Dict[str, Any]] = [{"role": "user", "content": user_message}]
+    try:
+        # Simple lookups are answered locally without an LLM round trip
+        intent = route_intent(user_message)
+        if intent:
+            yield "tool_start", {"name": intent.function_name, "args": intent.args, "local": True}
+            result = await execute_function(intent.function_name, intent.args)
+            yield "tool_end", {"name": intent.function_name, "ok": "error" not in result}
+            answer = render_intent(intent, result)
+            if answer is not None:
+                logger.info("Answered locally via intent %s (confidence %s)", intent.name, intent.confidence)
+                turn_messages.extend(
+                    _tool_messages(f"local_{intent.name}", intent.function_name, intent.args, result)
+                )
+                turn_messages.append({"role": "assistant", "content": answer})
+                for chunk in _LOCAL_CHUNK_RE.findall(answer):
+                    yield "token", chunk
+                return
+
+        # Earlier answers are reused for similar questions about unchanged data. Questions
+        # that name no pump or location may lean on the conversation, so they are only
+        # cached at the start of a session.
+        cache = get_answer_cache()
+        question = parse_question(user_message) if cache.enabled else None
+        if question and not any(question.entities) and session.messages:
+            question = None
+        cached = cache.lookup(question) if question else None
+        if cached:
+            logger.info("Answered from cache (question seen %d times)", cached.hits + 1)
+            turn_messages.append({"role": "assistant", "content": cached.answer})
+            interval = get_llm_settings().ANSWER_CACHE_REPLAY_INTERVAL_MS / 1000
+            for chunk in _LOCAL_CHUNK_RE.findall(cached.answer):
+                yield "token", chunk
+                await asyncio.sleep(interval)
+            return
+
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, *session.messages]
+
+        # Retrieved reference material goes right before the question so the system
+        # prompt and history stay a stable, cacheable prefix
+        knowledge = get_knowledge_index().search(user_message, top_k=get_llm_settings().KNOWLEDGE_TOP_K)
+        if knowledge:
+            logger.debug("Retrieved %d knowledge chunks", len(knowledge))
+            messages.append({
+                "role": "system",
+                "content": f"Reference material relevant to the next question:\n\n{format_context(knowledge)}",
+            })
+        messages.append({"role": "user", "content": user_message})
+
+        async for event in _stream_with_function_call_handling(messages, turn_messages):
+            yield event
+        answer = turn_messages[-1]
+        if question and answer["role"] == "assistant" and answer["content"]:
+            cache.store(question, answer["content"])
+    finally:
+        session.extend(turn_messages)
+        get_session_store().save(session)
+
+
+def _tool_messages(call_id: str, function_name: str, args: Dict[str, Any], result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": function_name, "arguments": json.dumps(args)},
+            }],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": call_id,
+            "content": json.dumps(result, default=json_default),
+        },
     ]
-    
-    async for token in _stream_with_function_call_handling(messages):
-        yield token
+
+
+# Accounting for LLM turns cut short by a client disconnect (served by /chat/metrics).
+# Stream deltas are counted as tokens; skipped follow-up requests are estimated at ~4 chars/token.
+stream_stats = {
+    "llm_turns_completed": 0,
+    "llm_turns_cancelled": 0,
+    "completion_tokens": 0,
+    "tokens_streamed_before_cancel": 0,
+    "follow_up_requests_avoided": 0,
+    "estimated_tokens_saved": 0,
+}
+DEFAULT_COMPLETION_TOKENS = 300
+
+
+def _record_cancelled(received: int, skipped_follow_up: Optional[List[Dict[str, Any]]]) -> None:
+    completed = stream_stats["llm_turns_completed"]
+    expected = stream_stats["completion_tokens"] / completed if completed else DEFAULT_COMPLETION_TOKENS
+    saved = max(0, int(expected) - received)
+    if skipped_follow_up is not None:
+        saved += len(json.dumps(skipped_follow_up, default=json_default)) // 4
+        stream_stats["follow_up_requests_avoided"] += 1
+    stream_stats["llm_turns_cancelled"] += 1
+    stream_stats["tokens_streamed_before_cancel"] += received
+    stream_stats["estimated_tokens_saved"] += saved
+    logger.info("Chat turn cancelled after %d streamed tokens; ~%d tokens saved", received, saved)
 
 
 async def _stream_with_function_call_handling(
-    messages: List[Dict[str, Any]],
-) -> AsyncGenerator[str, None]:
+    messages: List[Dict[str, Any]], turn_messages: List[Dict[str, Any]],
+) -> AsyncGenerator[ChatEvent, None]:
+    llm_settings = get_llm_settings()
     request_params = {
-        "model": settings.OPENAI_MODEL,
+        "model": llm_settings.OPENAI_MODEL,
         "messages": messages,
         "stream": True,
         "tools": [{"type": "function", "function": func} for func in AVAILABLE_FUNCTIONS],
         "tool_choice": "auto",
     }
     
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    client = get_client()
     logger.debug("Initiating streaming chat completion with function call handling")
-    
-    stream = await client.chat.completions.create(**request_params)
 
     function_name = None
     function_args = []
+    call_id = None
     capturing_function = False
+    content = []
+    received = 0
+    stream = None
+    follow_up_sent = False
 
-    async for chunk in stream:
-        delta = chunk.choices[0].delta
-
-        if delta.tool_calls:
-            for tool_call in delta.tool_calls:
-                if tool_call.function.name:
-                    function_name = tool_call.function.name
-                    capturing_function = True
-                    logger.info(f"Detected function call: {function_name}")
-                if tool_call.function.arguments:
-                    function_args.append(tool_call.function.arguments)
-            continue
-
-        if delta.content:
-            if capturing_function:
-                continue
-            yield delta.content
-
-    if function_name:
-        args_str = "".join(function_args).strip()
-        logger.info(f"Executing function {function_name} with arguments: {args_str}")
-        
-        try:
-            parsed_args = json.loads(args_str) if args_str else {}
-        except json.JSONDecodeError:
-            parsed_args = {}
-            logger.error("Failed to parse function call arguments.")
-        
-        function_result = await execute_function(function_name, parsed_args)
-        logger.debug(f"Function {function_name} executed with result")
+    try:
+        stream = await client.chat.completions.create(**request_params)
 
-        messages.append({
-            "role": "assistant",
-            "content": None,
-            "tool_calls": [{
-                "id": "call_1",
-                "type": "function",
-                "function": {
-                    "name": function_name,
-                    "arguments": args_str,
-                }
-            }]
-        })
-        
-        messages.append({
-            "role": "tool",
-            "tool_call_id": "call_1",
-            "content": json.dumps(function_result),
-        })
-        
-        logger.info("Sending second request to get final response after function execution")
-        second_request_params = {
-            "model": settings.OPENAI_MODEL,
-            "messages": messages,
-            "stream": True,
-            "tools": [{"type": "function", "function": func} for func in AVAILABLE_FUNCTIONS],
-            "tool_choice": "auto",
-        }
-        
-        second_stream = await client.chat.completions.create(**second_request_params)
-        async for chunk in second_stream:
+        async for chunk in stream:
             delta = chunk.choices[0].delta
+            received += 1
+
+            if delta.tool_calls:
+                for tool_call in delta.tool_calls:
+                    if tool_call.id:
+                        call_id = tool_call.id
+                    if tool_call.function.name:
+                        function_name = tool_call.function.name
+                        capturing_function = True
+                        logger.debug("Detected function call: %s", function_name)
+                    if tool_call.function.arguments:
+                        function_args.append(tool_call.function.arguments)
+                continue
+
             if delta.content:
-                yield delta.content
+                if capturing_function:
+                    continue
+                content.append(delta.content)
+                yield "token", delta.content
+
+        if function_name:
+            args_str = "".join(function_args).strip()
+            logger.debug("Function call arguments for %s: %s", function_name, args_str)
+            
+            try:
+                parsed_args = json.loads(args_str) if args_str else {}
+            except json.JSONDecodeError:
+                parsed_args = {}
+                logger.error("Failed to parse function call arguments.")
+            
+            yield "tool_start", {"name": function_name, "args": parsed_args}
+            function_result = await execute_function(function_name, parsed_args)
+            yield "tool_end", {"name": function_name, "ok": "error" not in function_result}
+            logger.debug("Function %s executed", function_name)
+
+            tool_messages = _tool_messages(call_id or "call_1", function_name, parsed_args, function_result)
+            messages.extend(tool_messages)
+            turn_messages.extend(tool_messages)
+            
+            logger.info("Sending second request to get final response after function execution")
+            second_request_params = {
+                "model": llm_settings.OPENAI_MODEL,
+                "messages": messages,
+                "stream": True,
+                "tools": [{"type": "function", "function": func} for func in AVAILABLE_FUNCTIONS],
+                "tool_choice": "auto",
+            }
+            
+            follow_up_sent = True
+            stream = await client.chat.completions.create(**second_request_params)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta
+                received += 1
+                if delta.content:
+                    content.append(delta.content)
+                    yield "token", delta.content
+
+        stream_stats["llm_turns_completed"] += 1
+        stream_stats["completion_tokens"] += received
+    except asyncio.CancelledError:
+        _record_cancelled(received, messages if function_name and not follow_up_sent else None)
+        raise
+    finally:
+        # Abort the upstream HTTP stream instead of leaving it to drain
+        if stream is not None:
+            await stream.response.aclose()
+        if content:
+            turn_messages.append({"role": "assistant", "content": "".join(content)})
 
 
 async def generate_chat_suggestions(
-    user_message: str, chat_history: List[Message]
+    user_message: str, chat_history: List[Dict[str, str]]
 ) -> Dict[str, Any]:
     logger.info("Generating follow-up chat suggestions")
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    client = get_client()
 
     suggestion_prompt = f"""
 You are an AI assistant for a pump monitoring system. Analyze the conversation and suggest 3-5 relevant follow-up questions.
@@ -382,20 +636,20 @@ Return only valid JSON in this format:
 
     messages = [
         {"role": "system", "content": "You are a helpful assistant that only responds with valid JSON."},
-        *[{"role": msg.role, "content": msg.content} for msg in chat_history],
+        *chat_history,
         {"role": "user", "content": suggestion_prompt},
     ]
 
     logger.debug("Sending request to generate chat suggestions")
     response = await client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
+        model=get_llm_settings().OPENAI_MODEL,
         messages=messages,
         temperature=0.7,
         response_format={"type": "json_object"}
     )
 
     suggestions_str = response.choices[0].message.content.strip()
-    logger.debug(f"Received suggestions response: {suggestions_str}")
+    logger.debug("Received suggestions response: %s", suggestions_str)
     
     try:
         suggestions_json = json.loads(suggestions_str)
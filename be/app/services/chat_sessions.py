@@ -0,0 +1,158 @@
+"""
+Server-side chat sessions.
+
+The canonical conversation - user and assistant messages plus the tool-call and
+tool-result messages of earlier turns - lives here, keyed by session id, so clients
+only send the new message. Sessions are kept in an LRU bounded by CHAT_MAX_SESSIONS,
+expire after CHAT_SESSION_TTL_MINUTES of inactivity, keep at most MAX_HISTORY_MESSAGES
+messages each and, when CHAT_SESSION_DIR is set, are written to disk after every turn
+so they survive eviction and restarts.
+"""
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_llm_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_HISTORY_MESSAGES = 40
+MAX_TOOL_RESULT_CHARS = 4000
+
+_SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ChatSession:
+    def __init__(self, session_id: str, messages: Optional[List[Dict[str, Any]]] = None, updated: Optional[float] = None):
+        self.session_id = session_id
+        self.messages: List[Dict[str, Any]] = messages or []
+        self.updated = updated or time.time()
+
+    def extend(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            if message["role"] == "tool" and len(message["content"]) > MAX_TOOL_RESULT_CHARS:
+                message = {**message, "content": message["content"][:MAX_TOOL_RESULT_CHARS] + " ...[truncated]"}
+            self.messages.append(message)
+        self._trim()
+        self.updated = time.time()
+
+    def _trim(self) -> None:
+        """Drop the oldest turns; history always starts at a user message so tool pairs stay intact"""
+        if len(self.messages) <= MAX_HISTORY_MESSAGES:
+            return
+        start = len(self.messages) - MAX_HISTORY_MESSAGES
+        while start < len(self.messages) and self.messages[start]["role"] != "user":
+            start += 1
+        del self.messages[:start]
+
+    def transcript(self) -> List[Dict[str, str]]:
+        """User/assistant text only, as shown in the chat panel"""
+        return [
+            {"role": m["role"], "content": m["content"]}
+            for m in self.messages
+            if m["role"] in ("user", "assistant") and m.get("content")
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"session_id": self.session_id, "updated": self.updated, "messages": self.messages}
+
+
+class ChatSessionStore:
+    def __init__(self, max_sessions: int, ttl_seconds: float, directory: Optional[Path] = None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.directory = directory
+        self.sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        if directory:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Optional[Path]:
+        return self.directory / f"{session_id}.json" if self.directory else None
+
+    def _expired(self, session: ChatSession) -> bool:
+        return time.time() - session.updated > self.ttl_seconds
+
+    def _evict(self) -> None:
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        for session_id in [sid for sid, s in self.sessions.items() if self._expired(s)]:
+            self.delete(session_id)
+
+    def _load(self, session_id: str) -> Optional[ChatSession]:
+        path = self._path(session_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text())
+            session = ChatSession(session_id, data["messages"], data["updated"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable chat session {path}: {e}")
+            return None
+        if self._expired(session):
+            path.unlink(missing_ok=True)
+            return None
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        if not _SESSION_ID_RE.match(session_id):
+            return None
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self._load(session_id)
+            if session is None:
+                return None
+            self.sessions[session_id] = session
+        elif self._expired(session):
+            self.delete(session_id)
+            return None
+        self.sessions.move_to_end(session_id)
+        self._evict()
+        return session
+
+    def create(self, messages: Optional[List[Dict[str, Any]]] = None) -> ChatSession:
+        session = ChatSession(uuid.uuid4().hex)
+        if messages:
+            session.extend(messages)
+        self.sessions[session.session_id] = session
+        self._evict()
+        return session
+
+    def save(self, session: ChatSession) -> None:
+        path = self._path(session.session_id)
+        if path is None:
+            return
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(session.to_dict()))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist chat session {session.session_id}: {e}")
+
+    def delete(self, session_id: str) -> bool:
+        found = self.sessions.pop(session_id, None) is not None
+        path = self._path(session_id) if _SESSION_ID_RE.match(session_id) else None
+        if path and path.exists():
+            path.unlink(missing_ok=True)
+            found = True
+        return found
+
+
+_store: Optional[ChatSessionStore] = None
+
+
+def get_session_store() -> ChatSessionStore:
+    global _store
+    if _store is None:
+        llm_settings = get_llm_settings()
+        _store = ChatSessionStore(
+            llm_settings.CHAT_MAX_SESSIONS,
+            llm_settings.CHAT_SESSION_TTL_MINUTES * 60,
+            Path(llm_settings.CHAT_SESSION_DIR) if llm_settings.CHAT_SESSION_DIR else None,
+        )
+    return _store
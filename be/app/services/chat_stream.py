@@ -0,0 +1,213 @@
+"""
+Server-sent event framing for chat turns.
+
+A chat turn's event source (token / tool_start / tool_end / done / error) is drained
+by a background producer that coalesces adjacent tokens into one frame when
+COALESCE_MAX_CHARS or COALESCE_INTERVAL is reached and appends numbered frames to a
+per-turn replay buffer. Connections follow that buffer, sending heartbeat comments
+while nothing new arrives (e.g. while tools run), so a client that reconnects with
+`Last-Event-ID: <turn_id>:<seq>` picks up right after the last frame it saw.
+
+When the last connection following an unfinished turn goes away and nobody resumes
+it within RESUME_GRACE seconds, the producer is cancelled, which cancels the event
+source (and with it the upstream LLM stream and any tool call in progress).
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from app.core.logging_config import SampledLogger, turn_id_var
+from app.core.serialization import json_default
+
+logger = logging.getLogger(__name__)
+token_logger = SampledLogger(logger, per_second=5)
+
+ChatEvent = Tuple[str, Any]
+
+COALESCE_MAX_CHARS = 256
+COALESCE_INTERVAL = 0.05
+HEARTBEAT_INTERVAL = 10.0
+RETRY_MS = 2000
+RESUME_GRACE = 5.0
+
+MAX_TURNS = 256
+TURN_TTL = 300.0
+MAX_FRAMES_PER_TURN = 4096
+
+
+def format_frame(event: str, data: Any, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=json_default)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ChatTurn:
+    """Replay buffer for one chat turn's frames"""
+
+    def __init__(self, turn_id: str):
+        self.turn_id = turn_id
+        self.frames: List[Tuple[int, str]] = []
+        self.next_seq = 1
+        self.done = False
+        self.updated = time.monotonic()
+        self._changed = asyncio.Event()
+        self.producer: Optional[asyncio.Task] = None
+        self.listeners = 0
+        self._abandon_timer: Optional[asyncio.TimerHandle] = None
+
+    def append(self, event: str, data: Any) -> None:
+        seq = self.next_seq
+        self.next_seq += 1
+        self.frames.append((seq, format_frame(event, data, f"{self.turn_id}:{seq}")))
+        if len(self.frames) > MAX_FRAMES_PER_TURN:
+            del self.frames[: len(self.frames) - MAX_FRAMES_PER_TURN]
+        if event in ("done", "error"):
+            self.done = True
+        self.updated = time.monotonic()
+        self._changed.set()
+
+    async def follow(self, after_seq: int = 0) -> AsyncIterator[str]:
+        """Frames after after_seq, then live frames until the turn ends; heartbeats while idle"""
+        self.listeners += 1
+        if self._abandon_timer:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if self.frames and self.frames[0][0] > after_seq + 1:
+                yield format_frame("error", {"message": "Replay window exceeded, resend the message"})
+                return
+            while True:
+                # Cleared before the snapshot so frames appended after it still wake the wait
+                self._changed.clear()
+                pending = [(seq, frame) for seq, frame in self.frames if seq > after_seq]
+                if pending:
+                    after_seq = pending[-1][0]
+                    yield "".join(frame for _, frame in pending)
+                    # More frames (or the end of the turn) may have arrived while suspended
+                    continue
+                if self.done:
+                    return
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.listeners -= 1
+            if self.listeners == 0 and not self.done:
+                logger.info("Client left chat turn %s; cancelling in %ss unless resumed", self.turn_id, RESUME_GRACE)
+                self._abandon_timer = asyncio.get_running_loop().call_later(
+                    RESUME_GRACE, self._cancel_if_abandoned
+                )
+
+    def _cancel_if_abandoned(self) -> None:
+        self._abandon_timer = None
+        if self.listeners == 0 and not self.done and self.producer and not self.producer.done():
+            logger.info("Cancelling abandoned chat turn %s", self.turn_id)
+            self.producer.cancel()
+
+
+async def _produce(turn: ChatTurn, source: AsyncIterator[ChatEvent]) -> None:
+    """Drain the event source into the turn buffer, coalescing adjacent tokens"""
+    # Everything logged while producing this turn (including tool calls) carries its id
+    turn_id_var.set(turn.turn_id)
+    pending: List[str] = []
+    pending_chars = 0
+    first_pending_at = 0.0
+
+    def flush():
+        nonlocal pending_chars
+        if pending:
+            token_logger.debug("Flushing %d coalesced tokens (%d chars)", len(pending), pending_chars)
+            turn.append("token", {"text": "".join(pending)})
+            pending.clear()
+            pending_chars = 0
+
+    iterator = source.__aiter__()
+    next_event = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, first_pending_at + COALESCE_INTERVAL - time.monotonic())
+            done, _ = await asyncio.wait({next_event}, timeout=timeout)
+            if not done:
+                flush()
+                continue
+            try:
+                event, data = next_event.result()
+            except StopAsyncIteration:
+                break
+            next_event = asyncio.ensure_future(iterator.__anext__())
+
+            if event == "token":
+                if not pending:
+                    first_pending_at = time.monotonic()
+                pending.append(data)
+                pending_chars += len(data)
+                if pending_chars >= COALESCE_MAX_CHARS:
+                    flush()
+            else:
+                flush()
+                turn.append(event, data)
+        flush()
+        turn.append("done", {"turn_id": turn.turn_id})
+    except asyncio.CancelledError:
+        next_event.cancel()
+        flush()
+        turn.append("error", {"message": "Response cancelled"})
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming chat turn {turn.turn_id}: {str(e)}")
+        flush()
+        turn.append("error", {"message": "Error generating response"})
+
+
+class ChatTurnRegistry:
+    """Recent turns by id, evicted by age and count"""
+
+    def __init__(self):
+        self.turns: "OrderedDict[str, ChatTurn]" = OrderedDict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self.turns:
+            turn_id, turn = next(iter(self.turns.items()))
+            expired = turn.done and now - turn.updated > TURN_TTL
+            if len(self.turns) <= MAX_TURNS and not expired:
+                break
+            if turn.producer and not turn.producer.done():
+                turn.producer.cancel()
+            del self.turns[turn_id]
+
+    def start(self, source: AsyncIterator[ChatEvent]) -> ChatTurn:
+        self._evict()
+        turn = ChatTurn(uuid.uuid4().hex)
+        turn.producer = asyncio.create_task(_produce(turn, source))
+        self.turns[turn.turn_id] = turn
+        return turn
+
+    def get(self, turn_id: str) -> Optional[ChatTurn]:
+        self._evict()
+        return self.turns.get(turn_id)
+
+
+turn_registry = ChatTurnRegistry()
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """'<turn_id>:<seq>' -> (turn_id, seq); None if absent or malformed"""
+    if not value or ":" not in value:
+        return None
+    turn_id, _, seq = value.rpartition(":")
+    try:
+        return turn_id, int(seq)
+    except ValueError:
+        return None
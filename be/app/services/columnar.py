@@ -0,0 +1,97 @@
+"""
+Compact columnar binary encoding for chart data.
+
+A payload is a 12-byte preamble (magic "PMCF", uint16 version, uint16 reserved,
+uint32 header length), a UTF-8 JSON header, then one contiguous little-endian array
+per column. The header lists each column's name, dtype ("<f4", "<f8" or "<i8"),
+row count and byte offset from the start of the data section, which begins at the
+first 8-byte boundary after the header; every column is 8-byte aligned too, so a
+browser can wrap each one in a typed array over the response's ArrayBuffer without
+copying. Columns marked "delta" (timestamps) hold the first value followed by the
+differences between consecutive values, and are restored with a running sum.
+
+Kept free of application state so compute workers can import it cheaply.
+"""
+import json
+import struct
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.core.serialization import json_default
+
+MEDIA_TYPE = "application/vnd.pump-monitor.columnar"
+MAGIC = b"PMCF"
+VERSION = 1
+PREAMBLE = struct.Struct("<4sHHI")
+ALIGN = 8
+FLOAT_DTYPES = {"f4": np.dtype("<f4"), "f8": np.dtype("<f8")}
+TIMESTAMP_DTYPE = np.dtype("<i8")
+
+
+class ColumnarError(Exception):
+    pass
+
+
+def accepts(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for the columnar encoding"""
+    return bool(accept) and any(
+        part.split(";")[0].strip().lower() == MEDIA_TYPE for part in accept.split(",")
+    )
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGN
+
+
+def encode(
+    columns: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None, delta: Iterable[str] = ("ts",)
+) -> bytes:
+    """Encode equal-length 1-D arrays; `delta` columns must be integers"""
+    delta = set(delta)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    if any(len(values) != rows for values in columns.values()):
+        raise ColumnarError("All columns must have the same length")
+    specs = []
+    blobs = []
+    offset = 0
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if name in delta:
+            values = np.diff(values.astype(TIMESTAMP_DTYPE), prepend=TIMESTAMP_DTYPE.type(0))
+        else:
+            values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        blob = values.tobytes()
+        specs.append({
+            "name": name,
+            "dtype": values.dtype.str,
+            "length": len(values),
+            "offset": offset,
+            **({"encoding": "delta"} if name in delta else {}),
+        })
+        blobs.append(blob + b"\0" * _padding(len(blob)))
+        offset += len(blobs[-1])
+
+    header = json.dumps(
+        {"rows": rows, "columns": specs, "meta": meta or {}}, default=json_default, separators=(",", ":")
+    ).encode()
+    header += b" " * _padding(PREAMBLE.size + len(header))
+    return PREAMBLE.pack(MAGIC, VERSION, 0, len(header)) + header + b"".join(blobs)
+
+
+def decode(payload: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """(meta, columns) of an encoded payload; plain columns are read-only views of it"""
+    if len(payload) < PREAMBLE.size:
+        raise ColumnarError("Payload is shorter than the preamble")
+    magic, version, _, header_size = PREAMBLE.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ColumnarError(f"Not a version {VERSION} columnar payload")
+    header = json.loads(payload[PREAMBLE.size:PREAMBLE.size + header_size])
+    data_start = PREAMBLE.size + header_size
+    columns = {}
+    for spec in header["columns"]:
+        values = np.frombuffer(
+            payload, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=data_start + spec["offset"]
+        )
+        columns[spec["name"]] = np.cumsum(values) if spec.get("encoding") == "delta" else values
+    return header["meta"], columns
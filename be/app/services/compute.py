@@ -0,0 +1,197 @@
+"""
+Process-pool offload for CPU-bound work, and event-loop lag monitoring.
+
+ComputeExecutor.run(fn, arrays, *args) runs fn(*arrays, *args) inline when the input
+is smaller than OFFLOAD_MIN_ROWS (or than the caller's offload_min_bytes, for work
+that scales with elements rather than rows), and otherwise in a worker process: the
+arrays are copied once into shared memory and the worker maps them as NumPy views, so
+no row data is pickled. fn must be a module-level function and should return something
+compact (bytes, a small array, a summary dict). The pool is started and shut down by
+the application lifespan; COMPUTE_WORKERS=0 keeps everything inline.
+
+LoopLagMonitor measures how late a periodic timer fires, which is how long the event
+loop was blocked; both are reported by /system/metrics.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OFFLOAD_MIN_ROWS = 4096
+
+LAG_INTERVAL = 0.1
+LAG_SAMPLES = 600
+LAG_STALL_MS = 100.0
+
+ArraySpec = Tuple[str, Tuple[int, ...], Any]
+
+
+def _run_shared(fn: Callable[..., Any], specs: List[ArraySpec], args: Tuple[Any, ...]) -> Any:
+    """Worker side: map the shared blocks as arrays and call fn"""
+    blocks = [SharedMemory(name=name) for name, _, _ in specs]
+    try:
+        arrays = [
+            np.ndarray(shape, dtype=np.dtype(descr), buffer=block.buf)
+            for block, (_, shape, descr) in zip(blocks, specs)
+        ]
+        result = fn(*arrays, *args)
+        del arrays
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class ComputeExecutor:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"inline_jobs": 0, "offloaded_jobs": 0, "inline_ms": 0.0, "offloaded_ms": 0.0}
+
+    def start(self) -> None:
+        if self.workers > 0 and self.pool is None:
+            # Workers are spawned on first use, so starting the pool costs nothing at boot
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+            logger.info(f"Compute pool ready with {self.workers} workers")
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def run(
+        self, fn: Callable[..., Any], arrays: Sequence[np.ndarray], *args: Any, offload_min_bytes: Optional[int] = None
+    ) -> Any:
+        if offload_min_bytes is None:
+            small = max((len(a) for a in arrays), default=0) < OFFLOAD_MIN_ROWS
+        else:
+            small = sum(a.nbytes for a in arrays) < offload_min_bytes
+        started = time.perf_counter()
+        if self.pool is None or small:
+            result = fn(*arrays, *args)
+            self.stats["inline_jobs"] += 1
+            self.stats["inline_ms"] += (time.perf_counter() - started) * 1000
+            await asyncio.sleep(0)
+            return result
+
+        blocks = []
+        try:
+            specs = []
+            for array in arrays:
+                block = SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                descr = array.dtype.descr if array.dtype.names else array.dtype.str
+                specs.append((block.name, array.shape, descr))
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _run_shared, fn, specs, args
+            )
+        except BrokenProcessPool:
+            logger.error("Compute pool broke; restarting it and running the job inline")
+            self.pool = None
+            self.start()
+            return fn(*arrays, *args)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        self.stats["offloaded_jobs"] += 1
+        self.stats["offloaded_ms"] += (time.perf_counter() - started) * 1000
+        return result
+
+    async def imap(
+        self, fn: Callable[..., Any], jobs: Iterable[Tuple[Sequence[np.ndarray], Tuple[Any, ...]]]
+    ) -> AsyncIterator[Any]:
+        """Results of run() for each (arrays, args) job in order, keeping up to one job per worker in flight"""
+        window = self.workers if self.pool else 1
+        pending: deque = deque()
+        try:
+            for arrays, args in jobs:
+                pending.append(asyncio.ensure_future(self.run(fn, arrays, *args)))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self.pool else 0,
+            "offload_min_rows": OFFLOAD_MIN_ROWS,
+            **{k: round(v, 1) if isinstance(v, float) else v for k, v in self.stats.items()},
+        }
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LAG_INTERVAL):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=LAG_SAMPLES)
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= LAG_STALL_MS:
+                self.stalls += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        recent = sorted(self.samples)
+
+        def pick(q: float) -> Optional[float]:
+            return round(recent[min(len(recent) - 1, int(len(recent) * q))], 2) if recent else None
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": len(recent),
+            "lag_p50_ms": pick(0.5),
+            "lag_p95_ms": pick(0.95),
+            "lag_max_recent_ms": round(recent[-1], 2) if recent else None,
+            "lag_max_ms": round(self.max_lag_ms, 2),
+            "stall_threshold_ms": LAG_STALL_MS,
+            "stalls": self.stalls,
+        }
+
+
+_executor: Optional[ComputeExecutor] = None
+loop_monitor = LoopLagMonitor()
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """The shared executor; inline-only until the lifespan starts its pool"""
+    global _executor
+    if _executor is None:
+        _executor = ComputeExecutor(settings.COMPUTE_WORKERS)
+    return _executor
@@ -0,0 +1,42 @@
+"""
+Fleet statistics shared by the dashboard and the chat assistant.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from app.data.mock_data import MOCK_PUMPS
+from app.services.alert_engine import get_alert_engine
+from app.services.failure_forecast import get_failure_forecaster
+from app.services.maintenance_service import get_maintenance_store
+
+PREDICTION_HORIZON_DAYS = 30
+
+
+async def get_dashboard_stats() -> Dict[str, Any]:
+    total_pumps = len(MOCK_PUMPS)
+    critical_alerts = get_alert_engine().summary()["critical_alerts"]
+    forecast = await get_failure_forecaster().forecast(PREDICTION_HORIZON_DAYS)
+
+    # Calculate average health score
+    health_scores = [p["health_score"] for p in MOCK_PUMPS if p["health_score"]]
+    avg_health = sum(health_scores) / len(health_scores) if health_scores else 0
+
+    maintenance = get_maintenance_store()
+    now = datetime.now(timezone.utc)
+
+    return {
+        "total_pumps": total_pumps,
+        "critical_alerts": critical_alerts,
+        # Expected failures within the horizon, weighing each prediction by its confidence
+        "predicted_failures": round(forecast["expected_failures"]),
+        "system_health": round(avg_health, 1),
+        "pump_status_breakdown": {
+            "normal": len([p for p in MOCK_PUMPS if p["status"] == "Normal"]),
+            "warning": len([p for p in MOCK_PUMPS if p["status"] == "Warning"]),
+            "critical": len([p for p in MOCK_PUMPS if p["status"] == "Critical"])
+        },
+        "maintenance": {
+            "overdue": maintenance.count_open(end=now),
+            "due_next_7_days": maintenance.count_open(start=now, end=now + timedelta(days=7))
+        }
+    }
@@ -0,0 +1,244 @@
+"""
+Append-only journal of fleet events, backing the dashboard activity feed.
+
+Alert creation, escalation and status changes, maintenance changes, pump status
+changes and failure prediction re-scores are appended as numbered events. The newest
+EVENT_JOURNAL_CAPACITY events are kept in a ring buffer, with sorted lists of event
+ids per type, location and pump, so a newest-first page from a cursor is one
+bisection plus a walk over the page (with several filters, the smallest matching
+index is walked). When EVENT_JOURNAL_DIR is set every event is also appended to
+JSON-lines segments of SEGMENT_EVENTS events; these serve pages older than the ring
+and survive restarts.
+"""
+import atexit
+import json
+import logging
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from app.core.config import settings
+from app.data.mock_data import MOCK_PUMPS
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("alert", "maintenance", "status", "prediction")
+SEGMENT_EVENTS = 10_000
+# A page reads at most this many on-disk segments; the cursor continues from there
+MAX_SEGMENTS_PER_PAGE = 4
+
+# Pump fields whose changes are journaled: status, then the failure prediction
+_WATCHED_FIELDS = ("status", "predicted_failure_days", "confidence", "predicted_issue")
+_STATUS_PRIORITIES = {"Critical": "Critical", "Warning": "Medium"}
+
+IndexKey = Tuple[str, str]
+
+
+def _matches(event: Dict[str, Any], filters: List[IndexKey]) -> bool:
+    return all(event[field] == value for field, value in filters)
+
+
+class EventJournal:
+    def __init__(self, capacity: int, directory: Optional[Path] = None):
+        self.capacity = capacity
+        self.ring: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.indexes: Dict[IndexKey, List[int]] = {}
+        self.directory = directory
+        self.next_id = 1
+        self._segment: Optional[TextIO] = None
+        self._segment_events = 0
+        if directory:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.next_id = self._last_stored_id() + 1
+        # Events before this id were written by an earlier process and are only on disk
+        self.first_id = self.next_id
+        self.pump_states: Dict[str, Tuple[Any, ...]] = {
+            p["id"]: tuple(p.get(f) for f in _WATCHED_FIELDS) for p in MOCK_PUMPS
+        }
+
+    @property
+    def restored(self) -> bool:
+        """Whether events from an earlier process were found in EVENT_JOURNAL_DIR"""
+        return self.first_id > 1
+
+    @property
+    def oldest_id(self) -> int:
+        """Oldest event id still in the ring"""
+        return max(self.first_id, self.next_id - self.capacity)
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        return sorted((int(p.stem), p) for p in self.directory.glob("*.jsonl"))
+
+    def _last_stored_id(self) -> int:
+        segments = self._segments()
+        if not segments:
+            return 0
+        first, path = segments[-1]
+        for line in reversed(path.read_text().splitlines()):
+            try:
+                return json.loads(line)["id"]
+            except (ValueError, KeyError):
+                continue  # a partly written last line
+        return first - 1
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        if self._segment is None or self._segment_events >= SEGMENT_EVENTS:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment = open(self.directory / f"{event['id']}.jsonl", "a")
+            self._segment_events = 0
+        self._segment.write(json.dumps({**event, "timestamp": event["timestamp"].isoformat()}) + "\n")
+        self._segment_events += 1
+
+    def flush(self) -> None:
+        if self._segment is not None:
+            self._segment.flush()
+
+    def _trim_indexes(self) -> None:
+        oldest = self.oldest_id
+        for key in list(self.indexes):
+            ids = self.indexes[key]
+            del ids[:bisect_left(ids, oldest)]
+            if not ids:
+                del self.indexes[key]
+
+    def append(
+        self,
+        event_type: str,
+        message: str,
+        priority: str = "Info",
+        pump_id: Optional[str] = None,
+        location: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        event = {
+            "id": self.next_id,
+            "type": event_type,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+            "message": message,
+            "priority": priority,
+            "pump_id": pump_id,
+            "location": location,
+        }
+        self.next_id += 1
+        self.ring[event["id"] % self.capacity] = event
+        for key in (("type", event_type), ("location", location), ("pump_id", pump_id)):
+            if key[1] is not None:
+                self.indexes.setdefault(key, []).append(event["id"])
+        # Ids that fell out of the ring are dropped from the indexes once per ring turn
+        if event["id"] % self.capacity == 0:
+            self._trim_indexes()
+        if self.directory:
+            self._write(event)
+        return event
+
+    def _page_from_ring(self, before: int, limit: int, filters: List[IndexKey]) -> List[Dict[str, Any]]:
+        oldest = self.oldest_id
+        if filters:
+            ids = min((self.indexes.get(key, []) for key in filters), key=len)
+            candidates = (ids[i] for i in range(bisect_left(ids, before) - 1, -1, -1))
+        else:
+            candidates = iter(range(min(before, self.next_id) - 1, 0, -1))
+        page = []
+        for event_id in candidates:
+            if event_id < oldest or len(page) == limit:
+                break
+            event = self.ring[event_id % self.capacity]
+            if _matches(event, filters):
+                page.append(event)
+        return page
+
+    def _page_from_segments(self, before: int, limit: int, filters: List[IndexKey]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Events from disk, newest first, and the cursor to continue from if segments remain"""
+        self.flush()
+        page: List[Dict[str, Any]] = []
+        segments = [s for s in self._segments() if s[0] < before]
+        for read, (first, path) in enumerate(reversed(segments)):
+            if read == MAX_SEGMENTS_PER_PAGE:
+                return page, before
+            events = []
+            for line in path.read_text().splitlines():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event["id"] < before and _matches(event, filters):
+                    events.append(event)
+            for event in reversed(events):
+                event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+                page.append(event)
+                if len(page) == limit:
+                    return page, event["id"]
+            before = first
+        return page, None
+
+    def page(
+        self,
+        cursor: Optional[int] = None,
+        limit: int = 20,
+        event_type: Optional[str] = None,
+        location: Optional[str] = None,
+        pump_id: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Events older than `cursor` (newest first when None) and the cursor of the next page"""
+        before = cursor or self.next_id
+        filters = [(f, v) for f, v in (("type", event_type), ("location", location), ("pump_id", pump_id)) if v]
+        page = self._page_from_ring(before, limit, filters)
+        if len(page) == limit:
+            return page, page[-1]["id"]
+        if not self.directory:
+            return page, None
+        older, next_cursor = self._page_from_segments(
+            min(before, self.oldest_id), limit - len(page), filters
+        )
+        page.extend(older)
+        return page, next_cursor
+
+    def pump_updated(self, pump: Dict[str, Any]) -> None:
+        """Journal a pump's status change or failure prediction re-score"""
+        state = tuple(pump.get(f) for f in _WATCHED_FIELDS)
+        previous = self.pump_states.get(pump["id"])
+        self.pump_states[pump["id"]] = state
+        if previous is None or previous == state:
+            return
+        location = pump.get("location")
+        if previous[0] != state[0]:
+            self.append(
+                "status", f"{pump['id']} status changed from {previous[0]} to {state[0]}",
+                _STATUS_PRIORITIES.get(state[0], "Info"), pump["id"], location,
+            )
+        if previous[1:] != state[1:]:
+            days, confidence = state[1:3]
+            self.append(
+                "prediction",
+                f"Failure prediction for {pump['id']} re-scored: {days} days to failure ({confidence}% confidence)",
+                "Info", pump["id"], location,
+            )
+
+
+_journal: Optional[EventJournal] = None
+
+
+def get_event_journal() -> EventJournal:
+    global _journal
+    if _journal is None:
+        directory = Path(settings.EVENT_JOURNAL_DIR) if settings.EVENT_JOURNAL_DIR else None
+        _journal = EventJournal(settings.EVENT_JOURNAL_CAPACITY, directory)
+        atexit.register(_journal.flush)
+    return _journal
+
+
+def record_event(
+    event_type: str,
+    message: str,
+    priority: str = "Info",
+    pump_id: Optional[str] = None,
+    location: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> None:
+    get_event_journal().append(event_type, message, priority, pump_id, location, timestamp)
+
+
+def pump_updated(pump: Dict[str, Any]) -> None:
+    get_event_journal().pump_updated(pump)
@@ -0,0 +1,244 @@
+"""
+Monte Carlo failure-risk forecast for the fleet.
+
+Each pump's remaining useful life is lognormal with its `predicted_failure_days` as the
+median and a spread that widens as the prediction's `confidence` drops, so a pump's
+chance of failing within a horizon is the lognormal CDF at the horizon. Pumps fail
+independently, so each location's failure count follows a Poisson binomial
+distribution; it is computed exactly with an FFT over pumps pooled by failure
+probability, and the simulations draw every location's count from it in one batch
+(fleet bands come from the summed draws). Drawing per pump instead would take billions
+of samples for 100k simulations over a large fleet. Forecasts are cached per (horizon, simulations) until a pump's prediction,
+confidence or location changes.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.data.mock_data import MOCK_PUMPS
+from app.services.compute import get_compute_executor
+
+logger = logging.getLogger(__name__)
+
+# Lognormal sigma at 100% and at 0% confidence
+SIGMA_MIN = 0.1
+SIGMA_MAX = 1.0
+DEFAULT_CONFIDENCE = 50.0
+
+DEFAULT_SIMULATIONS = 10_000
+MAX_SIMULATIONS = 100_000
+PROBABILITY_BINS = 256
+BANDS = (5, 50, 95)
+TOP_RISK_PUMPS = 10
+CACHE_SIZE = 32
+SEED = 1234
+
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    # Abramowitz & Stegun 7.1.26 (|error| < 1.5e-7); avoids a SciPy dependency
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+def failure_probabilities(median_days: np.ndarray, confidence: np.ndarray, horizon_days: float) -> np.ndarray:
+    """P(RUL <= horizon) per pump"""
+    sigma = SIGMA_MIN + (SIGMA_MAX - SIGMA_MIN) * (1.0 - np.clip(confidence, 0.0, 100.0) / 100.0)
+    with np.errstate(divide="ignore"):
+        z = (np.log(horizon_days) - np.log(np.maximum(median_days, 1e-9))) / sigma
+    return np.where(median_days <= 0, 1.0, _normal_cdf(z))
+
+
+def count_distribution(probabilities: np.ndarray) -> np.ndarray:
+    """Exact distribution of the number of failures among independent pumps (Poisson binomial)"""
+    bins = np.rint(probabilities * (PROBABILITY_BINS - 1)).astype(np.int64)
+    cell_pumps = np.bincount(bins, minlength=PROBABILITY_BINS)
+    # Pooling pumps of nearly equal probability at their mean keeps the expected count exact
+    cell_probability = np.bincount(bins, weights=probabilities, minlength=PROBABILITY_BINS) / np.maximum(cell_pumps, 1)
+    used = cell_pumps > 0
+    size = len(probabilities) + 1
+    # Characteristic function: product over cells of (1 - p + p e^{iw})^n, inverted by FFT
+    omega = np.exp(-2j * np.pi * np.arange(size) / size)
+    with np.errstate(divide="ignore"):
+        log_terms = np.log(1 - cell_probability[used, None] + cell_probability[used, None] * omega[None, :])
+    pmf = np.fft.ifft(np.exp(cell_pumps[used] @ log_terms)).real
+    pmf = np.clip(pmf, 0.0, None)
+    return pmf / pmf.sum()
+
+
+def simulate_counts(
+    probabilities: np.ndarray, location_codes: np.ndarray, n_locations: int, simulations: int, seed: int
+) -> Dict[str, np.ndarray]:
+    """Percentiles of simulated failure counts for the fleet and per location"""
+    rng = np.random.default_rng(seed)
+    by_location = np.zeros((simulations, n_locations))
+    for code in range(n_locations):
+        members = probabilities[location_codes == code]
+        if not len(members):
+            continue
+        cdf = np.cumsum(count_distribution(members))
+        by_location[:, code] = np.minimum(np.searchsorted(cdf, rng.random(simulations) * cdf[-1]), len(members))
+    return {
+        "fleet": np.percentile(by_location.sum(axis=1), BANDS),
+        "by_location": np.percentile(by_location, BANDS, axis=0),
+    }
+
+
+def _bands(values: Iterable[float]) -> Dict[str, int]:
+    return {f"p{q}": int(round(v)) for q, v in zip(BANDS, values)}
+
+
+class FailureForecaster:
+    def __init__(self, pumps: List[Dict[str, Any]]):
+        self.pumps = list(pumps)
+        self.locations: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.inputs: List[Tuple[float, float, str]] = []
+        self.cache: "OrderedDict[Tuple[float, int], Dict[str, Any]]" = OrderedDict()
+        # Bumped whenever the inputs change, so a forecast computed across a change is not cached
+        self.generation = 0
+        for pump in pumps:
+            self.index[pump["id"]] = len(self.inputs)
+            self.inputs.append(self._inputs(pump))
+        self._build_arrays()
+
+    @staticmethod
+    def _inputs(pump: Dict[str, Any]) -> Tuple[float, float, str]:
+        confidence = pump.get("confidence")
+        return (
+            float(pump["predicted_failure_days"]),
+            float(confidence if confidence is not None else DEFAULT_CONFIDENCE),
+            pump.get("location") or "Unknown",
+        )
+
+    def _location_code(self, location: str) -> int:
+        if location not in self.locations:
+            self.locations.append(location)
+        return self.locations.index(location)
+
+    def _build_arrays(self) -> None:
+        self.median_days = np.array([i[0] for i in self.inputs], dtype=np.float64)
+        self.confidence = np.array([i[1] for i in self.inputs], dtype=np.float64)
+        codes = {location: self._location_code(location) for location in {i[2] for i in self.inputs}}
+        self.location_codes = np.array([codes[i[2]] for i in self.inputs], dtype=np.int32)
+
+    def upsert(self, pump: Dict[str, Any]) -> None:
+        """Track a new or changed pump; forecasts are only invalidated when their inputs change"""
+        inputs = self._inputs(pump)
+        position = self.index.get(pump["id"])
+        if position is not None and self.inputs[position] == inputs:
+            return
+        if position is None:
+            self.index[pump["id"]] = len(self.inputs)
+            self.inputs.append(inputs)
+            self.pumps.append(pump)
+            self._build_arrays()
+        else:
+            self.inputs[position] = inputs
+            self.median_days[position], self.confidence[position] = inputs[0], inputs[1]
+            self.location_codes[position] = self._location_code(inputs[2])
+        self.generation += 1
+        self.cache.clear()
+
+    def _highest_risk(self, probabilities: np.ndarray, candidates: np.ndarray) -> List[Dict[str, Any]]:
+        top = candidates[np.argsort(-probabilities[candidates], kind="stable")[:TOP_RISK_PUMPS]]
+        return [
+            {
+                "id": self.pumps[i]["id"],
+                "name": self.pumps[i].get("name"),
+                "location": self.inputs[i][2],
+                "failure_probability": round(float(probabilities[i]), 4),
+                "predicted_failure_days": self.inputs[i][0],
+                "confidence": self.inputs[i][1],
+            }
+            for i in top
+        ]
+
+    async def forecast(self, horizon_days: float, simulations: int = DEFAULT_SIMULATIONS) -> Dict[str, Any]:
+        key = (float(horizon_days), simulations)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        # upsert() may run while the simulation is awaited: the rest of the forecast is built
+        # from this snapshot, and only cached if the inputs are still the same afterwards
+        generation = self.generation
+        location_codes = self.location_codes.copy()
+        locations = list(self.locations)
+        probabilities = failure_probabilities(self.median_days, self.confidence, horizon_days)
+        simulated = await get_compute_executor().run(
+            simulate_counts, [probabilities, location_codes], len(locations), simulations, SEED
+        )
+
+        expected_by_location = np.bincount(location_codes, weights=probabilities, minlength=len(locations))
+        pumps_by_location = np.bincount(location_codes, minlength=len(locations))
+        survival_by_location = np.ones(len(locations))
+        np.multiply.at(survival_by_location, location_codes, 1.0 - probabilities)
+        expected = float(probabilities.sum())
+        by_location = [
+            {
+                "location": location,
+                "pumps": int(pumps_by_location[code]),
+                "expected_failures": round(float(expected_by_location[code]), 2),
+                "failure_count_bands": _bands(simulated["by_location"][:, code]),
+                "probability_any_failure": round(float(1.0 - survival_by_location[code]), 4),
+                "risk_share": round(float(expected_by_location[code]) / expected, 4) if expected else 0.0,
+            }
+            for code, location in enumerate(locations)
+            if pumps_by_location[code]
+        ]
+        by_location.sort(key=lambda row: row["expected_failures"], reverse=True)
+
+        result = {
+            "horizon_days": horizon_days,
+            "simulations": simulations,
+            "pumps": len(probabilities),
+            "expected_failures": round(expected, 2),
+            "failure_count_bands": _bands(simulated["fleet"]),
+            "probability_any_failure": round(float(1.0 - np.prod(1.0 - probabilities)), 4),
+            "by_location": by_location,
+            "highest_risk_pumps": self._highest_risk(probabilities, np.arange(len(probabilities))),
+            "model": {"rul_distribution": "lognormal", "sigma_min": SIGMA_MIN, "sigma_max": SIGMA_MAX},
+        }
+        if self.generation == generation:
+            self.cache[key] = result
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return result
+
+    async def forecast_location(
+        self, location: str, horizon_days: float, simulations: int = DEFAULT_SIMULATIONS
+    ) -> Optional[Dict[str, Any]]:
+        """One location's share of the fleet forecast, with its own highest-risk pumps"""
+        forecast = await self.forecast(horizon_days, simulations)
+        row = next((r for r in forecast["by_location"] if r["location"].lower() == location.lower()), None)
+        if row is None:
+            return None
+        members = np.flatnonzero(self.location_codes == self.locations.index(row["location"]))
+        probabilities = failure_probabilities(self.median_days, self.confidence, horizon_days)
+        return {
+            **row,
+            "horizon_days": horizon_days,
+            "simulations": simulations,
+            "highest_risk_pumps": self._highest_risk(probabilities, members),
+        }
+
+
+_forecaster: Optional[FailureForecaster] = None
+
+
+def get_failure_forecaster() -> FailureForecaster:
+    global _forecaster
+    if _forecaster is None:
+        _forecaster = FailureForecaster(MOCK_PUMPS)
+    return _forecaster
+
+
+def pump_updated(pump: Dict[str, Any]) -> None:
+    """Invalidate cached forecasts when a pump's prediction inputs change; no-op until first used"""
+    if _forecaster is not None:
+        _forecaster.upsert(pump)
@@ -0,0 +1,199 @@
+"""
+Fleet-wide percentile and peer-comparison analytics.
+
+For every metric the fleet and each peer group (by pump_type and by location) keep a
+sorted NumPy array of current values plus running sums. Updating a pump is a pair of
+binary-search insert/delete operations and a query is a binary search, so no request
+ever scans or re-sorts the fleet.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.data.mock_data import MOCK_PUMPS
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("pressure", "temperature", "vibration", "flow_rate", "power", "efficiency")
+PEER_FIELDS = ("pump_type", "location")
+
+GroupKey = Tuple[str, str]
+FLEET_GROUP: GroupKey = ("fleet", "all")
+
+
+class SortedMetric:
+    """Sorted values of one metric within one group, with running sum/sum of squares"""
+
+    def __init__(self):
+        self.values = np.empty(0, dtype=np.float64)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    @classmethod
+    def from_values(cls, values: List[float]) -> "SortedMetric":
+        metric = cls()
+        metric.values = np.sort(np.asarray(values, dtype=np.float64))
+        metric.total = float(metric.values.sum())
+        metric.total_sq = float(np.dot(metric.values, metric.values))
+        return metric
+
+    def __len__(self) -> int:
+        return self.values.size
+
+    def add(self, value: float) -> None:
+        idx = np.searchsorted(self.values, value)
+        self.values = np.insert(self.values, idx, value)
+        self.total += value
+        self.total_sq += value * value
+
+    def remove(self, value: float) -> None:
+        idx = np.searchsorted(self.values, value)
+        if idx < self.values.size and self.values[idx] == value:
+            self.values = np.delete(self.values, idx)
+            self.total -= value
+            self.total_sq -= value * value
+
+    def mean(self) -> float:
+        return self.total / len(self) if len(self) else 0.0
+
+    def std(self) -> float:
+        n = len(self)
+        if n < 2:
+            return 0.0
+        return float(np.sqrt(max(self.total_sq / n - self.mean() ** 2, 0.0)))
+
+    def percentile_rank(self, value: float) -> float:
+        """Share of the group below value (ties count half), 0-100"""
+        n = len(self)
+        if not n:
+            return 0.0
+        below = np.searchsorted(self.values, value, side="left")
+        at_or_below = np.searchsorted(self.values, value, side="right")
+        return float((below + 0.5 * (at_or_below - below)) / n * 100)
+
+    def z_score(self, value: float) -> float:
+        std = self.std()
+        return (value - self.mean()) / std if std else 0.0
+
+    def quantile(self, q: float) -> float:
+        return float(self.values[min(int(q * len(self)), len(self) - 1)])
+
+    def summary(self) -> Dict[str, Any]:
+        if not len(self):
+            return {"count": 0}
+        return {
+            "count": len(self),
+            "mean": round(self.mean(), 3),
+            "std": round(self.std(), 3),
+            "min": float(self.values[0]),
+            "p25": self.quantile(0.25),
+            "median": self.quantile(0.5),
+            "p75": self.quantile(0.75),
+            "max": float(self.values[-1]),
+        }
+
+
+class FleetAnalytics:
+    def __init__(self, pumps: Iterable[Dict[str, Any]] = ()):
+        self.groups: Dict[GroupKey, Dict[str, SortedMetric]] = {}
+        self.members: Dict[str, Tuple[List[GroupKey], Dict[str, float]]] = {}
+        self._bulk_load(pumps)
+
+    @staticmethod
+    def _group_keys(pump: Dict[str, Any]) -> List[GroupKey]:
+        return [FLEET_GROUP] + [(field, pump[field]) for field in PEER_FIELDS if pump.get(field)]
+
+    def _bulk_load(self, pumps: Iterable[Dict[str, Any]]) -> None:
+        # Collect then sort once per array instead of inserting pump by pump
+        collected: Dict[GroupKey, Dict[str, List[float]]] = {}
+        for pump in pumps:
+            keys = self._group_keys(pump)
+            values = {m: float(pump[m]) for m in METRICS if pump.get(m) is not None}
+            self.members[pump["id"]] = (keys, values)
+            for key in keys:
+                group = collected.setdefault(key, {m: [] for m in METRICS})
+                for metric, value in values.items():
+                    group[metric].append(value)
+        for key, group in collected.items():
+            self.groups[key] = {m: SortedMetric.from_values(v) for m, v in group.items()}
+
+    def _metrics(self, key: GroupKey) -> Dict[str, SortedMetric]:
+        metrics = self.groups.get(key)
+        if metrics is None:
+            metrics = {m: SortedMetric() for m in METRICS}
+            self.groups[key] = metrics
+        return metrics
+
+    def remove(self, pump_id: str) -> None:
+        member = self.members.pop(pump_id, None)
+        if not member:
+            return
+        keys, values = member
+        for key in keys:
+            metrics = self.groups[key]
+            for metric, value in values.items():
+                metrics[metric].remove(value)
+
+    def upsert(self, pump: Dict[str, Any]) -> None:
+        """Insert a pump or move it to its new values/groups"""
+        keys = self._group_keys(pump)
+        values = {m: float(pump[m]) for m in METRICS if pump.get(m) is not None}
+        if self.members.get(pump["id"]) == (keys, values):
+            return
+        self.remove(pump["id"])
+        for key in keys:
+            metrics = self._metrics(key)
+            for metric, value in values.items():
+                metrics[metric].add(value)
+        self.members[pump["id"]] = (keys, values)
+
+    def compare(self, pump_id: str, metrics: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Percentile ranks, z-scores and peer stats of one pump against fleet and peers"""
+        member = self.members.get(pump_id)
+        if not member:
+            return None
+        keys, values = member
+        result = {}
+        for metric in metrics or METRICS:
+            if metric not in values:
+                continue
+            value = values[metric]
+            comparisons = {}
+            for key in keys:
+                sorted_metric = self.groups[key][metric]
+                comparisons[key[0]] = {
+                    "group": key[1],
+                    "percentile": round(sorted_metric.percentile_rank(value), 1),
+                    "z_score": round(sorted_metric.z_score(value), 3),
+                    "stats": sorted_metric.summary(),
+                }
+            result[metric] = {"value": value, **comparisons}
+        return result
+
+    def group_stats(self, group_by: Optional[str] = None, metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Summary stats per metric for the fleet, or for every group of a peer field"""
+        metrics = list(metrics or METRICS)
+        keys = [FLEET_GROUP] if not group_by else sorted(k for k in self.groups if k[0] == group_by)
+        return {
+            key[1]: {m: self.groups[key][m].summary() for m in metrics}
+            for key in keys
+            if key in self.groups
+        }
+
+
+_analytics: Optional[FleetAnalytics] = None
+
+
+def get_fleet_analytics() -> FleetAnalytics:
+    global _analytics
+    if _analytics is None:
+        _analytics = FleetAnalytics(MOCK_PUMPS)
+        logger.info(f"Built fleet analytics index over {len(MOCK_PUMPS)} pumps")
+    return _analytics
+
+
+def pump_updated(pump: Dict[str, Any]) -> None:
+    """Keep the index in step with a changed pump; no-op until the index is first used"""
+    if _analytics is not None:
+        _analytics.upsert(pump)
@@ -0,0 +1,216 @@
+"""
+Structured fleet queries (filter / sort / top-k / group-by / aggregate).
+
+The fleet is held column-wise: NumPy float arrays for numeric fields and integer
+category codes for text fields, with a row per pump. A query is evaluated as
+vectorized masks, an argpartition for top-k and bincount-style group aggregates,
+and only the compact result - capped at MAX_RESULT_ROWS - is returned.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.data.mock_data import MOCK_PUMPS
+from app.schemas.analytics import FleetQuery
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = (
+    "pressure", "temperature", "vibration", "flow_rate", "power",
+    "total_runtime", "average_uptime", "efficiency",
+    "health_score", "predicted_failure_days", "confidence",
+)
+CATEGORICAL_FIELDS = ("id", "name", "location", "pump_type", "status", "predicted_issue")
+DEFAULT_FIELDS = ("id", "name", "location", "status")
+
+MAX_RESULT_ROWS = 50
+
+
+class QueryError(ValueError):
+    pass
+
+
+class FleetTable:
+    def __init__(self, pumps: List[Dict[str, Any]]):
+        self.rows: Dict[str, int] = {p["id"]: i for i, p in enumerate(pumps)}
+        self.numeric = {
+            field: np.array(
+                [np.nan if p.get(field) is None else p[field] for p in pumps], dtype=np.float64
+            )
+            for field in NUMERIC_FIELDS
+        }
+        self.categories: Dict[str, List[str]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for field in CATEGORICAL_FIELDS:
+            lookup: Dict[str, int] = {}
+            codes = [lookup.setdefault(p.get(field) or "", len(lookup)) for p in pumps]
+            self.categories[field] = list(lookup)
+            self.codes[field] = np.array(codes, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def update(self, pump: Dict[str, Any]) -> bool:
+        """Refresh a pump's numeric columns in place; False if the table needs a rebuild"""
+        row = self.rows.get(pump["id"])
+        if row is None:
+            return False
+        for field in CATEGORICAL_FIELDS:
+            if self.categories[field][self.codes[field][row]] != (pump.get(field) or ""):
+                return False
+        for field in NUMERIC_FIELDS:
+            value = pump.get(field)
+            self.numeric[field][row] = np.nan if value is None else value
+        return True
+
+    def value(self, field: str, row: int) -> Any:
+        if field in self.numeric:
+            value = self.numeric[field][row]
+            return None if np.isnan(value) else round(float(value), 3)
+        return self.categories[field][self.codes[field][row]]
+
+    def _category_mask(self, field: str, predicate) -> np.ndarray:
+        matching = np.array(
+            [predicate(category) for category in self.categories[field]], dtype=bool
+        )
+        return matching[self.codes[field]]
+
+    def _filter_mask(self, field: str, op: str, value: Any) -> np.ndarray:
+        if op == "in" and not isinstance(value, list):
+            value = [value]
+        if field in self.numeric:
+            column = self.numeric[field]
+            try:
+                if op == "in":
+                    return np.isin(column, [float(v) for v in value])
+                target = float(value)
+            except (TypeError, ValueError):
+                raise QueryError(f"Filter on {field} needs a numeric value")
+            if op == "contains":
+                raise QueryError(f"'contains' is not valid for numeric field {field}")
+            return {
+                "eq": column == target, "ne": column != target,
+                "lt": column < target, "lte": column <= target,
+                "gt": column > target, "gte": column >= target,
+            }[op]
+
+        if field not in self.codes:
+            raise QueryError(f"Unknown field {field}")
+        if op in ("lt", "lte", "gt", "gte"):
+            raise QueryError(f"'{op}' is not valid for text field {field}")
+        if op == "in":
+            wanted = {str(v).lower() for v in value}
+            return self._category_mask(field, lambda c: c.lower() in wanted)
+        text = str(value).lower()
+        if op == "contains":
+            return self._category_mask(field, lambda c: text in c.lower())
+        mask = self._category_mask(field, lambda c: c.lower() == text)
+        return ~mask if op == "ne" else mask
+
+    def run(self, query: FleetQuery) -> Dict[str, Any]:
+        mask = np.ones(len(self), dtype=bool)
+        for f in query.filters:
+            mask &= self._filter_mask(f.field, f.op, f.value)
+        rows = np.flatnonzero(mask)
+        limit = min(query.limit, MAX_RESULT_ROWS)
+
+        if query.group_by:
+            return self._grouped(query, rows, limit)
+
+        if query.sort_by:
+            if query.sort_by not in self.numeric:
+                raise QueryError(f"sort_by must be a numeric field: {', '.join(NUMERIC_FIELDS)}")
+            keys = self.numeric[query.sort_by][rows]
+            keys = np.where(np.isnan(keys), np.inf, keys if query.order == "asc" else -keys)
+            if rows.size > limit:
+                top = np.argpartition(keys, limit - 1)[:limit]
+                rows, keys = rows[top], keys[top]
+            rows = rows[np.argsort(keys, kind="stable")]
+        else:
+            rows = rows[:limit]
+
+        fields = list(dict.fromkeys(
+            list(query.fields or DEFAULT_FIELDS)
+            + ([query.sort_by] if query.sort_by else [])
+            + [f.field for f in query.filters]
+        ))
+        for field in fields:
+            if field not in self.numeric and field not in self.codes:
+                raise QueryError(f"Unknown field {field}")
+        return {
+            "rows": [{field: self.value(field, row) for field in fields} for row in rows],
+            "total_matched": int(mask.sum()),
+            "truncated": int(mask.sum()) > len(rows),
+        }
+
+    def _grouped(self, query: FleetQuery, rows: np.ndarray, limit: int) -> Dict[str, Any]:
+        field = query.group_by
+        if field not in self.codes:
+            raise QueryError(f"group_by must be a text field: {', '.join(CATEGORICAL_FIELDS)}")
+        codes = self.codes[field][rows]
+        n_groups = len(self.categories[field])
+        counts = np.bincount(codes, minlength=n_groups)
+
+        columns = {"count": counts.astype(np.float64)}
+        for agg in query.aggregates:
+            if agg.metric not in self.numeric:
+                raise QueryError(f"Aggregate metric must be numeric: {', '.join(NUMERIC_FIELDS)}")
+            values = self.numeric[agg.metric][rows]
+            valid = ~np.isnan(values)
+            name = f"{agg.fn}_{agg.metric}"
+            if agg.fn in ("sum", "mean"):
+                sums = np.bincount(codes[valid], weights=values[valid], minlength=n_groups)
+                if agg.fn == "mean":
+                    valid_counts = np.bincount(codes[valid], minlength=n_groups)
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        sums = sums / valid_counts
+                columns[name] = sums
+            else:
+                out = np.full(n_groups, np.inf if agg.fn == "min" else -np.inf)
+                (np.minimum if agg.fn == "min" else np.maximum).at(out, codes[valid], values[valid])
+                out[np.isinf(out)] = np.nan
+                columns[name] = out
+
+        if query.sort_by and query.sort_by not in columns:
+            raise QueryError(f"sort_by for a grouped query must be one of: {', '.join(columns)}")
+        sort_key = query.sort_by or "count"
+        present = np.flatnonzero(counts)
+        keys = columns[sort_key][present]
+        keys = np.where(np.isnan(keys), np.inf, keys if query.order == "asc" else -keys)
+        present = present[np.argsort(keys, kind="stable")]
+
+        groups = []
+        for code in present[:limit]:
+            group = {field: self.categories[field][code]}
+            for name, column in columns.items():
+                value = column[code]
+                group[name] = None if np.isnan(value) else round(float(value), 3)
+            group["count"] = int(counts[code])
+            groups.append(group)
+        return {
+            "groups": groups,
+            "total_matched": int(rows.size),
+            "truncated": present.size > limit,
+        }
+
+
+_table: Optional[FleetTable] = None
+
+
+def _get_table() -> FleetTable:
+    global _table
+    if _table is None or len(_table) != len(MOCK_PUMPS):
+        _table = FleetTable(MOCK_PUMPS)
+    return _table
+
+
+def run_fleet_query(query: FleetQuery) -> Dict[str, Any]:
+    return _get_table().run(query)
+
+
+def pump_updated(pump: Dict[str, Any]) -> None:
+    """Keep the column store in step with a changed pump; no-op until first used"""
+    global _table
+    if _table is not None and not _table.update(pump):
+        _table = None
@@ -0,0 +1,43 @@
+"""
+Text encoders for chunks of raw sensor history rows.
+
+Kept free of application state so compute workers can import them cheaply.
+"""
+import json
+from typing import List
+
+import numpy as np
+
+from app.services.rollups import CHANNELS
+
+COLUMNS = ("pump_id", "recorded_at") + CHANNELS
+
+
+def _timestamps(rows: np.ndarray) -> List[str]:
+    return np.datetime_as_string(rows["ts"].astype("datetime64[s]"), unit="s", timezone="UTC").tolist()
+
+
+def _channel(rows: np.ndarray, channel: str, fmt: str = "%.4f") -> List[str]:
+    values = rows[channel]
+    return np.where(np.isnan(values), "", np.char.mod(fmt, values)).tolist()
+
+
+def csv_header() -> bytes:
+    return (",".join(COLUMNS) + "\n").encode()
+
+
+def encode_csv_chunk(rows: np.ndarray, pump_id: str) -> bytes:
+    columns = [_timestamps(rows)] + [_channel(rows, c) for c in CHANNELS]
+    return "".join(f"{pump_id},{','.join(row)}\n" for row in zip(*columns)).encode()
+
+
+def encode_ndjson_chunk(rows: np.ndarray, pump_id: str) -> bytes:
+    times = _timestamps(rows)
+    values = [np.where(np.isnan(rows[c]), None, rows[c].round(4)).tolist() for c in CHANNELS]
+    lines = []
+    for i, recorded_at in enumerate(times):
+        record = {"pump_id": pump_id, "recorded_at": recorded_at}
+        for channel, column in zip(CHANNELS, values):
+            record[channel] = column[i]
+        lines.append(json.dumps(record))
+    return ("\n".join(lines) + "\n").encode()
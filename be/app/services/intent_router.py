@@ -0,0 +1,210 @@
+"""
+Local fast path for simple chat lookups.
+
+Messages like "status of P003", "how many critical alerts" or "list pumps in Unit A"
+are matched to an intent with regex/keyword entity extraction, answered by calling
+execute_function directly and rendered from a template - no LLM round trip. Anything
+that asks for explanation, advice or comparison, or that the matcher is not sure
+about, returns None so the caller falls back to the LLM.
+
+Accuracy and latency are tracked by benchmarks/intent_router.py.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.data.mock_data import MOCK_PUMPS
+
+CONFIDENCE_THRESHOLD = 0.8
+
+PUMP_STATUSES = ("normal", "warning", "critical")
+ALERT_PRIORITIES = ("critical", "high", "medium", "low")
+ALERT_STATUSES = ("active", "acknowledged", "resolved")
+
+_PUMP_ID_RE = re.compile(r"\bp\d{3,}\b")
+_LOCATION_RE = re.compile(r"\bunit\s+([a-z])\b")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Words that signal the user wants reasoning, not a lookup
+_REASONING_CUES = frozenset(
+    "why explain recommend recommendation should could would compare comparison versus vs "
+    "predict prediction forecast trend trends cause causes fix improve optimize "
+    "troubleshoot diagnose best worst risk risks plan".split()
+)
+_STATUS_CUES = frozenset("status health healthy condition state details info information doing".split())
+_LIST_CUES = frozenset("list show which display".split())
+
+
+@dataclass
+class Intent:
+    name: str
+    function_name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 1.0
+
+
+def _pump_names() -> Dict[str, str]:
+    return {p["name"].lower(): p["id"] for p in MOCK_PUMPS}
+
+
+def _extract(message: str) -> Dict[str, Any]:
+    text = message.lower()
+    words = _WORD_RE.findall(text)
+    known_ids = {p["id"].lower(): p["id"] for p in MOCK_PUMPS}
+    known_locations = {p["location"].lower(): p["location"] for p in MOCK_PUMPS}
+
+    pump_ids = [known_ids[m] for m in _PUMP_ID_RE.findall(text) if m in known_ids]
+    unknown_ids = [m for m in _PUMP_ID_RE.findall(text) if m not in known_ids]
+    pump_ids += [pump_id for name, pump_id in _pump_names().items() if name in text]
+    locations = [
+        known_locations[f"unit {m}"] for m in _LOCATION_RE.findall(text) if f"unit {m}" in known_locations
+    ]
+    return {
+        "text": text,
+        "words": words,
+        "word_set": set(words),
+        "pump_ids": list(dict.fromkeys(pump_ids)),
+        "unknown_ids": unknown_ids,
+        "locations": list(dict.fromkeys(locations)),
+        "statuses": [s for s in PUMP_STATUSES if s in words],
+        "priorities": [p for p in ALERT_PRIORITIES if p in words],
+        "alert_statuses": [s for s in ALERT_STATUSES if s in words],
+    }
+
+
+def resolve_entities(message: str) -> Tuple[List[str], List[str], List[str]]:
+    """Pump ids (named by id or name) and locations a message refers to, and its remaining words"""
+    e = _extract(message)
+    pump_ids = e["pump_ids"] + [m.upper() for m in e["unknown_ids"]]
+    text = e["text"]
+    if e["pump_ids"]:
+        named = set(e["pump_ids"])
+        for name, pump_id in _pump_names().items():
+            if pump_id in named:
+                text = text.replace(name, " ")
+    text = _LOCATION_RE.sub(" ", _PUMP_ID_RE.sub(" ", text))
+    return pump_ids, e["locations"], _WORD_RE.findall(text)
+
+
+def route(message: str) -> Optional[Intent]:
+    """Best local intent for a message, or None when the LLM should handle it"""
+    e = _extract(message)
+    words = e["word_set"]
+    if not words or len(e["words"]) > 25 or e["unknown_ids"]:
+        return None
+
+    confidence = 1.0
+    if words & _REASONING_CUES:
+        confidence -= 0.5
+    if " and " in f" {e['text']} " or "?" in e["text"].rstrip("?"):
+        confidence -= 0.3  # compound questions
+    if len(e["pump_ids"]) > 1 or len(e["locations"]) > 1:
+        confidence -= 0.3
+
+    intent = None
+    mentions_alerts = bool(words & {"alert", "alerts", "alarm", "alarms"})
+    mentions_pumps = bool(words & {"pump", "pumps"})
+    counting = "how many" in e["text"] or "count" in words or "number of" in e["text"]
+    listing = bool(words & _LIST_CUES) or e["text"].startswith(("what are", "what pumps", "pumps", "alerts"))
+
+    if mentions_alerts and (counting or listing) and not e["pump_ids"] and not e["locations"]:
+        args = {}
+        if e["priorities"]:
+            args["priority"] = e["priorities"][0].capitalize()
+        if e["alert_statuses"]:
+            args["status"] = e["alert_statuses"][0].capitalize()
+        intent = Intent("count_alerts" if counting else "list_alerts", "get_system_alerts", args)
+
+    elif e["pump_ids"] and words & {"maintenance", "serviced", "servicing", "maintained"}:
+        intent = Intent("pump_maintenance", "get_pump_maintenance", {"pump_id": e["pump_ids"][0]})
+
+    elif e["pump_ids"] and not mentions_alerts:
+        if words & _STATUS_CUES or len(e["words"]) <= 3:
+            intent = Intent("pump_status", "get_pump_details", {"pump_id": e["pump_ids"][0]})
+        else:
+            confidence -= 0.4
+
+    elif mentions_pumps and (counting or listing) and (e["locations"] or e["statuses"]):
+        args = {}
+        if e["locations"]:
+            args["location"] = e["locations"][0]
+        if e["statuses"]:
+            args["status"] = e["statuses"][0].capitalize()
+        intent = Intent("count_pumps" if counting else "list_pumps", "search_pumps", args)
+
+    if intent is None or confidence < CONFIDENCE_THRESHOLD:
+        return None
+    intent.confidence = round(confidence, 2)
+    return intent
+
+
+def _fmt(value: Any, unit: str = "") -> str:
+    return "n/a" if value is None else f"{value}{unit}"
+
+
+def render(intent: Intent, result: Dict[str, Any]) -> Optional[str]:
+    """Templated answer for an intent's function result; None means 'let the LLM answer'"""
+    if result.get("error"):
+        return None
+
+    if intent.name == "pump_status":
+        p = result["pump"]
+        return (
+            f"**{p['name']} ({p['id']})** - {p['location']}, {p['pump_type']}\n\n"
+            f"- Status: **{p['status']}**\n"
+            f"- Health score: {_fmt(p.get('health_score'), '%')}\n"
+            f"- Pressure: {_fmt(p.get('pressure'), ' psi')}, temperature: {_fmt(p.get('temperature'), '°F')}, "
+            f"vibration: {_fmt(p.get('vibration'), ' mm/s')}\n"
+            f"- Flow rate: {_fmt(p.get('flow_rate'), ' gpm')}, power: {_fmt(p.get('power'), ' kW')}, "
+            f"efficiency: {_fmt(p.get('efficiency'), '%')}\n"
+            f"- Predicted failure in {_fmt(p.get('predicted_failure_days'), ' days')} "
+            f"({_fmt(p.get('confidence'), '%')} confidence): {p.get('predicted_issue') or 'n/a'}"
+        )
+
+    if intent.name in ("count_alerts", "list_alerts"):
+        filters = " ".join(v.lower() for v in (intent.args.get("status"), intent.args.get("priority")) if v)
+        label = f"{filters} alert" if filters else "alert"
+        count = result["count"]
+        header = f"There {'is' if count == 1 else 'are'} **{count}** {label}{'' if count == 1 else 's'}."
+        if intent.name == "count_alerts" or not count:
+            return header
+        lines = [
+            f"- **{a['priority']}** ({a['status']}) on {a['pump_id']}: {a['message']}"
+            for a in result["alerts"]
+        ]
+        return header + "\n\n" + "\n".join(lines)
+
+    if intent.name in ("count_pumps", "list_pumps"):
+        parts = []
+        if intent.args.get("status"):
+            parts.append(intent.args["status"].lower())
+        label = " ".join(parts + ["pump" if result["count"] == 1 else "pumps"])
+        where = f" in {intent.args['location']}" if intent.args.get("location") else ""
+        header = f"There {'is' if result['count'] == 1 else 'are'} **{result['count']}** {label}{where}."
+        if intent.name == "count_pumps" or not result["pumps"]:
+            return header
+        lines = [
+            f"- **{p['id']}** {p['name']} ({p['location']}) - {p['status']}, health {_fmt(p.get('health_score'), '%')}"
+            for p in result["pumps"]
+        ]
+        return header + "\n\n" + "\n".join(lines)
+
+    if intent.name == "pump_maintenance":
+        logs: List[Dict[str, Any]] = result["maintenance_logs"]
+        pump_id = result["pump_id"]
+        if not logs:
+            return f"No maintenance records found for {pump_id}."
+        lines = [
+            f"- {log['date'].strftime('%d %b %Y')}: {log['task']} ({log['status']}, {log.get('technician') or 'TBD'})"
+            for log in logs
+        ]
+        summary = result.get("summary") or {}
+        footer = []
+        if summary.get("last_completed"):
+            footer.append(f"Last completed: {summary['last_completed'].strftime('%d %b %Y')}")
+        if summary.get("next_due"):
+            footer.append(f"next due: {summary['next_due'].strftime('%d %b %Y')}")
+        text = f"Maintenance records for **{pump_id}** ({len(logs)}):\n\n" + "\n".join(lines)
+        return text + ("\n\n" + ", ".join(footer) + "." if footer else "")
+
+    return None
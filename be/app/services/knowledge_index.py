@@ -0,0 +1,218 @@
+"""
+BM25 retrieval over the domain knowledge directory.
+
+Markdown files are split into chunks at headings (and into word windows when a
+section is long), indexed once and persisted next to the knowledge files' fingerprint,
+so restarts reuse the index unless the documents change. The chat service injects
+the top-k chunks for each question instead of inlining all knowledge into the
+system prompt.
+
+Prebuild (e.g. in the Docker image):  python -m app.services.knowledge_index
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KNOWLEDGE_DIR = Path(__file__).resolve().parent.parent / "knowledge"
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent.parent.parent / ".cache" / "knowledge_index.json"
+
+INDEX_VERSION = 3
+MAX_CHUNK_WORDS = 180
+CHUNK_OVERLAP_WORDS = 30
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i in is it its me my of on "
+    "or our should that the their there this to was what when which who why will with "
+    "you your".split()
+)
+
+
+_SUFFIXES = ("ations", "ation", "ions", "ion", "ings", "ing", "ed")
+# Plurals in "es" only after a sibilant (boxes, switches); otherwise the "e" is the stem's
+_SIBILANT_PLURALS = ("sses", "xes", "zes", "ches", "shes")
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so 'inspected' and 'inspections' meet at 'inspect', 'pressures' and 'pressure' at 'pressur'"""
+    for suffix in _SUFFIXES:
+        if len(token) - len(suffix) >= 4 and token.endswith(suffix):
+            token = token[:-len(suffix)]
+            break
+    else:
+        if len(token) >= 5 and token.endswith(_SIBILANT_PLURALS):
+            token = token[:-2]
+        elif len(token) >= 5 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+    # A trailing "e" is dropped so "change", "changes" and "changed" all meet at "chang"
+    if len(token) >= 5 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _WORD_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _split_sections(text: str) -> List[Tuple[str, str]]:
+    """(heading path, body) per markdown section"""
+    sections = []
+    headings: List[str] = []
+    body: List[str] = []
+
+    def flush():
+        content = "\n".join(body).strip()
+        if content:
+            sections.append((" > ".join(headings), content))
+        body.clear()
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            headings[:] = headings[:level - 1] + [match.group(2).strip()]
+        else:
+            body.append(line)
+    flush()
+    return sections
+
+
+def chunk_document(source: str, text: str) -> List[Dict[str, str]]:
+    chunks = []
+    for heading, body in _split_sections(text):
+        words = body.split()
+        if len(words) <= MAX_CHUNK_WORDS:
+            chunks.append({"source": source, "heading": heading, "text": body})
+            continue
+        step = MAX_CHUNK_WORDS - CHUNK_OVERLAP_WORDS
+        for start in range(0, len(words), step):
+            chunks.append({
+                "source": source,
+                "heading": heading,
+                "text": " ".join(words[start:start + MAX_CHUNK_WORDS]),
+            })
+            if start + MAX_CHUNK_WORDS >= len(words):
+                break
+    return chunks
+
+
+def _fingerprint(files: List[Path]) -> str:
+    digest = hashlib.sha256(f"v{INDEX_VERSION}".encode())
+    for path in files:
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+class KnowledgeIndex:
+    def __init__(self, chunks: List[Dict[str, str]], fingerprint: str = ""):
+        self.chunks = chunks
+        self.fingerprint = fingerprint
+        self.doc_len: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for i, chunk in enumerate(chunks):
+            tokens = tokenize(f"{chunk['heading']} {chunk['text']}")
+            self.doc_len.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((i, tf))
+        self.avg_len = sum(self.doc_len) / len(self.doc_len) if self.doc_len else 0.0
+
+    def search(self, query: str, top_k: int = 4, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        n = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[i] / self.avg_len)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:top_k]
+        return [
+            {**self.chunks[i], "score": round(score, 3)}
+            for i, score in ranked
+            if score > min_score
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "chunks": self.chunks,
+            "doc_len": self.doc_len,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnowledgeIndex":
+        index = cls.__new__(cls)
+        index.chunks = data["chunks"]
+        index.fingerprint = data["fingerprint"]
+        index.doc_len = data["doc_len"]
+        index.postings = {t: [tuple(p) for p in ps] for t, ps in data["postings"].items()}
+        index.avg_len = sum(index.doc_len) / len(index.doc_len) if index.doc_len else 0.0
+        return index
+
+
+def build_index(knowledge_dir: Path = DEFAULT_KNOWLEDGE_DIR, index_path: Optional[Path] = DEFAULT_INDEX_PATH) -> KnowledgeIndex:
+    """Load the persisted index if it matches the knowledge files, otherwise rebuild and persist it"""
+    files = sorted(p for p in knowledge_dir.rglob("*") if p.suffix in (".md", ".txt") and p.is_file())
+    fingerprint = _fingerprint(files)
+
+    if index_path and index_path.exists():
+        try:
+            data = json.loads(index_path.read_text())
+            if data.get("fingerprint") == fingerprint and data.get("version") == INDEX_VERSION:
+                logger.info(f"Loaded knowledge index from {index_path}")
+                return KnowledgeIndex.from_dict(data)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable knowledge index {index_path}: {e}")
+
+    chunks = []
+    for path in files:
+        chunks.extend(chunk_document(str(path.relative_to(knowledge_dir)), path.read_text()))
+    index = KnowledgeIndex(chunks, fingerprint)
+    logger.info(f"Built knowledge index: {len(files)} files, {len(chunks)} chunks")
+
+    if index_path:
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            index_path.write_text(json.dumps(index.to_dict()))
+        except OSError as e:
+            logger.warning(f"Could not persist knowledge index to {index_path}: {e}")
+    return index
+
+
+_index: Optional[KnowledgeIndex] = None
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    global _index
+    if _index is None:
+        _index = build_index()
+    return _index
+
+
+def format_context(chunks: List[Dict[str, Any]]) -> str:
+    return "\n\n".join(f"[{c['source']} - {c['heading']}]\n{c['text']}" for c in chunks)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    built = build_index()
+    print(f"{len(built.chunks)} chunks indexed")
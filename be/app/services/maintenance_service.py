@@ -0,0 +1,185 @@
+"""
+Maintenance log store.
+
+Logs are indexed per pump and per status as lists of (date, id) kept sorted with
+bisect, so "last 90 days for P001" or "pending tasks due this week" are range
+lookups rather than scans. Each pump's last completed and next due dates are
+refreshed whenever one of its logs changes, and every change is recorded in the
+change log for delta sync and in the activity journal.
+"""
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.data.mock_data import MOCK_MAINTENANCE_LOGS, MOCK_PUMPS
+from app.services.change_log import record_change
+from app.services.event_journal import record_event
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_STATUS = "Completed"
+OPEN_STATUSES = ("Pending", "Scheduled", "In Progress")
+REQUIRED_FIELDS = ("task", "status", "date", "technician")
+
+IndexEntry = Tuple[int, int]
+
+
+def _to_ts(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _journal(log: Dict[str, Any], summary: str) -> None:
+    location = next((p["location"] for p in MOCK_PUMPS if p["id"] == log["pump_id"]), None)
+    record_event("maintenance", f"{summary} {log['pump_id']}: {log['task']}", "Info", log["pump_id"], location)
+
+
+class MaintenanceStore:
+    def __init__(self, logs: List[Dict[str, Any]]):
+        self.logs = logs
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.by_pump: Dict[str, List[IndexEntry]] = {}
+        self.by_status: Dict[str, List[IndexEntry]] = {}
+        self.all: List[IndexEntry] = []
+        self.pump_summary: Dict[str, Dict[str, Optional[datetime]]] = {}
+        self.next_id = 1
+        for log in logs:
+            log.setdefault("id", self.next_id)
+            self.next_id = max(self.next_id, log["id"]) + 1
+            self._index(log)
+        for pump_id in self.by_pump:
+            self._refresh_summary(pump_id)
+
+    def _index(self, log: Dict[str, Any]) -> None:
+        entry = (_to_ts(log["date"]), log["id"])
+        self.by_id[log["id"]] = log
+        insort(self.by_pump.setdefault(log["pump_id"], []), entry)
+        insort(self.by_status.setdefault(log["status"].lower(), []), entry)
+        insort(self.all, entry)
+
+    def _unindex(self, log: Dict[str, Any]) -> None:
+        entry = (_to_ts(log["date"]), log["id"])
+        for entries in (
+            self.by_pump[log["pump_id"]],
+            self.by_status[log["status"].lower()],
+            self.all,
+        ):
+            del entries[bisect_left(entries, entry)]
+
+    def _refresh_summary(self, pump_id: str) -> None:
+        last_completed = None
+        next_due = None
+        for _, log_id in self.by_pump.get(pump_id, []):
+            log = self.by_id[log_id]
+            if log["status"] == COMPLETED_STATUS:
+                done = log.get("completed_date") or log["date"]
+                if last_completed is None or _to_ts(done) > _to_ts(last_completed):
+                    last_completed = done
+            elif log["status"] in OPEN_STATUSES and next_due is None:
+                next_due = log["date"]  # entries are date-ordered, first open one is next due
+        self.pump_summary[pump_id] = {"last_completed": last_completed, "next_due": next_due}
+
+    def get(self, log_id: int) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(log_id)
+
+    def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        log = {**data, "id": self.next_id}
+        self.next_id += 1
+        self.logs.append(log)
+        self._index(log)
+        self._refresh_summary(log["pump_id"])
+        record_change("maintenance", log["id"], pump_id=log["pump_id"])
+        _journal(log, f"Maintenance {log['status'].lower()} for")
+        return log
+
+    def update(self, log_id: int, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        log = self.by_id.get(log_id)
+        if log is None:
+            return None
+        missing = [field for field in REQUIRED_FIELDS if field in changes and changes[field] is None]
+        if missing:
+            raise ValueError(f"Maintenance log fields cannot be null: {', '.join(missing)}")
+        updated = {**log, **changes}
+        if changes.get("status") == COMPLETED_STATUS and not updated.get("completed_date"):
+            updated["completed_date"] = datetime.now(timezone.utc)
+        # Checked before the old index entries are removed, so a bad update leaves the log as it was
+        if not isinstance(updated["date"], datetime) or not isinstance(updated["status"], str):
+            raise ValueError("Maintenance log date must be a datetime and status a string")
+        previous_status = log["status"]
+        self._unindex(log)
+        log.update(updated)
+        self._index(log)
+        self._refresh_summary(log["pump_id"])
+        record_change("maintenance", log_id, pump_id=log["pump_id"])
+        if log["status"] == previous_status:
+            _journal(log, "Maintenance updated for")
+        elif log["status"] == COMPLETED_STATUS:
+            _journal(log, "Maintenance completed on")
+        else:
+            _journal(log, f"Maintenance {log['status'].lower()} for")
+        return log
+
+    def delete(self, log_id: int) -> Optional[Dict[str, Any]]:
+        log = self.by_id.pop(log_id, None)
+        if log is None:
+            return None
+        self._unindex(log)
+        self.logs.remove(log)
+        self._refresh_summary(log["pump_id"])
+        record_change("maintenance", log_id, "delete", log["pump_id"])
+        _journal(log, "Maintenance deleted for")
+        return log
+
+    def query(
+        self,
+        pump_id: Optional[str] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Logs dated in [start, end), narrowed by the most selective index; returns (page, total)"""
+        if pump_id:
+            entries = self.by_pump.get(pump_id, [])
+        elif status:
+            entries = self.by_status.get(status.lower(), [])
+        else:
+            entries = self.all
+        lo = bisect_left(entries, (_to_ts(start), 0)) if start else 0
+        hi = bisect_left(entries, (_to_ts(end), 0)) if end else len(entries)
+        selected = entries[lo:hi]
+        if pump_id and status:
+            selected = [e for e in selected if self.by_id[e[1]]["status"].lower() == status.lower()]
+        if newest_first:
+            selected = selected[::-1]
+        total = len(selected)
+        if limit is not None:
+            selected = selected[:limit]
+        return [self.by_id[log_id] for _, log_id in selected], total
+
+    def count_open(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """Open tasks dated in [start, end), counted by bisection on each status index"""
+        count = 0
+        for status in OPEN_STATUSES:
+            entries = self.by_status.get(status.lower(), [])
+            lo = bisect_left(entries, (_to_ts(start), 0)) if start else 0
+            hi = bisect_left(entries, (_to_ts(end), 0)) if end else len(entries)
+            count += max(hi - lo, 0)
+        return count
+
+    def for_pump(self, pump_id: str) -> List[Dict[str, Any]]:
+        return [self.by_id[log_id] for _, log_id in self.by_pump.get(pump_id, [])]
+
+
+_store: Optional[MaintenanceStore] = None
+
+
+def get_maintenance_store() -> MaintenanceStore:
+    global _store
+    if _store is None:
+        _store = MaintenanceStore(MOCK_MAINTENANCE_LOGS)
+        logger.info(f"Indexed {len(MOCK_MAINTENANCE_LOGS)} maintenance logs")
+    return _store
@@ -0,0 +1,250 @@
+"""
+Inverted-index search over pumps.
+
+id, name, location, pump_type and predicted_issue are tokenized into a postings index.
+Query tokens are matched exactly, by prefix (search-as-you-type) against a sorted
+vocabulary, and - when neither hits - by trigram similarity for typo tolerance.
+Matches are ranked by field weight times match quality, summed over query tokens.
+"""
+import heapq
+import logging
+import re
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.data.mock_data import MOCK_PUMPS
+
+logger = logging.getLogger(__name__)
+
+FIELD_WEIGHTS = {
+    "id": 5.0,
+    "name": 3.0,
+    "location": 2.0,
+    "pump_type": 2.0,
+    "predicted_issue": 1.0,
+}
+
+# Caps that keep a short prefix or a very common token from expanding into the whole vocabulary
+MAX_PREFIX_EXPANSIONS = 64
+MAX_FUZZY_EXPANSIONS = 16
+FUZZY_THRESHOLD = 0.4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PumpSearchIndex:
+    """
+    Pumps are stored in integer slots. Postings are kept per (field, token) as slot sets
+    for cheap updates, and materialized lazily as NumPy slot arrays so that scoring a
+    query is a handful of vectorized scatter/max operations rather than a Python loop
+    over every matching pump.
+    """
+
+    def __init__(self, pumps: Iterable[Dict[str, Any]] = ()):
+        self.slots: Dict[str, int] = {}
+        self.slot_docs: List[Optional[Dict[str, Any]]] = []
+        self.free_slots: List[int] = []
+        self.postings: Dict[str, Dict[str, Set[int]]] = {}
+        self.status_index: Dict[str, Set[int]] = {}
+        self.doc_terms: Dict[int, List[Tuple[str, str]]] = {}
+        self.snapshots: Dict[int, Tuple] = {}
+        self.vocab: List[str] = []
+        self.trigram_index: Dict[str, Set[str]] = {}
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        for pump in pumps:
+            self.add(pump)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, pump: Dict[str, Any]) -> None:
+        pump_id = pump["id"]
+        snapshot = tuple(pump.get(field) for field in FIELD_WEIGHTS) + (pump.get("status"),)
+        slot = self.slots.get(pump_id)
+        if slot is not None:
+            self.slot_docs[slot] = pump
+            if self.snapshots[slot] == snapshot:
+                return
+            self.remove(pump_id)
+
+        slot = self.free_slots.pop() if self.free_slots else len(self.slot_docs)
+        if slot == len(self.slot_docs):
+            self.slot_docs.append(pump)
+        else:
+            self.slot_docs[slot] = pump
+        self.slots[pump_id] = slot
+        self.snapshots[slot] = snapshot
+
+        terms = []
+        for field in FIELD_WEIGHTS:
+            for token in set(tokenize(pump.get(field))):
+                terms.append((field, token))
+                fields = self.postings.get(token)
+                if fields is None:
+                    fields = self.postings[token] = {}
+                    insort(self.vocab, token)
+                    for gram in trigrams(token):
+                        self.trigram_index.setdefault(gram, set()).add(token)
+                fields.setdefault(field, set()).add(slot)
+                self._arrays.pop((field, token), None)
+        self.doc_terms[slot] = terms
+        self.status_index.setdefault((pump.get("status") or "").lower(), set()).add(slot)
+
+    def remove(self, pump_id: str) -> None:
+        slot = self.slots.pop(pump_id, None)
+        if slot is None:
+            return
+        status = self.snapshots.pop(slot)[-1]
+        for field, token in self.doc_terms.pop(slot, []):
+            fields = self.postings[token]
+            fields[field].discard(slot)
+            self._arrays.pop((field, token), None)
+            if not fields[field]:
+                del fields[field]
+            if not fields:
+                del self.postings[token]
+                del self.vocab[bisect_left(self.vocab, token)]
+                for gram in trigrams(token):
+                    self.trigram_index[gram].discard(token)
+        self.status_index.get((status or "").lower(), set()).discard(slot)
+        self.slot_docs[slot] = None
+        self.free_slots.append(slot)
+
+    def _array(self, field: str, token: str) -> np.ndarray:
+        array = self._arrays.get((field, token))
+        if array is None:
+            slots = self.postings[token][field]
+            array = np.fromiter(slots, dtype=np.int64, count=len(slots))
+            self._arrays[(field, token)] = array
+        return array
+
+    def _prefix_matches(self, prefix: str, limit: Optional[int] = MAX_PREFIX_EXPANSIONS) -> List[str]:
+        """Vocabulary tokens starting with prefix, the first `limit` of them (all when None)"""
+        start = bisect_left(self.vocab, prefix)
+        end = len(self.vocab) if limit is None else start + limit
+        matches = []
+        for token in self.vocab[start:end]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy_matches(self, token: str) -> List[Tuple[str, float]]:
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.trigram_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = []
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((candidate, similarity))
+        return heapq.nlargest(MAX_FUZZY_EXPANSIONS, scored, key=lambda item: item[1])
+
+    def expand(self, token: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matching a query token, with a 0-1 match quality"""
+        expansions = {}
+        for candidate in self._prefix_matches(token):
+            expansions[candidate] = 1.0 if candidate == token else 0.6 + 0.3 * len(token) / len(candidate)
+        if not expansions and len(token) >= 3:
+            for candidate, similarity in self._fuzzy_matches(token):
+                expansions[candidate] = 0.6 * similarity
+        return list(expansions.items())
+
+    def _field_filter(self, field: str, value: str) -> Set[int]:
+        """Slots whose field contains every token of value (the last one as a prefix)"""
+        tokens = tokenize(value)
+        if not tokens:
+            return set(self.slots.values())
+        matched: Optional[Set[int]] = None
+        for i, token in enumerate(tokens):
+            # Filters must be exact, so the prefix is not capped like query expansion
+            candidates = self._prefix_matches(token, limit=None) if i == len(tokens) - 1 else [token]
+            slots: Set[int] = set()
+            for candidate in candidates:
+                slots |= self.postings[candidate].get(field, set()) if candidate in self.postings else set()
+            matched = slots if matched is None else matched & slots
+            if not matched:
+                return set()
+        return matched
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        pump_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Tuple[Dict[str, Any], float]], int]:
+        """
+        Ranked (pump, score) pairs plus the total number of matches.
+        Every query token must match and all filters must hold.
+        """
+        allowed: Optional[Set[int]] = None
+        for field, value in (("location", location), ("pump_type", pump_type)):
+            if value:
+                slots = self._field_filter(field, value)
+                allowed = slots if allowed is None else allowed & slots
+        if status:
+            slots = self.status_index.get(status.lower(), set())
+            allowed = slots if allowed is None else allowed & slots
+
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            slots = self.slots.values() if allowed is None else allowed
+            ids = heapq.nsmallest(limit, (self.slot_docs[slot]["id"] for slot in slots))
+            return [(self.slot_docs[self.slots[pump_id]], 0.0) for pump_id in ids], len(slots)
+
+        size = len(self.slot_docs)
+        total = np.zeros(size, dtype=np.float32)
+        mask = np.ones(size, dtype=bool)
+        if allowed is not None:
+            mask[:] = False
+            mask[np.fromiter(allowed, dtype=np.int64, count=len(allowed))] = True
+
+        for token in tokens:
+            token_scores = np.zeros(size, dtype=np.float32)
+            for candidate, quality in self.expand(token):
+                for field in self.postings[candidate]:
+                    slots = self._array(field, candidate)
+                    token_scores[slots] = np.maximum(token_scores[slots], FIELD_WEIGHTS[field] * quality)
+            mask &= token_scores > 0
+            total += token_scores
+
+        matches = np.flatnonzero(mask)
+        if matches.size > limit:
+            matches = matches[np.argpartition(-total[matches], limit - 1)[:limit]]
+        ranked = sorted(
+            ((self.slot_docs[slot], round(float(total[slot]), 3)) for slot in matches),
+            key=lambda item: (-item[1], item[0]["id"]),
+        )
+        return ranked, int(mask.sum())
+
+
+_index: Optional[PumpSearchIndex] = None
+
+
+def get_search_index() -> PumpSearchIndex:
+    global _index
+    if _index is None:
+        _index = PumpSearchIndex(MOCK_PUMPS)
+        logger.info(f"Built pump search index over {len(MOCK_PUMPS)} pumps")
+    return _index
+
+
+def pump_updated(pump: Dict[str, Any]) -> None:
+    """Re-index a changed pump; no-op until the index is first used"""
+    if _index is not None:
+        _index.add(pump)
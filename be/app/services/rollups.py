@@ -0,0 +1,180 @@
+"""
+Multi-resolution rollups of sensor readings.
+
+Every reading is folded into 1-minute, 1-hour and 1-day buckets for its pump and for
+the fleet as a whole. Each bucket keeps min/max/sum/count/last per channel, so
+aggregates over any span can be answered from the coarsest tier that still gives
+enough points instead of recomputing from raw readings.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CHANNELS = ("pressure", "temperature", "vibration", "flow_rate", "power", "health_score")
+
+# Tier name -> bucket width in seconds, finest first
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Tier name -> number of buckets retained per scope
+RETENTION = {"1m": 60 * 48, "1h": 24 * 90, "1d": 365 * 5}
+
+FLEET_SCOPE = "__fleet__"
+
+# Per-channel stats layout inside a bucket
+_MIN, _MAX, _SUM, _COUNT, _LAST = range(5)
+
+
+def _new_stats() -> List[Optional[float]]:
+    return [None, None, 0.0, 0, None]
+
+
+class RollupTier:
+    """Time-ordered buckets of a single resolution for a single scope"""
+
+    def __init__(self, resolution: int, retention: int):
+        self.resolution = resolution
+        self.retention = retention
+        self.starts: List[int] = []
+        self.buckets: Dict[int, List[List[Optional[float]]]] = {}
+
+    def add(self, ts: int, values: Dict[str, float]) -> None:
+        start = ts - ts % self.resolution
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            if self.starts and start < self.starts[0] and len(self.starts) >= self.retention:
+                return  # older than anything we still retain
+            bucket = [_new_stats() for _ in CHANNELS]
+            self.buckets[start] = bucket
+            if not self.starts or start > self.starts[-1]:
+                self.starts.append(start)
+            else:
+                insort(self.starts, start)
+            if len(self.starts) > self.retention:
+                self._evict()
+
+        for i, channel in enumerate(CHANNELS):
+            value = values.get(channel)
+            if value is None:
+                continue
+            stats = bucket[i]
+            if stats[_COUNT] == 0:
+                stats[_MIN] = stats[_MAX] = value
+            elif value < stats[_MIN]:
+                stats[_MIN] = value
+            elif value > stats[_MAX]:
+                stats[_MAX] = value
+            stats[_SUM] += value
+            stats[_COUNT] += 1
+            stats[_LAST] = value
+
+    def _evict(self) -> None:
+        # Trim in batches so eviction stays amortized O(1) per reading
+        excess = len(self.starts) - self.retention + max(1, self.retention // 10)
+        for start in self.starts[:excess]:
+            del self.buckets[start]
+        del self.starts[:excess]
+
+    def oldest(self) -> Optional[int]:
+        return self.starts[0] if self.starts else None
+
+    def range(self, start: int, end: int) -> List[Tuple[int, List[List[Optional[float]]]]]:
+        """Buckets starting within [start, end)"""
+        lo = bisect_left(self.starts, _align_up(start, self.resolution))
+        hi = bisect_left(self.starts, end)
+        return [(s, self.buckets[s]) for s in self.starts[lo:hi]]
+
+
+def _align_up(ts: int, resolution: int) -> int:
+    return -(-ts // resolution) * resolution
+
+
+def _merge(buckets: Iterable[List[List[Optional[float]]]]) -> List[List[Optional[float]]]:
+    merged = [_new_stats() for _ in CHANNELS]
+    for bucket in buckets:
+        for target, stats in zip(merged, bucket):
+            if stats[_COUNT] == 0:
+                continue
+            if target[_COUNT] == 0:
+                target[_MIN], target[_MAX] = stats[_MIN], stats[_MAX]
+            else:
+                target[_MIN] = min(target[_MIN], stats[_MIN])
+                target[_MAX] = max(target[_MAX], stats[_MAX])
+            target[_SUM] += stats[_SUM]
+            target[_COUNT] += stats[_COUNT]
+            target[_LAST] = stats[_LAST]
+    return merged
+
+
+class RollupStore:
+    """Rollup tiers for every pump plus the fleet-wide scope"""
+
+    def __init__(self):
+        self.scopes: Dict[str, Dict[str, RollupTier]] = {}
+
+    def _tiers(self, scope: str) -> Dict[str, RollupTier]:
+        tiers = self.scopes.get(scope)
+        if tiers is None:
+            tiers = {
+                name: RollupTier(resolution, RETENTION[name])
+                for name, resolution in RESOLUTIONS.items()
+            }
+            self.scopes[scope] = tiers
+        return tiers
+
+    def ingest(self, pump_id: str, ts: int, values: Dict[str, float]) -> None:
+        """Fold one reading (epoch seconds) into the pump's and the fleet's tiers"""
+        for scope in (pump_id, FLEET_SCOPE):
+            for tier in self._tiers(scope).values():
+                tier.add(ts, values)
+
+    def select_tier(self, scope: str, start: int, end: int, max_points: int) -> str:
+        """
+        Pick the finest tier whose bucket count over [start, end) fits in max_points
+        and whose retention still reaches back to start; falls back to the coarsest.
+        """
+        tiers = self._tiers(scope)
+        span = max(end - start, 1)
+        for name, resolution in RESOLUTIONS.items():
+            oldest = tiers[name].oldest()
+            covers = oldest is not None and oldest <= _align_up(start, resolution)
+            if -(-span // resolution) <= max_points and covers:
+                return name
+        return list(RESOLUTIONS)[-1]
+
+    def query(
+        self,
+        scope: str,
+        start: int,
+        end: int,
+        max_points: int,
+        resolution: Optional[str] = None,
+    ) -> Tuple[str, List[Dict]]:
+        """
+        Return (tier name, points) for [start, end). Points never exceed max_points:
+        if even the chosen tier is too dense, adjacent buckets are merged.
+        """
+        tier_name = resolution or self.select_tier(scope, start, end, max_points)
+        tier = self._tiers(scope)[tier_name]
+        rows = tier.range(start, end)
+
+        if len(rows) > max_points:
+            group = -(-len(rows) // max_points)
+            rows = [
+                (rows[i][0], _merge(b for _, b in rows[i:i + group]))
+                for i in range(0, len(rows), group)
+            ]
+
+        points = []
+        for bucket_start, bucket in rows:
+            stats = {}
+            for channel, s in zip(CHANNELS, bucket):
+                if s[_COUNT] == 0:
+                    continue
+                stats[channel] = {
+                    "min": s[_MIN],
+                    "max": s[_MAX],
+                    "mean": s[_SUM] / s[_COUNT],
+                    "count": s[_COUNT],
+                    "last": s[_LAST],
+                }
+            points.append({"ts": bucket_start, "stats": stats})
+        return tier_name, points
@@ -0,0 +1,188 @@
+"""
+Raw sensor history.
+
+Readings are appended per pump into fixed-size columnar segments (a NumPy structured
+array of timestamp + channel values). A full segment is sorted by time and sealed;
+when SENSOR_HISTORY_DIR is set sealed segments are written there, named by a per-pump
+sequence number, and read back memory-mapped, so history is bounded by disk rather
+than memory (without it the newest MEMORY_SEGMENTS_PER_PUMP segments are kept). Reads
+hand out row-range views of at most `chunk_rows` rows, so consumers such as exports
+run in flat memory. Segments whose time ranges overlap (late readings) are merged into
+one sorted copy of their rows in range, so reads are in time order across segments.
+
+The same storage holds other per-pump row types, such as spectral features of
+vibration waveforms, in a subdirectory of each pump's history.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.rollups import CHANNELS
+
+logger = logging.getLogger(__name__)
+
+ROW_DTYPE = np.dtype([("ts", "<i8")] + [(channel, "<f8") for channel in CHANNELS])
+SEGMENT_ROWS = 8192
+MEMORY_SEGMENTS_PER_PUMP = 64
+
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class Segment:
+    def __init__(self, rows: np.ndarray, path: Optional[Path] = None):
+        self.rows = rows
+        self.path = path
+        self.first_ts = int(rows["ts"][0])
+        self.last_ts = int(rows["ts"][-1])
+
+
+class PumpHistory:
+    def __init__(self, directory: Optional[Path] = None, dtype: np.dtype = ROW_DTYPE):
+        self.directory = directory
+        self.dtype = dtype
+        self.segments: List[Segment] = []
+        self.active = np.empty(SEGMENT_ROWS, dtype=dtype)
+        self.size = 0
+        self.active_sorted = True
+        # File name of the next sealed segment; only ever increases
+        self.next_sequence = 1
+        if directory:
+            directory.mkdir(parents=True, exist_ok=True)
+            for path in sorted(directory.glob("*.npy"), key=lambda p: int(p.stem)):
+                self.segments.append(Segment(np.load(path, mmap_mode="r"), path))
+                self.next_sequence = int(path.stem) + 1
+
+    def __len__(self) -> int:
+        return sum(len(s.rows) for s in self.segments) + self.size
+
+    def append(self, ts: int, values: Dict[str, float]) -> None:
+        row = self.active[self.size]
+        row["ts"] = ts
+        for field in self.dtype.names[1:]:
+            row[field] = values.get(field, np.nan)
+        if self.size and ts < self.active["ts"][self.size - 1]:
+            self.active_sorted = False
+        self.size += 1
+        if self.size == SEGMENT_ROWS:
+            self._seal()
+
+    def append_rows(self, rows: np.ndarray) -> None:
+        """Append a block of rows of this history's dtype"""
+        offset = 0
+        while offset < len(rows):
+            take = min(len(rows) - offset, SEGMENT_ROWS - self.size)
+            block = rows[offset:offset + take]
+            previous = self.active["ts"][self.size - 1] if self.size else block["ts"][0]
+            if block["ts"][0] < previous or np.any(np.diff(block["ts"]) < 0):
+                self.active_sorted = False
+            self.active[self.size:self.size + take] = block
+            self.size += take
+            offset += take
+            if self.size == SEGMENT_ROWS:
+                self._seal()
+
+    def _seal(self) -> None:
+        rows = self.active if self.active_sorted else np.sort(self.active, order="ts", kind="stable")
+        if self.directory:
+            path = self.directory / f"{self.next_sequence}.npy"
+            self.next_sequence += 1
+            np.save(path, rows)
+            segment = Segment(np.load(path, mmap_mode="r"), path)
+        else:
+            segment = Segment(rows.copy())
+        self.segments.append(segment)
+        if not self.directory and len(self.segments) > MEMORY_SEGMENTS_PER_PUMP:
+            del self.segments[0]
+        self.size = 0
+        self.active_sorted = True
+
+    def _sources(self) -> Iterator[np.ndarray]:
+        yield from (s.rows for s in self.segments)
+        if self.size:
+            active = self.active[:self.size]
+            yield active if self.active_sorted else np.sort(active, order="ts", kind="stable")
+
+    def chunks(self, start_ts: int, end_ts: int, chunk_rows: int) -> Iterator[np.ndarray]:
+        """Time-ordered views of rows with start_ts <= ts <= end_ts, at most chunk_rows each"""
+        parts = []
+        for rows in self._sources():
+            ts = rows["ts"]
+            if not len(ts) or ts[-1] < start_ts or ts[0] > end_ts:
+                continue
+            lo = int(np.searchsorted(ts, start_ts, side="left"))
+            hi = int(np.searchsorted(ts, end_ts, side="right"))
+            if lo < hi:
+                parts.append(rows[lo:hi])
+        # Sealing order is not time order when readings arrive late: parts are taken by
+        # first timestamp, and a run of parts whose ranges overlap is merged
+        parts.sort(key=lambda part: part["ts"][0])
+        group: List[np.ndarray] = []
+        group_end = 0
+        for part in parts:
+            if group and part["ts"][0] >= group_end:
+                yield from _chunked(group, chunk_rows)
+                group = []
+            group.append(part)
+            group_end = max(group_end, int(part["ts"][-1]))
+        yield from _chunked(group, chunk_rows)
+
+
+def _chunked(parts: List[np.ndarray], chunk_rows: int) -> Iterator[np.ndarray]:
+    if not parts:
+        return
+    rows = parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts), order="ts", kind="stable")
+    for offset in range(0, len(rows), chunk_rows):
+        yield rows[offset:offset + chunk_rows]
+
+
+class SensorHistoryStore:
+    def __init__(self, directory: Optional[Path] = None, dtype: np.dtype = ROW_DTYPE, subdir: str = ""):
+        self.directory = directory
+        self.dtype = dtype
+        self.subdir = subdir
+        self.pumps: Dict[str, PumpHistory] = {}
+        if directory and directory.exists():
+            for pump_dir in directory.iterdir():
+                if pump_dir.is_dir() and (pump_dir / subdir).is_dir():
+                    self.pumps[pump_dir.name] = PumpHistory(pump_dir / subdir, dtype)
+
+    def _history(self, pump_id: str) -> PumpHistory:
+        history = self.pumps.get(pump_id)
+        if history is None:
+            pump_dir = self.directory / _SAFE_NAME_RE.sub("_", pump_id) / self.subdir if self.directory else None
+            history = self.pumps[pump_id] = PumpHistory(pump_dir, self.dtype)
+        return history
+
+    def has_history(self, pump_id: str) -> bool:
+        return pump_id in self.pumps and len(self.pumps[pump_id]) > 0
+
+    def append(self, pump_id: str, ts: int, values: Dict[str, float]) -> None:
+        self._history(pump_id).append(ts, values)
+
+    def append_rows(self, pump_id: str, rows: np.ndarray) -> None:
+        self._history(pump_id).append_rows(rows)
+
+    def chunks(
+        self, pump_ids: List[str], start_ts: int, end_ts: int, chunk_rows: int = SEGMENT_ROWS
+    ) -> Iterator[Tuple[str, np.ndarray]]:
+        """(pump_id, rows) chunks, pump by pump in the given order"""
+        for pump_id in pump_ids:
+            history = self.pumps.get(pump_id)
+            if history is None:
+                continue
+            for rows in history.chunks(start_ts, end_ts, chunk_rows):
+                yield pump_id, rows
+
+
+_store: Optional[SensorHistoryStore] = None
+
+
+def get_history_store() -> SensorHistoryStore:
+    global _store
+    if _store is None:
+        _store = SensorHistoryStore(Path(settings.SENSOR_HISTORY_DIR) if settings.SENSOR_HISTORY_DIR else None)
+    return _store
@@ -0,0 +1,146 @@
+"""
+Sensor reading ingestion.
+
+Readings are folded into the rollup tiers and appended to the raw history as they
+arrive, and update the pump's live values. Both stores are seeded with a week of mock
+history on first use, so neither application start-up nor the health check pays for it
+(raw history already persisted for a pump is not re-seeded).
+"""
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.logging_config import SampledLogger
+from app.data.mock_data import MOCK_PUMPS
+from app.services import alert_engine, event_journal, failure_forecast, fleet_analytics, fleet_query, pump_search
+from app.services.change_log import record_change
+from app.services.rollups import CHANNELS, FLEET_SCOPE, RollupStore
+from app.services.sensor_history import SensorHistoryStore, get_history_store as _get_history_store
+
+logger = logging.getLogger(__name__)
+reading_logger = SampledLogger(logger, per_second=1)
+
+SEED_HISTORY = timedelta(days=7)
+SEED_INTERVAL = timedelta(minutes=5)
+
+_store: Optional[RollupStore] = None
+
+
+def _to_ts(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _from_ts(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _seed(store: RollupStore, history: SensorHistoryStore) -> None:
+    rng = random.Random(42)
+    end = datetime.now(timezone.utc)
+    step = int(SEED_INTERVAL.total_seconds())
+    start_ts = _to_ts(end - SEED_HISTORY)
+    end_ts = _to_ts(end)
+    for pump in MOCK_PUMPS:
+        seed_history = not history.has_history(pump["id"])
+        for ts in range(start_ts, end_ts, step):
+            values = {
+                "vibration": max(0, pump["vibration"] + rng.uniform(-0.5, 0.5)),
+                "temperature": max(50, pump["temperature"] + rng.uniform(-3, 3)),
+                "pressure": max(0, pump["pressure"] + rng.uniform(-2, 2)),
+                "flow_rate": max(0, pump["flow_rate"] + rng.uniform(-50, 50)),
+                "power": max(0, pump["power"] + rng.uniform(-5, 5)),
+                "health_score": min(100, max(0, pump["health_score"] + rng.uniform(-1.5, 1.5))),
+            }
+            store.ingest(pump["id"], ts, values)
+            if seed_history:
+                history.append(pump["id"], ts, values)
+    logger.info(f"Seeded rollups for {len(MOCK_PUMPS)} pumps")
+
+
+def get_rollup_store() -> RollupStore:
+    global _store
+    if _store is None:
+        _store = RollupStore()
+        _seed(_store, _get_history_store())
+    return _store
+
+
+def get_history_store() -> SensorHistoryStore:
+    get_rollup_store()  # seeds the history too
+    return _get_history_store()
+
+
+def record_reading(pump: Dict[str, Any], reading: Dict[str, Any]) -> None:
+    """Ingest one reading for a pump: update rollups, the pump's live values and alerts"""
+    recorded_at = reading.get("recorded_at") or datetime.now(timezone.utc)
+    values = {c: reading[c] for c in CHANNELS if reading.get(c) is not None}
+    get_rollup_store().ingest(pump["id"], _to_ts(recorded_at), values)
+    get_history_store().append(pump["id"], _to_ts(recorded_at), values)
+    pump.update(values)
+    record_change("pump", pump["id"])
+    fleet_analytics.pump_updated(pump)
+    fleet_query.pump_updated(pump)
+    pump_search.pump_updated(pump)
+    failure_forecast.pump_updated(pump)
+    event_journal.pump_updated(pump)
+    alert_engine.record_reading_alerts(pump, values, recorded_at)
+    reading_logger.info("Recorded reading for pump %s: %s", pump["id"], values)
+
+
+def query_trends(
+    scope: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    max_points: int,
+    resolution: Optional[str] = None,
+) -> Dict[str, Any]:
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    tier, points = get_rollup_store().query(
+        scope, _to_ts(start), _to_ts(end), max_points, resolution
+    )
+    return {
+        "resolution": tier,
+        "start": start,
+        "end": end,
+        "points": [{"recorded_at": _from_ts(p["ts"]), "stats": p["stats"]} for p in points],
+    }
+
+
+def flatten_points(pump_id: str, points: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-point channel means in the flat shape /trends has always returned"""
+    return [
+        {
+            "pump_id": pump_id,
+            **{channel: s["mean"] for channel, s in p["stats"].items()},
+            "recorded_at": p["recorded_at"],
+        }
+        for p in points
+    ]
+
+
+def trend_columns(
+    points: List[Dict[str, Any]],
+    dtype: np.dtype,
+    channels: tuple = CHANNELS,
+    include_stats: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Points as columns for the columnar encoding: epoch-second `ts`, each channel's mean
+    (NaN where a bucket has no data) and, with include_stats, `<channel>.min/.max/.last/.count`
+    """
+    columns = {"ts": np.array([_to_ts(p["recorded_at"]) for p in points], dtype=np.int64)}
+    fields = ("mean", "min", "max", "last") if include_stats else ("mean",)
+    for channel in channels:
+        stats = [p["stats"].get(channel) for p in points]
+        for field in fields:
+            name = channel if field == "mean" else f"{channel}.{field}"
+            columns[name] = np.array([s[field] if s else np.nan for s in stats], dtype=dtype)
+        if include_stats:
+            columns[f"{channel}.count"] = np.array([s["count"] if s else 0 for s in stats], dtype=np.int64)
+    return columns
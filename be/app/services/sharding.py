@@ -0,0 +1,117 @@
+"""
+Scatter-gather client for the location-sharded deployment.
+
+Each shard is a regular API process started with SHARD_LOCATIONS; the aggregator
+(app.aggregator) knows the shards from SHARDS and uses this client to route requests
+for one pump or location to the owning shard, and to scatter fleet-wide requests to
+all shards in parallel. Every shard call has its own timeout; a gathered result
+reports per-shard status and `partial: true` when a shard did not answer.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import AggregatorSettings
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+
+class ShardError(Exception):
+    pass
+
+
+class ShardClient:
+    def __init__(self, shards: Dict[str, List[str]], timeout: float):
+        self.shards = {url.rstrip("/"): locations for url, locations in shards.items()}
+        self.timeout = timeout
+        self.by_location = {
+            location.lower(): url for url, locations in self.shards.items() for location in locations
+        }
+        self.pump_shards: Dict[str, str] = {}
+        self.client = httpx.AsyncClient()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def shard_for_location(self, location: str) -> Optional[str]:
+        return self.by_location.get(location.lower())
+
+    async def _call(self, url: str, method: str, path: str, prefix: str = API_PREFIX, **kwargs) -> httpx.Response:
+        return await asyncio.wait_for(
+            self.client.request(method, f"{url}{prefix}{path}", **kwargs), timeout=self.timeout
+        )
+
+    async def scatter(
+        self, path: str, params: Optional[Dict[str, Any]] = None, prefix: str = API_PREFIX
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """GET path on every shard in parallel -> (responses by shard, status by shard)"""
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        urls = list(self.shards)
+        results = await asyncio.gather(
+            *[self._call(url, "GET", path, prefix, params=params) for url in urls], return_exceptions=True
+        )
+        responses: Dict[str, Any] = {}
+        status: Dict[str, str] = {}
+        for url, result in zip(urls, results):
+            if isinstance(result, asyncio.TimeoutError):
+                status[url] = "timeout"
+            elif isinstance(result, Exception):
+                status[url] = "unavailable"
+            elif result.status_code != 200:
+                status[url] = f"error {result.status_code}"
+            else:
+                status[url] = "ok"
+                responses[url] = result.json()
+            if status[url] != "ok":
+                logger.warning(f"Shard {url} {status[url]} for {path}")
+        return responses, status
+
+    async def forward(self, url: str, method: str, path: str, **kwargs) -> httpx.Response:
+        try:
+            return await self._call(url, method, path, **kwargs)
+        except asyncio.TimeoutError:
+            raise ShardError(f"Shard {url} timed out")
+        except httpx.HTTPError as e:
+            raise ShardError(f"Shard {url} unavailable: {e}")
+
+    async def shard_for_pump(self, pump_id: str) -> Optional[str]:
+        """Owning shard of a pump; the routing table is refreshed from the shards on a miss"""
+        if pump_id not in self.pump_shards:
+            responses, _ = await self.scatter("/pumps/")
+            for url, body in responses.items():
+                for pump in body["pumps"]:
+                    self.pump_shards[pump["id"]] = url
+        return self.pump_shards.get(pump_id)
+
+
+def sum_numeric(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Field-wise sum of numeric values (recursing into dicts); other values come from the first part"""
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        for key, value in part.items():
+            if key not in merged:
+                merged[key] = sum_numeric([value]) if isinstance(value, dict) else value
+            elif isinstance(value, dict) and isinstance(merged[key], dict):
+                merged[key] = sum_numeric([merged[key], value])
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and merged[key] is not None:
+                merged[key] += value
+    return merged
+
+
+def gathered(body: Dict[str, Any], status: Dict[str, str]) -> Dict[str, Any]:
+    return {**body, "partial": any(s != "ok" for s in status.values()), "shards": status}
+
+
+_client: Optional[ShardClient] = None
+
+
+def get_shard_client() -> ShardClient:
+    global _client
+    if _client is None:
+        aggregator_settings = AggregatorSettings()
+        _client = ShardClient(aggregator_settings.SHARDS, aggregator_settings.SHARD_TIMEOUT_SECONDS)
+    return _client
@@ -0,0 +1,90 @@
+"""
+Spectral features of raw vibration waveform captures.
+
+Works on a (captures, samples) float32 array of acceleration and computes every
+feature for the whole batch with vectorized NumPy (one rfft per batch). Kept free of
+application state so compute workers can import it cheaply.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+STANDARD_GRAVITY = 9.80665
+
+# Band RMS ranges (Hz): running speed/unbalance, bearing defect harmonics, early wear/lubrication
+BANDS_HZ: Tuple[Tuple[int, int], ...] = ((10, 1000), (1000, 5000), (5000, 20000))
+# ISO 10816 velocity band, comparable with the pump's scalar `vibration` (mm/s)
+VELOCITY_BAND_HZ = (10, 1000)
+
+# Rolling-element bearing geometry used for defect frequencies (a 6205-class bearing)
+DEFAULT_BEARING = {"balls": 9, "ball_diameter_mm": 7.94, "pitch_diameter_mm": 39.04, "contact_angle_deg": 0.0}
+DEFECTS = ("bpfo", "bpfi", "bsf", "ftf")
+# A defect peak is searched within this fraction of its frequency (at least 2 bins)
+PEAK_TOLERANCE = 0.03
+
+FEATURES = (
+    ("rms", "peak", "crest_factor", "kurtosis", "velocity_rms", "dominant_hz")
+    + tuple(f"band_{lo}_{hi}_rms" for lo, hi in BANDS_HZ)
+    + tuple(f"{d}_{kind}" for d in DEFECTS for kind in ("amplitude", "prominence"))
+)
+FEATURE_DTYPE = np.dtype([("ts", "<i8")] + [(name, "<f8") for name in FEATURES])
+
+
+def defect_frequencies(shaft_hz: float, bearing: Dict[str, float] = DEFAULT_BEARING) -> Dict[str, float]:
+    """Outer race, inner race, ball spin and cage frequencies (Hz) at a shaft speed"""
+    diameter_ratio = bearing["ball_diameter_mm"] / bearing["pitch_diameter_mm"]
+    ratio = diameter_ratio * np.cos(np.radians(bearing["contact_angle_deg"]))
+    balls = bearing["balls"]
+    return {
+        "bpfo": shaft_hz * balls / 2 * (1 - ratio),
+        "bpfi": shaft_hz * balls / 2 * (1 + ratio),
+        "bsf": shaft_hz / (2 * diameter_ratio) * (1 - ratio ** 2),
+        "ftf": shaft_hz / 2 * (1 - ratio),
+    }
+
+
+def compute_features(captures: np.ndarray, sample_rate: float, shaft_hz: float, scale: float) -> np.ndarray:
+    """One FEATURE_DTYPE row per capture (ts left at 0); `scale` converts samples to m/s^2"""
+    count, samples = captures.shape
+    rows = np.zeros(count, dtype=FEATURE_DTYPE)
+    x = (captures - captures.mean(axis=1, keepdims=True, dtype=np.float64)) * scale
+
+    mean_square = np.einsum("ij,ij->i", x, x) / samples
+    rms = np.sqrt(mean_square)
+    rows["rms"] = rms
+    rows["peak"] = np.abs(x).max(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rows["crest_factor"] = np.where(rms > 0, rows["peak"] / rms, 0.0)
+        rows["kurtosis"] = np.where(mean_square > 0, np.mean(x ** 4, axis=1) / mean_square ** 2, 0.0)
+
+    window = np.hanning(samples)
+    spectrum = np.abs(np.fft.rfft(x * window, axis=1))
+    freqs = np.fft.rfftfreq(samples, 1.0 / sample_rate)
+    # Single-sided amplitude and power, corrected for the window
+    amplitude = spectrum * (2.0 / window.sum())
+    power = spectrum ** 2 * (2.0 / (samples * np.dot(window, window)))
+
+    rows["dominant_hz"] = freqs[1 + np.argmax(amplitude[:, 1:], axis=1)]
+    for lo, hi in BANDS_HZ:
+        band = (freqs >= lo) & (freqs < hi)
+        rows[f"band_{lo}_{hi}_rms"] = np.sqrt(power[:, band].sum(axis=1)) if band.any() else np.nan
+
+    lo, hi = VELOCITY_BAND_HZ
+    band = (freqs >= lo) & (freqs < hi)
+    # Integrate acceleration to velocity in the frequency domain, in mm/s
+    rows["velocity_rms"] = np.sqrt((power[:, band] / (2 * np.pi * freqs[band]) ** 2).sum(axis=1)) * 1000
+
+    floor = np.median(amplitude[:, 1:], axis=1)
+    resolution = sample_rate / samples
+    for defect, hz in defect_frequencies(shaft_hz).items():
+        width = max(2 * resolution, PEAK_TOLERANCE * hz)
+        lo_bin, hi_bin = np.searchsorted(freqs, [hz - width, hz + width])
+        if hz + width >= freqs[-1] or hi_bin <= lo_bin:
+            rows[f"{defect}_amplitude"] = np.nan
+            rows[f"{defect}_prominence"] = np.nan
+            continue
+        peak = amplitude[:, lo_bin:hi_bin].max(axis=1)
+        rows[f"{defect}_amplitude"] = peak
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rows[f"{defect}_prominence"] = np.where(floor > 0, peak / floor, 0.0)
+    return rows
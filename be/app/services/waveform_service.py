@@ -0,0 +1,124 @@
+"""
+Vibration waveform ingestion.
+
+Uploaded waveform blocks are little-endian float32 captures laid end to end; they are
+viewed in place as a (captures, samples) array, with no copy of the request body, and
+their spectral features are computed for the whole batch at once (on the compute pool
+from OFFLOAD_MIN_BYTES of samples). One feature row per capture is stored in the
+pump's sensor history, and the latest capture's 10-1000 Hz velocity RMS is recorded
+as the pump's `vibration` reading.
+"""
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.compute import get_compute_executor
+from app.services.sensor_history import SensorHistoryStore
+from app.services.sensor_service import record_reading
+from app.services.waveform_features import FEATURE_DTYPE, FEATURES, STANDARD_GRAVITY, compute_features, defect_frequencies
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_DTYPE = np.dtype("<f4")
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+# Batches from this many bytes of samples (about 50 ms of feature work) go to the compute pool
+OFFLOAD_MIN_BYTES = 2 * 1024 * 1024
+MIN_SAMPLES_PER_CAPTURE = 256
+DEFAULT_SHAFT_RPM = 1780.0
+# Sample value -> m/s^2
+UNIT_SCALES = {"g": STANDARD_GRAVITY, "m/s2": 1.0}
+
+
+class WaveformError(Exception):
+    pass
+
+
+def view_captures(body: bytes, samples_per_capture: int) -> np.ndarray:
+    """The upload as a read-only (captures, samples) float32 view of the request body"""
+    if samples_per_capture < MIN_SAMPLES_PER_CAPTURE:
+        raise WaveformError(f"samples_per_capture must be at least {MIN_SAMPLES_PER_CAPTURE}")
+    capture_bytes = samples_per_capture * SAMPLE_DTYPE.itemsize
+    if not body or len(body) % capture_bytes:
+        raise WaveformError(
+            f"Body must hold whole captures of {samples_per_capture} float32 samples ({capture_bytes} bytes each)"
+        )
+    captures = np.frombuffer(body, dtype=SAMPLE_DTYPE).reshape(-1, samples_per_capture)
+    if not np.isfinite(captures).all():
+        raise WaveformError("Waveform contains NaN or infinite samples")
+    return captures
+
+
+def _to_ts(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _feature_dict(row: np.void) -> Dict[str, Any]:
+    return {
+        "recorded_at": datetime.fromtimestamp(int(row["ts"]), tz=timezone.utc),
+        **{name: None if np.isnan(row[name]) else round(float(row[name]), 6) for name in FEATURES},
+    }
+
+
+async def ingest_waveforms(
+    pump: Dict[str, Any],
+    captures: np.ndarray,
+    sample_rate: float,
+    shaft_rpm: float = DEFAULT_SHAFT_RPM,
+    units: str = "g",
+    recorded_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Compute and store the features of a batch of captures taken back to back from recorded_at"""
+    shaft_hz = shaft_rpm / 60
+    rows = await get_compute_executor().run(
+        compute_features, [captures], sample_rate, shaft_hz, UNIT_SCALES[units], offload_min_bytes=OFFLOAD_MIN_BYTES
+    )
+
+    duration = captures.shape[1] / sample_rate
+    rows["ts"] = _to_ts(recorded_at or datetime.now(timezone.utc)) + (np.arange(len(rows)) * duration).astype(np.int64)
+    get_waveform_feature_store().append_rows(pump["id"], rows)
+
+    latest = rows[-1]
+    record_reading(pump, {
+        "vibration": round(float(latest["velocity_rms"]), 3),
+        "recorded_at": datetime.fromtimestamp(int(latest["ts"]), tz=timezone.utc),
+    })
+    return {
+        "pump_id": pump["id"],
+        "captures": len(rows),
+        "samples_per_capture": captures.shape[1],
+        "sample_rate": sample_rate,
+        "defect_frequencies_hz": {k: round(float(v), 2) for k, v in defect_frequencies(shaft_hz).items()},
+        "features": [_feature_dict(row) for row in rows],
+    }
+
+
+def feature_history(pump_id: str, start: datetime, end: datetime, limit: int) -> List[Dict[str, Any]]:
+    """Stored feature rows in [start, end], the most recent `limit` of them in time order"""
+    # Chunks are in time order across segments (late uploads are merged in), so the
+    # newest rows are taken from the end
+    chunks = [rows for _, rows in get_waveform_feature_store().chunks([pump_id], _to_ts(start), _to_ts(end))]
+    picked = []
+    for rows in reversed(chunks):
+        if limit <= 0:
+            break
+        picked.append(rows[-limit:])
+        limit -= len(picked[-1])
+    rows = np.concatenate(picked[::-1]) if picked else np.empty(0, dtype=FEATURE_DTYPE)
+    return [_feature_dict(row) for row in rows]
+
+
+_store: Optional[SensorHistoryStore] = None
+
+
+def get_waveform_feature_store() -> SensorHistoryStore:
+    global _store
+    if _store is None:
+        directory = Path(settings.SENSOR_HISTORY_DIR) if settings.SENSOR_HISTORY_DIR else None
+        _store = SensorHistoryStore(directory, FEATURE_DTYPE, subdir="spectral")
+    return _store
@@ -0,0 +1,83 @@
+import json
+import os
+import random
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+BE_DIR = Path(__file__).resolve().parent.parent
+BUDGETS_FILE = Path(__file__).resolve().parent / "budgets.json"
+
+# Minimal environment for the core settings. OPENAI_API_KEY is deliberately
+# left out: the API has to come up without LLM credentials.
+BENCH_ENV = {
+    "APP_ENV": "benchmark",
+    "SECRET_KEY": "benchmark",
+    "BACKEND_CORS_ORIGINS": '["http://localhost:3000"]',
+}
+
+
+def bench_env() -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env.update(BENCH_ENV)
+    env["PYTHONPATH"] = str(BE_DIR)
+    return env
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "min": round(ordered[0], 2),
+        "median": round(statistics.median(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def check_budgets(section: str, results: Dict[str, float]) -> bool:
+    """Compare measured medians against the tracked budget; returns True when all pass"""
+    budgets = json.loads(BUDGETS_FILE.read_text()).get(section, {})
+    ok = True
+    for metric, budget in budgets.items():
+        if metric not in results:
+            continue
+        value = results[metric]
+        status = "ok" if value <= budget else "OVER BUDGET"
+        ok = ok and value <= budget
+        print(f"  {metric:<32} {value:>10.2f} / {budget:<10} {status}")
+    return ok
+
+
+def synthetic_pumps(count: int, seed: int = 7) -> List[Dict]:
+    """A fleet shaped like MOCK_PUMPS, for scale benchmarks"""
+    rng = random.Random(seed)
+    words = ["Feed", "Booster", "Transfer", "Circulation", "Service", "Main", "Cooling", "Water"]
+    issues = [
+        "Bearing wear detected. Flow rate declining gradually.",
+        "Temperature rising above normal range.",
+        "Operating within normal parameters.",
+        "Flow rate fluctuations detected. Check impeller condition.",
+        "Critical overheating detected. Immediate maintenance required.",
+    ]
+    pumps = []
+    for i in range(count):
+        pumps.append({
+            "id": f"P{i:06d}",
+            "name": f"{rng.choice(words)} Pump {chr(65 + i % 26)}{i % 97}",
+            "location": f"Unit {chr(65 + rng.randrange(8))}",
+            "pump_type": rng.choice(["Centrifugal", "Rotary", "Reciprocating"]),
+            "status": rng.choice(["Normal", "Normal", "Normal", "Warning", "Critical"]),
+            "pressure": rng.uniform(35, 55),
+            "temperature": rng.uniform(70, 110),
+            "vibration": rng.uniform(1, 5),
+            "flow_rate": rng.uniform(700, 1400),
+            "power": rng.uniform(60, 100),
+            "total_runtime": rng.uniform(1000, 10000),
+            "average_uptime": rng.uniform(90, 100),
+            "efficiency": rng.uniform(75, 95),
+            "health_score": rng.uniform(30, 100),
+            "predicted_failure_days": rng.randint(1, 120),
+            "confidence": rng.uniform(60, 95),
+            "predicted_issue": rng.choice(issues),
+        })
+    return pumps
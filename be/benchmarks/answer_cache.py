@@ -0,0 +1,65 @@
+"""
+Hit and false-hit rates of the chat answer cache.
+
+Each pair in benchmarks/answer_cache_eval.json is a question whose answer gets
+cached and a follow-up question, marked "same" when the cached answer also answers
+the follow-up (a paraphrase) and not when it does not (a different number, time
+window, negation or pump). Every pair is looked up in a fresh cache with unchanged
+data. Reported:
+- false_hit_rate: follow-ups served another question's answer (the costly failure)
+- paraphrase_miss_rate: paraphrases that missed and would go to the LLM again
+
+Run from the be/ directory:  python -m benchmarks.answer_cache [-v]
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from benchmarks._common import BENCH_ENV, check_budgets
+
+EVAL_FILE = Path(__file__).resolve().parent / "answer_cache_eval.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every wrong lookup")
+    parser.add_argument("--threshold", type=float, help="similarity threshold (default: the configured one)")
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.core.config import LLMSettings
+    from app.services.answer_cache import AnswerCache, parse_question
+
+    # The settings default, so the benchmark runs without LLM credentials
+    threshold = args.threshold or LLMSettings.model_fields["ANSWER_CACHE_THRESHOLD"].default
+    pairs = json.loads(EVAL_FILE.read_text())
+    false_hits = missed = 0
+    for pair in pairs:
+        cache = AnswerCache(max_entries=8, threshold=threshold, ttl_seconds=3600)
+        cache.store(parse_question(pair["asked"]), "cached answer")
+        hit = cache.lookup(parse_question(pair["then"])) is not None
+        if hit == pair["same"]:
+            continue
+        if hit:
+            false_hits += 1
+        else:
+            missed += 1
+        if args.verbose:
+            print(f"  {'FALSE HIT' if hit else 'MISSED'} {pair['asked']!r} -> {pair['then']!r}")
+
+    paraphrases = sum(1 for pair in pairs if pair["same"])
+    opposites = len(pairs) - paraphrases
+    print(f"pairs: {len(pairs)} ({paraphrases} paraphrases, {opposites} different questions)  "
+          f"threshold: {threshold}  false hits: {false_hits}  missed paraphrases: {missed}")
+    print("budgets:")
+    return 0 if check_budgets("answer_cache", {
+        "false_hit_rate": round(false_hits / opposites, 4),
+        "paraphrase_miss_rate": round(missed / paraphrases, 4),
+    }) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Event-loop lag while encoding a large CSV export, inline vs on the compute pool.
+
+Fills an in-memory history with synthetic rows, then encodes it chunk by chunk the
+way the export endpoint does while a LoopLagMonitor samples the loop every 10 ms.
+Run from the be/ directory:  python -m benchmarks.compute_offload [--rows N] [--workers N]
+Exits non-zero when the offloaded lag p95 exceeds its budget in benchmarks/budgets.json.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks._common import BENCH_ENV, check_budgets
+
+
+async def _encode_all(executor, history, chunk_rows):
+    from app.services.history_encoding import encode_csv_chunk
+
+    total = 0
+    jobs = (([rows], (pump_id,)) for pump_id, rows in history.chunks(["P000001"], 0, 2 ** 62, chunk_rows))
+    async for data in executor.imap(encode_csv_chunk, jobs):
+        total += len(data)
+    return total
+
+
+async def _measure(workers, history, chunk_rows):
+    from app.services.compute import ComputeExecutor, LoopLagMonitor
+
+    executor = ComputeExecutor(workers)
+    executor.start()
+    if executor.pool:
+        # Spawn the workers before timing
+        await asyncio.gather(*[
+            asyncio.get_running_loop().run_in_executor(executor.pool, time.sleep, 0.01)
+            for _ in range(workers)
+        ])
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    started = time.perf_counter()
+    size = await _encode_all(executor, history, chunk_rows)
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    executor.shutdown()
+    return elapsed, size, monitor.metrics()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=400_000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--chunk-rows", type=int, default=8192)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.services.sensor_history import SensorHistoryStore
+
+    history = SensorHistoryStore()
+    for i in range(args.rows):
+        history.append("P000001", 1_700_000_000 + i * 60, {
+            "pressure": 45.0 + i % 7, "temperature": 80.0 + i % 11, "vibration": 2.0,
+            "flow_rate": 1100.0, "power": 75.0, "health_score": 90.0,
+        })
+
+    results = {}
+    for label, workers in (("inline", 0), ("offloaded", args.workers)):
+        elapsed, size, lag = asyncio.run(_measure(workers, history, args.chunk_rows))
+        print(
+            f"{label:<10} {args.rows} rows -> {size / 1e6:.1f} MB in {elapsed:.2f}s; "
+            f"loop lag p95 {lag['lag_p95_ms']} ms, max {lag['lag_max_ms']} ms, stalls {lag['stalls']}"
+        )
+        results[f"{label}_lag_p95_ms"] = lag["lag_p95_ms"]
+
+    print("budgets:")
+    return 0 if check_budgets("compute_offload", results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Failure-forecast latency over a large synthetic fleet.
+
+Runs the Monte Carlo forecast inline (no compute pool) for a few horizons, then the
+same request again to check it is served from the cache.
+Run from the be/ directory:  python -m benchmarks.failure_forecast [--pumps N] [--simulations N]
+Exits non-zero when a forecast exceeds its budget in benchmarks/budgets.json.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from benchmarks._common import BENCH_ENV, check_budgets, summarize, synthetic_pumps
+
+
+async def _measure(forecaster, horizons, simulations):
+    cold, cached = [], []
+    for horizon in horizons:
+        started = time.perf_counter()
+        forecast = await forecaster.forecast(horizon, simulations)
+        cold.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        await forecaster.forecast(horizon, simulations)
+        cached.append((time.perf_counter() - started) * 1000)
+        bands = forecast["failure_count_bands"]
+        print(
+            f"  {horizon:>4} days: expected {forecast['expected_failures']:.1f} failures "
+            f"(p5 {bands['p5']}, p50 {bands['p50']}, p95 {bands['p95']}) in {cold[-1]:.0f} ms"
+        )
+    return cold, cached
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pumps", type=int, default=50_000)
+    parser.add_argument("--simulations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.services.failure_forecast import FailureForecaster
+
+    forecaster = FailureForecaster(synthetic_pumps(args.pumps))
+    print(f"{args.simulations} simulations over {args.pumps} pumps:")
+    cold, cached = asyncio.run(_measure(forecaster, (7, 30, 90), args.simulations))
+
+    cold_stats, cached_stats = summarize(cold), summarize(cached)
+    print(f"cold   {cold_stats}")
+    print(f"cached {cached_stats}")
+    print("budgets:")
+    return 0 if check_budgets("failure_forecast", {
+        "forecast_max_ms": cold_stats["max"],
+        "cached_max_ms": cached_stats["max"],
+    }) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
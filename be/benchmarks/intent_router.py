@@ -0,0 +1,72 @@
+"""
+Accuracy and latency evaluation for the local chat intent router.
+
+Each case in benchmarks/intent_eval.json names the expected intent and arguments,
+or null when the message must fall back to the LLM. Reported:
+- accuracy: cases routed exactly as expected
+- false_answer_rate: answered locally when the LLM should have been used, or with
+  the wrong intent/arguments (the costly failure: a confidently wrong answer)
+- missed_rate: fell back to the LLM although a local answer was expected
+
+Run from the be/ directory:  python -m benchmarks.intent_router [-v]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._common import BENCH_ENV, check_budgets, summarize
+
+EVAL_FILE = Path(__file__).resolve().parent / "intent_eval.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every misrouted case")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.services.intent_router import route
+
+    cases = json.loads(EVAL_FILE.read_text())
+    correct = false_answers = missed = 0
+    for case in cases:
+        intent = route(case["message"])
+        got = (intent.name, intent.args) if intent else None
+        expected = (case["intent"], case.get("args", {})) if case["intent"] else None
+        if got == expected:
+            correct += 1
+            continue
+        if got is None:
+            missed += 1
+        else:
+            false_answers += 1
+        if args.verbose:
+            print(f"  MISROUTED {case['message']!r}: expected {expected}, got {got}")
+
+    samples = []
+    for _ in range(args.repeat):
+        for case in cases:
+            start = time.perf_counter()
+            route(case["message"])
+            samples.append((time.perf_counter() - start) * 1000)
+
+    total = len(cases)
+    latency = summarize(samples)
+    print(f"cases: {total}  accuracy: {correct / total:.1%}  "
+          f"false answers: {false_answers}  missed: {missed}")
+    print(f"route latency (ms): {latency}")
+    print("budgets:")
+    return 0 if check_budgets("intent_router", {
+        "error_rate": round(1 - correct / total, 4),
+        "false_answer_rate": round(false_answers / total, 4),
+        "route_p95_ms": latency["p95"],
+    }) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
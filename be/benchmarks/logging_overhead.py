@@ -0,0 +1,77 @@
+"""
+Caller-side cost of logging: what a log call costs the event loop.
+
+Compares a synchronous JSON handler writing to a file (the old basicConfig setup,
+with JSON formatting) against the queued handler of app.core.logging_config, plus a
+rate-sampled hot-path log site and a disabled debug call.
+Run from the be/ directory:  python -m benchmarks.logging_overhead [--records N]
+Exits non-zero when the queued or sampled cost exceeds its budget in benchmarks/budgets.json.
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener
+
+from benchmarks._common import BENCH_ENV, check_budgets
+
+PAYLOAD = {"temperature": 81.5, "pressure": 44.2, "vibration": 2.1, "flow_rate": 1180.0}
+
+
+def _per_call_us(log, records: int) -> float:
+    started = time.perf_counter()
+    for i in range(records):
+        log("Recorded reading for pump %s: %s", f"P{i % 1000:06d}", PAYLOAD)
+    return (time.perf_counter() - started) / records * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=50_000)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.core.logging_config import ContextQueueHandler, SampledLogger, build_formatter
+
+    logger = logging.getLogger("benchmark.logging")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "app.log")
+
+        sync_handler = logging.FileHandler(path)
+        sync_handler.setFormatter(build_formatter("json"))
+        logger.handlers[:] = [sync_handler]
+        results["sync_json_us"] = _per_call_us(logger.info, args.records)
+        sync_handler.close()
+
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(build_formatter("json"))
+        log_queue: queue.Queue = queue.Queue(args.records + 1)
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        logger.handlers[:] = [ContextQueueHandler(log_queue)]
+        results["queued_json_us"] = _per_call_us(logger.info, args.records)
+        drain_started = time.perf_counter()
+        listener.stop()
+        drain_s = time.perf_counter() - drain_started
+        file_handler.close()
+
+        results["sampled_us"] = _per_call_us(SampledLogger(logger, per_second=1).info, args.records)
+        results["disabled_debug_us"] = _per_call_us(logger.debug, args.records)
+
+    for metric, value in results.items():
+        print(f"{metric:<20} {value:8.2f} us/call")
+    print(f"listener drained the queued records in {drain_s:.2f}s off the calling thread")
+
+    print("budgets:")
+    return 0 if check_budgets("logging", {k: round(v, 2) for k, v in results.items()}) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Search-as-you-type benchmark for the pump search index.
+
+Builds the index over a synthetic fleet and times typical incremental queries.
+Run from the be/ directory:  python -m benchmarks.search [--pumps N]
+Exits non-zero when the p95 latency exceeds its budget in benchmarks/budgets.json.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks._common import BENCH_ENV, check_budgets, summarize, synthetic_pumps
+
+QUERIES = [
+    "P0", "P012", "P01234", "b", "boo", "booster", "booster c", "boostr",
+    "trnsfer pump", "unit c transfer", "bearing wear", "overheat", "centrifgal",
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pumps", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from app.services.pump_search import PumpSearchIndex
+
+    pumps = synthetic_pumps(args.pumps)
+    start = time.perf_counter()
+    index = PumpSearchIndex(pumps)
+    build_s = time.perf_counter() - start
+    print(f"index build over {args.pumps} pumps: {build_s:.2f}s")
+
+    samples = []
+    for query in QUERIES:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            index.search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    stats = summarize(samples)
+    print(f"query latency (ms): {stats}")
+    print("budgets:")
+    return 0 if check_budgets("search", {"query_p95_ms": stats["p95"]}) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark.
+
+Measures, in fresh interpreter processes:
+- the time to import app.main
+- the time from spawning uvicorn to the first 200 from /health
+
+Run from the be/ directory:  python -m benchmarks.startup [--runs N]
+Exits non-zero when a median exceeds its budget in benchmarks/budgets.json.
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks._common import BE_DIR, bench_env, check_budgets, summarize
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BE_DIR, env=bench_env(), capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_healthy(timeout: float = 30.0) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BE_DIR, env=bench_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited early: {proc.stderr.read().decode()}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/health did not respond within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    healthy = [measure_first_healthy() for _ in range(args.runs)]
+
+    print(f"import app.main (ms):        {summarize(imports)}")
+    print(f"first healthy response (ms): {summarize(healthy)}")
+
+    results = {
+        "import_app_main_ms": summarize(imports)["median"],
+        "first_healthy_response_ms": summarize(healthy)["median"],
+    }
+    print("budgets (median):")
+    return 0 if check_budgets("startup", results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Trend payload size and encode/decode time: JSON versus the columnar binary form.
+
+Builds a pump's trend response (channel means per point, as /pumps/{id}/trends
+returns) and encodes it the way the endpoint does for each form: FastAPI's JSON
+encoding of the per-point dicts, and app.services.columnar with float32 and float64
+columns. Decoding is json.loads against columnar.decode (typed views plus a running
+sum over the timestamps). Sizes are also reported gzip-compressed.
+Run from the be/ directory:  python -m benchmarks.trend_payloads [--points N]
+Exits non-zero when the columnar form misses its budget in benchmarks/budgets.json.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from benchmarks._common import BENCH_ENV, check_budgets, summarize
+
+REPEATS = 20
+
+
+def _points(count: int, channels):
+    rng = random.Random(3)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    base = {"pressure": 45, "temperature": 80, "vibration": 2.5, "flow_rate": 1100, "power": 75, "health_score": 80}
+    return [
+        {
+            "recorded_at": start + timedelta(minutes=i),
+            "stats": {
+                c: {"min": v, "max": v, "mean": v, "count": 12, "last": v}
+                for c in channels
+                for v in [base[c] + rng.uniform(-5, 5)]
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _timed_ms(fn):
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=5000)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    from fastapi.encoders import jsonable_encoder
+    from app.services import columnar
+    from app.services.rollups import CHANNELS
+    from app.services.sensor_service import flatten_points, trend_columns
+
+    points = _points(args.points, CHANNELS)
+    meta = {"pump_id": "P001", "resolution": "1m", "start": points[0]["recorded_at"], "end": points[-1]["recorded_at"]}
+
+    def encode_json() -> bytes:
+        body = {**meta, "sensor_data": flatten_points("P001", points), "data_points": len(points)}
+        return json.dumps(jsonable_encoder(body), separators=(",", ":")).encode()
+
+    forms = {"json": encode_json}
+    for precision, dtype in columnar.FLOAT_DTYPES.items():
+        forms[f"columnar_{precision}"] = lambda dtype=dtype: columnar.encode(trend_columns(points, dtype), meta)
+
+    decoders = {"json": json.loads}
+    decoders.update({name: columnar.decode for name in forms if name != "json"})
+
+    print(f"{args.points} points x {len(CHANNELS)} channels")
+    print(f"{'form':<14} {'bytes':>10} {'gzip':>10} {'encode ms':>10} {'decode ms':>10}")
+    results = {}
+    for name, encode in forms.items():
+        encode_stats, payload = _timed_ms(encode)
+        decode_stats, _ = _timed_ms(lambda: decoders[name](payload))
+        size = len(payload)
+        gzipped = len(gzip.compress(payload))
+        print(f"{name:<14} {size:>10} {gzipped:>10} {encode_stats['median']:>10} {decode_stats['median']:>10}")
+        results[name] = {"bytes": size, "gzip": gzipped, "encode": encode_stats["median"], "decode": decode_stats["median"]}
+
+    # Every column must start on an 8-byte boundary to be viewed as a typed array
+    payload = forms["columnar_f8"]()
+    base = np.frombuffer(payload, dtype=np.uint8).ctypes.data
+    _, columns = columnar.decode(payload)
+    assert all((c.ctypes.data - base) % 8 == 0 for name, c in columns.items() if name != "ts")
+
+    json_result, binary = results["json"], results["columnar_f4"]
+    measured = {
+        "columnar_size_ratio": round(binary["bytes"] / json_result["bytes"], 3),
+        "columnar_encode_ms": binary["encode"],
+        "columnar_decode_ms": binary["decode"],
+    }
+    print(
+        f"columnar float32 is {measured['columnar_size_ratio']:.1%} of the JSON size "
+        f"({binary['gzip'] / json_result['gzip']:.1%} gzipped), "
+        f"decodes {json_result['decode'] / max(binary['decode'], 1e-3):.0f}x faster"
+    )
+    print("budgets:")
+    return 0 if check_budgets("trend_payloads", measured) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
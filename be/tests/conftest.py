@@ -0,0 +1,7 @@
+import os
+
+from benchmarks._common import BENCH_ENV
+
+# Minimal settings so app modules import without a .env file
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,42 @@
+"""
+Regression tests for ChatTurn.follow: frames appended while the follower is suspended
+at a yield must still be delivered, including the end of the turn.
+Run from the be/ directory:  python -m pytest tests
+"""
+import asyncio
+
+from app.services.chat_stream import HEARTBEAT_INTERVAL, ChatTurn
+
+
+def _ids(frames):
+    return [line for frame in frames for line in frame.splitlines() if line.startswith("id:")]
+
+
+def test_turn_finishing_while_follower_is_suspended_sends_remaining_frames():
+    async def scenario():
+        turn = ChatTurn("t")
+        turn.append("token", {"text": "a"})
+        follower = turn.follow()
+        frames = [await follower.__anext__(), await follower.__anext__()]  # retry, then seq 1
+        turn.append("token", {"text": "b"})
+        turn.append("done", {})
+        frames += [frame async for frame in follower]
+        return frames
+
+    assert _ids(asyncio.run(scenario())) == ["id: t:1", "id: t:2", "id: t:3"]
+
+
+def test_frames_appended_while_follower_is_suspended_do_not_wait_for_heartbeat():
+    async def scenario():
+        turn = ChatTurn("t")
+        turn.append("token", {"text": "a"})
+        follower = turn.follow()
+        await follower.__anext__()
+        await follower.__anext__()
+        turn.append("token", {"text": "b"})
+        try:
+            return await asyncio.wait_for(follower.__anext__(), timeout=HEARTBEAT_INTERVAL / 10)
+        finally:
+            await follower.aclose()
+
+    assert _ids([asyncio.run(scenario())]) == ["id: t:2"]
@@ -181,6 +181,8 @@ export default function AiAssistantPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [dynamicSuggestions, setDynamicSuggestions] = useState<string[]>([]);
   const [showDynamicSuggestions, setShowDynamicSuggestions] = useState(false);
+  // Server-side chat session; once known only the new message is sent
+  const sessionIdRef = useRef<string | null>(null);
   
   const chatContainerRef = useRef<HTMLDivElement>(null);
 
@@ -204,7 +206,8 @@ export default function AiAssistantPage() {
         currentMessages.slice(0, -1).map(msg => ({
           role: msg.role,
           content: msg.content
-        }))
+        })),
+        sessionIdRef.current
       );
 
       if (response.data) {
@@ -245,36 +248,47 @@ export default function AiAssistantPage() {
       const response = await apiClient.streamChatMessage(messageToSend, messages.map(msg => ({
         role: msg.role,
         content: msg.content
-      })));
-
-      // Handle streaming response
-      const reader = response.body?.getReader();
-      if (!reader) throw new Error("No reader available");
+      })), sessionIdRef.current);
+      sessionIdRef.current = response.headers.get("X-Chat-Session-Id") ?? sessionIdRef.current;
 
+      // Handle the server-sent event stream; resume once from the last event id if the connection drops
       let assistantMessage = "";
-      const decoder = new TextDecoder();
       let hasReceivedContent = false;
-
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-
-        const chunk = decoder.decode(value);
-        console.log("Received chunk:", chunk); // Debug log
-        
-        if (chunk.trim()) {
-          hasReceivedContent = true;
-          assistantMessage += chunk;
-
-          // Update the last assistant message
-          setMessages(prev => {
-            const updated = [...prev];
-            updated[updated.length - 1] = { role: "assistant", content: assistantMessage };
-            return updated;
-          });
+      let lastEventId: string | undefined;
+      let streamError: string | undefined;
+      let finished = false;
+      let stream = response;
+
+      for (let attempt = 0; attempt < 2 && !finished; attempt++) {
+        try {
+          for await (const { id, event, data } of apiClient.readChatEvents(stream)) {
+            if (id) lastEventId = id;
+            if (event === "token") {
+              hasReceivedContent = true;
+              assistantMessage += data.text;
+
+              // Update the last assistant message
+              setMessages(prev => {
+                const updated = [...prev];
+                updated[updated.length - 1] = { role: "assistant", content: assistantMessage };
+                return updated;
+              });
+            } else if (event === "error") {
+              streamError = data.message;
+              finished = true;
+            } else if (event === "done") {
+              finished = true;
+            }
+          }
+        } catch (error) {
+          console.error("Chat stream interrupted:", error);
         }
+        if (finished || !lastEventId) break;
+        stream = await apiClient.resumeChatStream(lastEventId.split(":")[0], lastEventId);
       }
 
+      if (streamError) console.error("Chat stream error:", streamError);
+
       // If no content was received, show error message
       if (!hasReceivedContent || !assistantMessage.trim()) {
         console.error("No content received from stream");
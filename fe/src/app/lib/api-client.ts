@@ -2,6 +2,7 @@
  * API Client for communicating with the backend
  */
 import config from './config';
+import { COLUMNAR_MEDIA_TYPE, ColumnarPayload, decodeColumnar } from './columnar';
 
 export interface ApiResponse<T = any> {
   data?: T;
@@ -9,6 +10,12 @@ export interface ApiResponse<T = any> {
   status: number;
 }
 
+export interface ChatStreamEvent {
+  id?: string;
+  event: string;
+  data: any;
+}
+
 class ApiClient {
   private baseUrl: string;
 
@@ -59,7 +66,7 @@ class ApiClient {
   }
 
   // Chat API methods
-  async streamChatMessage(message: string, chatHistory: any[] = []) {
+  async streamChatMessage(message: string, chatHistory: any[] = [], sessionId?: string | null) {
     const url = `${this.baseUrl}/chat/stream`;
 
     try {
@@ -70,7 +77,8 @@ class ApiClient {
         },
         body: JSON.stringify({
           message,
-          chat_history: chatHistory,
+          session_id: sessionId ?? undefined,
+          chat_history: sessionId ? [] : chatHistory,
         }),
       });
 
@@ -84,12 +92,54 @@ class ApiClient {
     }
   }
 
-  async getChatSuggestions(message: string, chatHistory: any[] = []) {
+  async resumeChatStream(turnId: string, lastEventId: string) {
+    const response = await fetch(`${this.baseUrl}/chat/stream/${turnId}`, {
+      headers: { 'Last-Event-ID': lastEventId },
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    return response;
+  }
+
+  // Parses a text/event-stream body into {id, event, data} frames; comments (heartbeats) are skipped
+  async *readChatEvents(response: Response): AsyncGenerator<ChatStreamEvent> {
+    const reader = response.body?.getReader();
+    if (!reader) throw new Error("No reader available");
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const frame = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event: ChatStreamEvent = { event: "message", data: null };
+        for (const line of frame.split("\n")) {
+          if (line.startsWith(":")) continue;
+          const sep = line.indexOf(":");
+          const field = sep === -1 ? line : line.slice(0, sep);
+          const val = sep === -1 ? "" : line.slice(sep + 1).replace(/^ /, "");
+          if (field === "id") event.id = val;
+          else if (field === "event") event.event = val;
+          else if (field === "data") event.data = JSON.parse(val);
+        }
+        if (event.data !== null) yield event;
+      }
+    }
+  }
+
+  async getChatSuggestions(message: string, chatHistory: any[] = [], sessionId?: string | null) {
     return this.request('/chat/suggestions', {
       method: 'POST',
       body: JSON.stringify({
         message,
-        chat_history: chatHistory,
+        session_id: sessionId ?? undefined,
+        chat_history: sessionId ? [] : chatHistory,
       }),
     });
   }
@@ -107,7 +157,53 @@ class ApiClient {
     return this.request(`/pumps/${pumpId}/trends`);
   }
 
+  // Trend points as typed-array columns (one per channel mean), for charts with many points
+  async getPumpTrendsColumnar(
+    pumpId: string,
+    params: { start?: string; end?: string; max_points?: number; resolution?: string; precision?: 'f4' | 'f8' } = {},
+  ): Promise<ColumnarPayload> {
+    const searchParams = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined) searchParams.append(key, String(value));
+    });
+
+    const query = searchParams.toString();
+    const response = await fetch(`${this.baseUrl}/pumps/${pumpId}/trends${query ? `?${query}` : ''}`, {
+      headers: { Accept: COLUMNAR_MEDIA_TYPE },
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    return decodeColumnar(await response.arrayBuffer());
+  }
+
+  // Streams NDJSON, one line per pump, so callers can render pumps as they arrive
+  async getPumpsBatch(
+    pumpIds: string[],
+    sections: Array<'details' | 'trends' | 'alerts' | 'maintenance'> = ['details'],
+    trends: { start?: string; end?: string; max_points?: number; resolution?: string } = {},
+  ) {
+    const response = await fetch(`${this.baseUrl}/pumps/batch`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        pump_ids: pumpIds,
+        sections,
+        trends,
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+
+    return response;
+  }
+
   async searchPumps(filters: {
+    q?: string;
     location?: string;
     pump_type?: string;
     status?: string;
@@ -130,8 +226,21 @@ class ApiClient {
     return this.request('/dashboard/health-trends');
   }
 
-  async getRecentActivity() {
-    return this.request('/dashboard/recent-activity');
+  // Newest first; pass the previous page's next_cursor as cursor for older activity
+  async getRecentActivity(filters: {
+    limit?: number;
+    cursor?: number;
+    type?: 'alert' | 'maintenance' | 'status' | 'prediction';
+    location?: string;
+    pump_id?: string;
+  } = {}) {
+    const searchParams = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') searchParams.append(key, String(value));
+    });
+
+    const query = searchParams.toString();
+    return this.request(`/dashboard/recent-activity${query ? `?${query}` : ''}`);
   }
 
   // Alert API methods
@@ -139,6 +248,8 @@ class ApiClient {
     status?: string;
     priority?: string;
     pump_id?: string;
+    location?: string;
+    view?: 'alerts' | 'incidents';
   } = {}) {
     const searchParams = new URLSearchParams();
     Object.entries(filters).forEach(([key, value]) => {
@@ -165,6 +276,16 @@ class ApiClient {
     });
   }
 
+  // Delta sync: entities changed after `since`; on resync_required reload, then poll from `version`
+  async getChanges(since?: number, kinds: Array<'pump' | 'alert' | 'maintenance'> = []) {
+    const searchParams = new URLSearchParams();
+    if (since !== undefined) searchParams.append('since', String(since));
+    kinds.forEach((kind) => searchParams.append('kinds', kind));
+
+    const query = searchParams.toString();
+    return this.request(`/changes/${query ? `?${query}` : ''}`);
+  }
+
   // Health check
   async healthCheck() {
     return this.request('/health', {
@@ -0,0 +1,64 @@
+/**
+ * Decoder for the backend's columnar chart payloads (application/vnd.pump-monitor.columnar).
+ * Float columns are typed-array views over the response buffer (no copy); delta-encoded
+ * timestamp columns are summed back into epoch seconds.
+ */
+
+export const COLUMNAR_MEDIA_TYPE = 'application/vnd.pump-monitor.columnar';
+
+const PREAMBLE_BYTES = 12;
+
+interface ColumnSpec {
+  name: string;
+  dtype: '<f4' | '<f8' | '<i8';
+  length: number;
+  offset: number;
+  encoding?: 'delta';
+}
+
+export interface ColumnarPayload {
+  rows: number;
+  meta: Record<string, any>;
+  columns: Record<string, Float32Array | Float64Array | BigInt64Array>;
+  // Epoch seconds of each row, when the payload has a `ts` column
+  timestamps?: Float64Array;
+}
+
+export function decodeColumnar(buffer: ArrayBuffer): ColumnarPayload {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'PMCF' || view.getUint16(4, true) !== 1) {
+    throw new Error('Not a version 1 columnar payload');
+  }
+  const headerBytes = view.getUint32(8, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_BYTES, headerBytes)));
+  const dataStart = PREAMBLE_BYTES + headerBytes;
+
+  const payload: ColumnarPayload = { rows: header.rows, meta: header.meta, columns: {} };
+  for (const spec of header.columns as ColumnSpec[]) {
+    const offset = dataStart + spec.offset;
+    if (spec.dtype === '<f4') {
+      payload.columns[spec.name] = new Float32Array(buffer, offset, spec.length);
+    } else if (spec.dtype === '<f8') {
+      payload.columns[spec.name] = new Float64Array(buffer, offset, spec.length);
+    } else {
+      const values = new BigInt64Array(buffer, offset, spec.length);
+      if (spec.encoding === 'delta') {
+        const restored = new BigInt64Array(spec.length);
+        let running = BigInt(0);
+        values.forEach((delta, i) => {
+          running += delta;
+          restored[i] = running;
+        });
+        payload.columns[spec.name] = restored;
+      } else {
+        payload.columns[spec.name] = values;
+      }
+    }
+  }
+  const ts = payload.columns.ts;
+  if (ts instanceof BigInt64Array) {
+    payload.timestamps = Float64Array.from(ts, Number);
+  }
+  return payload;
+}
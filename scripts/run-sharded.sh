@@ -0,0 +1,21 @@
+#!/bin/bash
+# Run the backend as location shards behind a scatter-gather aggregator, all locally.
+# Shards listen on 8101.., the aggregator on ${PORT:-8000}. Ctrl-C stops everything.
+
+cd "$(dirname "$0")/../be" || exit 1
+
+LOCATIONS=("Unit A" "Unit B" "Unit C")
+PORT=${PORT:-8000}
+SHARDS=""
+
+trap 'kill $(jobs -p) 2>/dev/null' EXIT
+
+for i in "${!LOCATIONS[@]}"; do
+    shard_port=$((8101 + i))
+    echo "Starting shard for ${LOCATIONS[$i]} on port $shard_port..."
+    SHARD_LOCATIONS="[\"${LOCATIONS[$i]}\"]" uvicorn app.main:app --port "$shard_port" &
+    SHARDS="$SHARDS${SHARDS:+, }\"http://127.0.0.1:$shard_port\": [\"${LOCATIONS[$i]}\"]"
+done
+
+echo "Starting aggregator on port $PORT..."
+SHARDS="{$SHARDS}" uvicorn app.aggregator:app --port "$PORT"